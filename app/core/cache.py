@@ -0,0 +1,143 @@
+import asyncio
+import json
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, Hashable, Optional, Tuple
+
+class TTLCache:
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            value, expires_at = item
+            if expires_at <= time.monotonic():
+                del self._data[key]
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+    
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+    
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+    
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0
+            }
+
+class MemoryBackend:
+    blocking = False
+    
+    def __init__(self, maxsize: int = 10000, ttl: float = 300.0):
+        self.entries = TTLCache(maxsize, ttl)
+        self.counters = {}
+        self._lock = threading.Lock()
+    
+    def fetch(self, key: str, *counter_keys: str) -> Tuple[Optional[Any], Tuple[int, ...]]:
+        with self._lock:
+            counters = tuple(self.counters.get(counter_key, 0) for counter_key in counter_keys)
+        return self.entries.get(key), counters
+    
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        self.entries.set(key, value, ttl)
+    
+    def incr(self, *counter_keys: str) -> None:
+        with self._lock:
+            for counter_key in counter_keys:
+                self.counters[counter_key] = self.counters.get(counter_key, 0) + 1
+    
+    def stats(self) -> dict:
+        return {"backend": "memory", **self.entries.stats()}
+
+class RedisBackend:
+    blocking = True
+    
+    def __init__(self, url: Optional[str] = None, ttl: float = 300.0, client=None):
+        if client is None:
+            import redis
+            client = redis.Redis.from_url(url or "redis://localhost:6379/0")
+        self.client = client
+        self.ttl = ttl
+    
+    def fetch(self, key: str, *counter_keys: str) -> Tuple[Optional[Any], Tuple[int, ...]]:
+        raw, *counters = self.client.mget([key, *counter_keys])
+        value = json.loads(raw) if raw is not None else None
+        return value, tuple(int(counter or 0) for counter in counters)
+    
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        seconds = max(1, int(self.ttl if ttl is None else ttl))
+        self.client.set(key, json.dumps(value, separators=(",", ":")), ex=seconds)
+    
+    def incr(self, *counter_keys: str) -> None:
+        pipeline = self.client.pipeline(transaction=False)
+        for counter_key in counter_keys:
+            pipeline.incr(counter_key)
+        pipeline.execute()
+    
+    def stats(self) -> dict:
+        return {"backend": "redis", "ttl_seconds": self.ttl}
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._locks = {}
+        self._async_locks = {}
+    
+    @contextmanager
+    def hold(self, key: Hashable):
+        with self._lock:
+            entry = self._locks.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if not entry[1]:
+                    del self._locks[key]
+    
+    @asynccontextmanager
+    async def hold_async(self, key: Hashable):
+        entry = self._async_locks.setdefault(key, [asyncio.Lock(), 0])
+        entry[1] += 1
+        try:
+            async with entry[0]:
+                yield
+        finally:
+            entry[1] -= 1
+            if not entry[1]:
+                del self._async_locks[key]
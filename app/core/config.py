@@ -3,12 +3,68 @@ from typing import Optional
 
 class Settings(BaseSettings):
     DATABASE_URL: str
+    ASYNC_DB_ENABLED: bool = False
+    ASYNC_DATABASE_URL: Optional[str] = None
+    DATABASE_REPLICA_URLS: str = ""
+    READ_AFTER_WRITE_SECONDS: float = 5.0
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30.0
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_TIMEOUT_MS: int = 0
+    DB_AUTO_MIGRATE: bool = True
+    SLOW_QUERY_THRESHOLD_MS: int = 200
+    QUERY_REPEAT_THRESHOLD: int = 5
+    PROFILING_ENABLED: bool = False
+    PROFILING_SAMPLE_RATE: float = 0.0
+    PROFILING_DIR: str = "profiles"
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
+    JWT_PRIVATE_KEY_FILE: Optional[str] = None
+    JWT_PUBLIC_KEY_FILE: Optional[str] = None
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    TOKEN_REVOCATION_SYNC_SECONDS: int = 5
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_CONCURRENCY: int = 8
     PROJECT_NAME: str = "Inventory Management API"
     VERSION: str = "1.0.0"
     API_PREFIX: str = "/api/v1"
+    PRINCIPAL_CACHE_SIZE: int = 1024
+    PRINCIPAL_CACHE_TTL_SECONDS: int = 1800
+    AUDIT_ASYNC_ENABLED: bool = True
+    AUDIT_QUEUE_MAX_SIZE: int = 10000
+    AUDIT_BATCH_SIZE: int = 500
+    AUDIT_FLUSH_INTERVAL_SECONDS: float = 1.0
+    AUDIT_ENQUEUE_TIMEOUT_SECONDS: float = 0.5
+    BULK_CHUNK_SIZE: int = 1000
+    BULK_MAX_REPORTED_ERRORS: int = 1000
+    EXPORT_BATCH_SIZE: int = 1000
+    BATCH_GET_MAX_IDS: int = 1000
+    BATCH_GET_CHUNK_SIZE: int = 500
+    STATS_RECONCILE_INTERVAL_SECONDS: int = 3600
+    LOG_RETENTION_MONTHS: int = 0
+    LOG_ARCHIVE_ENABLED: bool = True
+    LOG_ARCHIVE_DIR: str = "archive/logs"
+    LOG_PARTITION_PREMAKE_MONTHS: int = 3
+    LOG_MAINTENANCE_INTERVAL_SECONDS: int = 3600
+    LOG_ROLLUP_HOURLY_RETENTION_DAYS: int = 90
+    PRODUCT_CACHE_ENABLED: bool = True
+    PRODUCT_CACHE_BACKEND: str = "memory"
+    PRODUCT_CACHE_URL: Optional[str] = None
+    PRODUCT_CACHE_SIZE: int = 10000
+    PRODUCT_CACHE_TTL_SECONDS: int = 300
+    PRODUCT_SEARCH_REFRESH_SECONDS: int = 300
+    STOCK_ALERT_SINK: str = "log"
+    STOCK_ALERT_DEBOUNCE_SECONDS: float = 300.0
+    PRODUCT_CHANGES_POLL_SECONDS: float = 1.0
+    PRODUCT_CHANGES_BUFFER_SIZE: int = 1000
+    PRODUCT_CHANGES_BATCH_SIZE: int = 500
+    PRODUCT_CHANGES_HEARTBEAT_SECONDS: float = 15.0
+    PRODUCT_CHANGES_GAP_GRACE_SECONDS: float = 2.0
+    PRODUCT_CHANGES_RETENTION_DAYS: int = 7
+    PRODUCT_CHANGES_PRUNE_INTERVAL_SECONDS: int = 3600
     
     class Config:
         env_file = ".env"
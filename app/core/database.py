@@ -1,18 +1,220 @@
-from sqlalchemy import create_engine
+import asyncio
+import functools
+import itertools
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, List, Optional
+from sqlalchemy import Select, Table, create_engine, event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from app.core.cache import TTLCache
 from app.core.config import settings
+from app.core.metrics import InstrumentedAsyncQueuePool, InstrumentedQueuePool, database_metrics, instrument_engine
 
-engine = create_engine(settings.DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+def engine_options(url: str, is_async: bool = False) -> dict:
+    options = {
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+        "pool_recycle": settings.DB_POOL_RECYCLE
+    }
+    if url.startswith("sqlite"):
+        return options
+    options.update(
+        poolclass=InstrumentedAsyncQueuePool if is_async else InstrumentedQueuePool,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT
+    )
+    if settings.DB_STATEMENT_TIMEOUT_MS:
+        if "+asyncpg" in url:
+            options["connect_args"] = {"server_settings": {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}}
+        else:
+            options["connect_args"] = {"options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"}
+    return options
+
+UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+def require_upsert_support(bind) -> None:
+    if bind.dialect.name not in UPSERT_INSERTS:
+        raise RuntimeError(f"Base de datos no soportada: {bind.dialect.name} (use {' o '.join(UPSERT_INSERTS)})")
+
+def replica_urls(value: str) -> List[str]:
+    return [url.strip() for url in value.split(",") if url.strip()]
+
+def create_replica_engines(urls: List[str]) -> list:
+    engines = []
+    for url in urls:
+        replica = create_engine(url, **engine_options(url))
+        require_upsert_support(replica)
+        instrument_engine(replica)
+        engines.append(replica)
+    return engines
+
+PRIMARY = "primary"
+REPLICA = "replica"
+
+read_routing: ContextVar[Optional[str]] = ContextVar("read_routing", default=None)
+routing_user: ContextVar[Optional[int]] = ContextVar("routing_user", default=None)
+recent_writers = TTLCache(maxsize=100000, ttl=settings.READ_AFTER_WRITE_SECONDS)
+
+def bind_routing_user(user_id: int) -> None:
+    routing_user.set(user_id)
+
+def reads_pinned_to_primary() -> bool:
+    user_id = routing_user.get()
+    return user_id is not None and recent_writers.get(user_id) is not None
+
+@contextmanager
+def primary_reads():
+    token = read_routing.set(PRIMARY)
+    try:
+        yield
+    finally:
+        read_routing.reset(token)
+
+def replica_read(method: Callable) -> Callable:
+    if asyncio.iscoroutinefunction(method):
+        @functools.wraps(method)
+        async def route_async(*args, **kwargs):
+            if read_routing.get() is not None:
+                return await method(*args, **kwargs)
+            token = read_routing.set(REPLICA)
+            try:
+                return await method(*args, **kwargs)
+            finally:
+                read_routing.reset(token)
+        return route_async
+    
+    @functools.wraps(method)
+    def route(*args, **kwargs):
+        if read_routing.get() is not None:
+            return method(*args, **kwargs)
+        token = read_routing.set(REPLICA)
+        try:
+            return method(*args, **kwargs)
+        finally:
+            read_routing.reset(token)
+    return route
+
+class RoutingSession(Session):
+    replicas: list = []
+    _replica_cycle = itertools.count()
+    _replica = None
+    _wrote = False
+    
+    def get_bind(self, mapper=None, *, clause=None, **kw):
+        if self._flushing or (clause is not None and not isinstance(clause, Select)):
+            self._wrote = True
+        elif (
+            self.replicas
+            and not self._wrote
+            and read_routing.get() == REPLICA
+            and clause is not None
+            and clause._for_update_arg is None
+        ):
+            if reads_pinned_to_primary():
+                database_metrics.increment("pinned_reads")
+            else:
+                if self._replica is None:
+                    self._replica = self.replicas[next(self._replica_cycle) % len(self.replicas)]
+                database_metrics.increment("replica_reads")
+                return self._replica
+        return super().get_bind(mapper, clause=clause, **kw)
+
+@event.listens_for(RoutingSession, "after_commit")
+def remember_writer(session: RoutingSession) -> None:
+    if session._wrote:
+        user_id = routing_user.get()
+        if user_id is not None and settings.READ_AFTER_WRITE_SECONDS > 0:
+            recent_writers.set(user_id, True)
+        session._wrote = False
+
+@event.listens_for(RoutingSession, "after_rollback")
+def forget_writes(session: RoutingSession) -> None:
+    session._wrote = False
+
+engine = create_engine(settings.DATABASE_URL, **engine_options(settings.DATABASE_URL))
+require_upsert_support(engine)
+instrument_engine(engine)
+replica_engines = create_replica_engines(replica_urls(settings.DATABASE_REPLICA_URLS))
+RoutingSession.replicas = replica_engines
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine, class_=RoutingSession)
 Base = declarative_base()
 
+ASYNC_DRIVERS = (
+    ("postgresql+psycopg2://", "postgresql+asyncpg://"),
+    ("postgresql://", "postgresql+asyncpg://"),
+    ("sqlite://", "sqlite+aiosqlite://"),
+)
+
+def to_async_url(url: str) -> str:
+    for sync_prefix, async_prefix in ASYNC_DRIVERS:
+        if url.startswith(sync_prefix):
+            return async_prefix + url[len(sync_prefix):]
+    return url
+
+class AsyncRoutingSession(RoutingSession):
+    replicas: list = []
+
+async_engine = None
+async_replica_engines = []
+AsyncSessionLocal = None
+if settings.ASYNC_DB_ENABLED:
+    async_url = settings.ASYNC_DATABASE_URL or to_async_url(settings.DATABASE_URL)
+    async_engine = create_async_engine(async_url, **engine_options(async_url, is_async=True))
+    require_upsert_support(async_engine)
+    instrument_engine(async_engine.sync_engine)
+    for replica_url in replica_urls(settings.DATABASE_REPLICA_URLS):
+        async_replica_url = to_async_url(replica_url)
+        async_replica = create_async_engine(async_replica_url, **engine_options(async_replica_url, is_async=True))
+        instrument_engine(async_replica.sync_engine)
+        async_replica_engines.append(async_replica)
+    AsyncRoutingSession.replicas = [replica.sync_engine for replica in async_replica_engines]
+    AsyncSessionLocal = async_sessionmaker(
+        async_engine,
+        autoflush=False,
+        expire_on_commit=False,
+        sync_session_class=AsyncRoutingSession
+    )
+
+class LazySession:
+    def __init__(self, factory: Callable[[], Session]):
+        self._factory = factory
+        self._session = None
+    
+    def __getattr__(self, name):
+        if self._session is None:
+            self._session = self._factory()
+            database_metrics.increment("sessions_opened")
+        return getattr(self._session, name)
+    
+    def close(self) -> None:
+        if self._session is not None:
+            self._session.close()
+            self._session = None
+
 def get_db():
-    db = SessionLocal()
+    db = LazySession(SessionLocal)
     try:
         yield db
     finally:
         db.close()
 
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def dialect_insert(db, table: Table):
+    return UPSERT_INSERTS[db.get_bind().dialect.name](table)
+
+def iterate_in_session(produce: Callable[[Session], Iterator]) -> Iterator:
+    db = SessionLocal()
+    try:
+        yield from produce(db)
+    finally:
+        db.close()
+
 def init_db():
-    Base.metadata.create_all(bind=engine)
+    from app.migrations import run_migrations
+    return run_migrations(engine)
@@ -0,0 +1,5 @@
+class NotFoundError(Exception):
+    pass
+
+class ConflictError(Exception):
+    pass
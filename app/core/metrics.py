@@ -0,0 +1,348 @@
+import logging
+import re
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from fastapi import Request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from app.core.config import settings
+from app.core.profiling import RequestProfile, current_profile, profile_label, wants_profile
+
+logger = logging.getLogger(__name__)
+slow_query_logger = logging.getLogger(f"{__name__}.slow_queries")
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (1, 2, 3, 5, 10, 20, 50, 100)
+MAX_LOGGED_PARAMETERS = 1000
+UNMATCHED_ROUTE = "unmatched"
+
+class RequestStats:
+    __slots__ = ("query_count", "db_time", "statements", "executions")
+    
+    def __init__(self):
+        self.query_count = 0
+        self.db_time = 0.0
+        self.statements: Counter = Counter()
+        self.executions: Counter = Counter()
+    
+    def record(self, statement: str, parameters, executemany: bool, elapsed: float) -> None:
+        self.query_count += 1
+        self.db_time += elapsed
+        self.statements[statement] += 1
+        if not executemany:
+            self.executions[(statement, repr(parameters))] += 1
+    
+    def repeated_statements(self, threshold: int) -> List[Tuple[str, int]]:
+        return [(statement, count) for statement, count in self.statements.items() if count >= threshold]
+    
+    def duplicated_statements(self) -> List[Tuple[str, int]]:
+        return [(statement, count) for (statement, _), count in self.executions.items() if count > 1]
+
+current_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("current_request_stats", default=None)
+
+class DatabaseMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.checkins = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.checkout_timeouts = 0
+        self.checkout_wait_total = 0.0
+        self.checkout_wait_max = 0.0
+        self.overflow_peak = 0
+        self.sessions_opened = 0
+        self.queries = 0
+        self.query_time_total = 0.0
+        self.requests = 0
+        self.request_queries_max = 0
+        self.request_db_time_max = 0.0
+        self.slow_queries = 0
+        self.replica_reads = 0
+        self.pinned_reads = 0
+    
+    def record_checkout_wait(self, elapsed: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self.checkout_wait_total += elapsed
+            self.checkout_wait_max = max(self.checkout_wait_max, elapsed)
+            if timed_out:
+                self.checkout_timeouts += 1
+    
+    def record_checkout(self, overflow: int) -> None:
+        with self._lock:
+            self.checkouts += 1
+            self.overflow_peak = max(self.overflow_peak, overflow)
+    
+    def increment(self, name: str) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+    
+    def record_query(self, elapsed: float, slow: bool = False) -> None:
+        with self._lock:
+            self.queries += 1
+            self.query_time_total += elapsed
+            if slow:
+                self.slow_queries += 1
+    
+    def record_request(self, stats: RequestStats) -> None:
+        with self._lock:
+            self.requests += 1
+            self.request_queries_max = max(self.request_queries_max, stats.query_count)
+            self.request_db_time_max = max(self.request_db_time_max, stats.db_time)
+    
+    def stats(self, engine: Engine) -> dict:
+        pool = engine.pool
+        with self._lock:
+            return {
+                "pool": {
+                    "class": type(pool).__name__,
+                    "size": pool.size() if hasattr(pool, "size") else None,
+                    "checked_out": pool.checkedout() if hasattr(pool, "checkedout") else None,
+                    "overflow": pool.overflow() if hasattr(pool, "overflow") else None,
+                    "overflow_peak": self.overflow_peak,
+                    "checkouts": self.checkouts,
+                    "checkins": self.checkins,
+                    "connects": self.connects,
+                    "invalidations": self.invalidations,
+                    "checkout_timeouts": self.checkout_timeouts,
+                    "checkout_wait_total_ms": round(self.checkout_wait_total * 1000, 3),
+                    "checkout_wait_max_ms": round(self.checkout_wait_max * 1000, 3),
+                    "checkout_wait_avg_ms": round(self.checkout_wait_total * 1000 / self.checkouts, 3) if self.checkouts else 0.0
+                },
+                "sessions_opened": self.sessions_opened,
+                "queries": self.queries,
+                "query_time_total_ms": round(self.query_time_total * 1000, 3),
+                "slow_queries": self.slow_queries,
+                "replica_reads": self.replica_reads,
+                "pinned_reads": self.pinned_reads,
+                "requests": self.requests,
+                "queries_per_request_avg": round(self.queries / self.requests, 3) if self.requests else 0.0,
+                "queries_per_request_max": self.request_queries_max,
+                "db_time_per_request_max_ms": round(self.request_db_time_max * 1000, 3)
+            }
+
+database_metrics = DatabaseMetrics()
+
+class _TimedCheckoutMixin:
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            database_metrics.record_checkout_wait(time.perf_counter() - start, timed_out=True)
+            raise
+        database_metrics.record_checkout_wait(time.perf_counter() - start)
+        return connection
+
+class InstrumentedQueuePool(_TimedCheckoutMixin, QueuePool):
+    pass
+
+class InstrumentedAsyncQueuePool(_TimedCheckoutMixin, AsyncAdaptedQueuePool):
+    pass
+
+def instrument_engine(engine: Engine) -> None:
+    pool = engine.pool
+    
+    @event.listens_for(engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy):
+        database_metrics.record_checkout(pool.overflow() if hasattr(pool, "overflow") else 0)
+    
+    @event.listens_for(engine, "checkin")
+    def on_checkin(dbapi_connection, connection_record):
+        database_metrics.increment("checkins")
+    
+    @event.listens_for(engine, "connect")
+    def on_connect(dbapi_connection, connection_record):
+        database_metrics.increment("connects")
+    
+    @event.listens_for(engine, "invalidate")
+    def on_invalidate(dbapi_connection, connection_record, exception):
+        database_metrics.increment("invalidations")
+    
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._query_start = time.perf_counter()
+    
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - context._query_start
+        slow = settings.SLOW_QUERY_THRESHOLD_MS > 0 and elapsed * 1000 >= settings.SLOW_QUERY_THRESHOLD_MS
+        database_metrics.record_query(elapsed, slow)
+        if slow:
+            log_slow_query(statement, parameters, elapsed)
+        stats = current_request_stats.get()
+        if stats is not None:
+            stats.record(statement, parameters, executemany, elapsed)
+
+def log_slow_query(statement: str, parameters, elapsed: float) -> None:
+    rendered = repr(parameters)
+    if len(rendered) > MAX_LOGGED_PARAMETERS:
+        rendered = rendered[:MAX_LOGGED_PARAMETERS] + "..."
+    slow_query_logger.warning("Consulta lenta (%.1f ms): %s | parámetros: %s", elapsed * 1000, " ".join(statement.split()), rendered)
+
+class Histogram:
+    __slots__ = ("bounds", "counts", "total", "count")
+    
+    def __init__(self, bounds: Sequence[float]):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)
+        self.total = 0.0
+        self.count = 0
+    
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.total += value
+        self.count += 1
+    
+    def cumulative(self) -> Iterator[Tuple[str, int]]:
+        running = 0
+        for bound, count in zip(self.bounds, self.counts):
+            running += count
+            yield format_number(bound), running
+        yield "+Inf", self.count
+
+class RouteStats:
+    __slots__ = ("latency", "db_time", "queries", "repeated", "duplicated")
+    
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.db_time = Histogram(LATENCY_BUCKETS)
+        self.queries = Histogram(QUERY_COUNT_BUCKETS)
+        self.repeated = 0
+        self.duplicated = 0
+
+class RouteMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes: Dict[Tuple[str, str, str], RouteStats] = {}
+    
+    def record(self, method: str, route: str, status: int, elapsed: float, stats: RequestStats, repeated: bool, duplicated: bool) -> None:
+        key = (method, route, str(status))
+        with self._lock:
+            route_stats = self._routes.get(key)
+            if route_stats is None:
+                route_stats = self._routes[key] = RouteStats()
+            route_stats.latency.observe(elapsed)
+            route_stats.db_time.observe(stats.db_time)
+            route_stats.queries.observe(stats.query_count)
+            route_stats.repeated += repeated
+            route_stats.duplicated += duplicated
+    
+    def stats(self) -> List[dict]:
+        with self._lock:
+            return [
+                {
+                    "method": method,
+                    "route": route,
+                    "status": int(status),
+                    "requests": route_stats.latency.count,
+                    "latency_avg_ms": round(route_stats.latency.total * 1000 / route_stats.latency.count, 3),
+                    "queries_avg": round(route_stats.queries.total / route_stats.queries.count, 3),
+                    "db_time_avg_ms": round(route_stats.db_time.total * 1000 / route_stats.db_time.count, 3),
+                    "repeated_query_requests": route_stats.repeated,
+                    "duplicated_query_requests": route_stats.duplicated
+                }
+                for (method, route, status), route_stats in sorted(self._routes.items())
+            ]
+    
+    def prometheus_lines(self) -> Iterator[str]:
+        with self._lock:
+            routes = sorted(self._routes.items())
+            for name, attribute, description in (
+                ("http_request_duration_seconds", "latency", "Latencia de las peticiones por ruta"),
+                ("http_request_db_seconds", "db_time", "Tiempo de base de datos por petición"),
+                ("http_request_db_queries", "queries", "Consultas SQL por petición")
+            ):
+                yield f"# HELP {name} {description}"
+                yield f"# TYPE {name} histogram"
+                for (method, route, status), route_stats in routes:
+                    histogram = getattr(route_stats, attribute)
+                    labels = prometheus_labels(method=method, route=route, status=status)
+                    for bound, count in histogram.cumulative():
+                        yield f'{name}_bucket{{{labels},le="{bound}"}} {count}'
+                    yield f"{name}_sum{{{labels}}} {format_number(histogram.total)}"
+                    yield f"{name}_count{{{labels}}} {histogram.count}"
+            for name, attribute, description in (
+                ("http_requests_repeated_queries_total", "repeated", "Peticiones con la misma consulta repetida (posible N+1)"),
+                ("http_requests_duplicated_queries_total", "duplicated", "Peticiones con consultas idénticas ejecutadas más de una vez")
+            ):
+                yield f"# HELP {name} {description}"
+                yield f"# TYPE {name} counter"
+                for (method, route, status), route_stats in routes:
+                    yield f"{name}{{{prometheus_labels(method=method, route=route, status=status)}}} {getattr(route_stats, attribute)}"
+
+route_metrics = RouteMetrics()
+
+def format_number(value: float) -> str:
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+def escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def prometheus_labels(**labels: str) -> str:
+    return ",".join(f'{key}="{escape_label(value)}"' for key, value in labels.items())
+
+def prometheus_gauges(prefix: str, values: dict) -> Iterator[str]:
+    for key, value in values.items():
+        name = f"{prefix}_{re.sub(r'[^a-zA-Z0-9_]', '_', str(key))}"
+        if isinstance(value, dict):
+            yield from prometheus_gauges(name, value)
+        elif isinstance(value, (bool, int, float)):
+            yield f"# TYPE {name} gauge"
+            yield f"{name} {format_number(value) if not isinstance(value, bool) else int(value)}"
+
+def render_prometheus(snapshot: dict) -> str:
+    lines = list(route_metrics.prometheus_lines())
+    lines.extend(prometheus_gauges("inventory", snapshot))
+    return "\n".join(lines) + "\n"
+
+def route_template(request: Request) -> str:
+    route = request.scope.get("route")
+    return getattr(route, "path", UNMATCHED_ROUTE)
+
+def server_timing(stats: RequestStats, elapsed: float) -> str:
+    return (
+        f'db;dur={stats.db_time * 1000:.3f};desc="{stats.query_count} queries", '
+        f"app;dur={max(elapsed - stats.db_time, 0.0) * 1000:.3f}, "
+        f"total;dur={elapsed * 1000:.3f}"
+    )
+
+def report_query_patterns(method: str, route: str, stats: RequestStats) -> Tuple[bool, bool]:
+    repeated = stats.repeated_statements(settings.QUERY_REPEAT_THRESHOLD) if settings.QUERY_REPEAT_THRESHOLD > 0 else []
+    duplicated = stats.duplicated_statements()
+    for statement, count in repeated:
+        logger.warning("Posible N+1 en %s %s: consulta ejecutada %s veces: %s", method, route, count, " ".join(statement.split()))
+    for statement, count in duplicated:
+        logger.warning("Consulta duplicada en %s %s (%s veces con los mismos parámetros): %s", method, route, count, " ".join(statement.split()))
+    return bool(repeated), bool(duplicated)
+
+async def instrument_requests(request: Request, call_next):
+    stats = RequestStats()
+    profile = RequestProfile() if wants_profile(request) else None
+    token = current_request_stats.set(stats)
+    profile_token = current_profile.set(profile)
+    start = time.perf_counter()
+    try:
+        response = await call_next(request)
+    finally:
+        elapsed = time.perf_counter() - start
+        current_request_stats.reset(token)
+        current_profile.reset(profile_token)
+    route = route_template(request)
+    repeated, duplicated = report_query_patterns(request.method, route, stats)
+    database_metrics.record_request(stats)
+    route_metrics.record(request.method, route, response.status_code, elapsed, stats, repeated, duplicated)
+    response.headers["X-DB-Query-Count"] = str(stats.query_count)
+    response.headers["X-DB-Time-Ms"] = f"{stats.db_time * 1000:.3f}"
+    response.headers["Server-Timing"] = server_timing(stats, elapsed)
+    if profile is not None:
+        path = profile.dump(settings.PROFILING_DIR, profile_label(request.method, route))
+        if path is not None:
+            response.headers["X-Profile-File"] = str(path)
+    return response
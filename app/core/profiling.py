@@ -0,0 +1,93 @@
+import asyncio
+import cProfile
+import functools
+import pstats
+import random
+import re
+import threading
+import time
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional
+from fastapi import Request
+from fastapi.routing import APIRoute
+from app.core.config import settings
+
+PROFILE_HEADER = "X-Profile"
+
+class RequestProfile:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.profilers: List[cProfile.Profile] = []
+    
+    def _collect(self, profiler: cProfile.Profile) -> None:
+        with self._lock:
+            self.profilers.append(profiler)
+    
+    def run(self, call: Callable, *args, **kwargs):
+        profiler = cProfile.Profile()
+        try:
+            return profiler.runcall(call, *args, **kwargs)
+        finally:
+            self._collect(profiler)
+    
+    async def run_async(self, call: Callable, *args, **kwargs):
+        if not _loop_profiler.acquire(blocking=False):
+            return await call(*args, **kwargs)
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            return await call(*args, **kwargs)
+        finally:
+            profiler.disable()
+            _loop_profiler.release()
+            self._collect(profiler)
+    
+    def dump(self, directory: str, label: str) -> Optional[Path]:
+        if not self.profilers:
+            return None
+        stats = pstats.Stats(self.profilers[0])
+        for profiler in self.profilers[1:]:
+            stats.add(profiler)
+        path = Path(directory) / f"{time.strftime('%Y%m%d-%H%M%S')}-{time.perf_counter_ns() % 1000000:06d}-{label}.prof"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        stats.dump_stats(path)
+        return path
+
+current_profile: ContextVar[Optional[RequestProfile]] = ContextVar("current_profile", default=None)
+_loop_profiler = threading.Lock()
+
+def wants_profile(request: Request) -> bool:
+    if not settings.PROFILING_ENABLED:
+        return False
+    if request.headers.get(PROFILE_HEADER, "").lower() in ("1", "true", "yes"):
+        return True
+    return settings.PROFILING_SAMPLE_RATE > 0 and random.random() < settings.PROFILING_SAMPLE_RATE
+
+def profile_label(method: str, route: str) -> str:
+    return f"{method.lower()}{re.sub(r'[^A-Za-z0-9]+', '-', route).rstrip('-')}"
+
+def profiled(call: Callable) -> Callable:
+    if asyncio.iscoroutinefunction(call):
+        @functools.wraps(call)
+        async def run_async(*args, **kwargs):
+            profile = current_profile.get()
+            if profile is None:
+                return await call(*args, **kwargs)
+            return await profile.run_async(call, *args, **kwargs)
+        run_async.profiled = True
+        return run_async
+    
+    @functools.wraps(call)
+    def run(*args, **kwargs):
+        profile = current_profile.get()
+        if profile is None:
+            return call(*args, **kwargs)
+        return profile.run(call, *args, **kwargs)
+    run.profiled = True
+    return run
+
+def profile_routes(routes: Iterable) -> None:
+    for route in routes:
+        if isinstance(route, APIRoute) and not getattr(route.dependant.call, "profiled", False):
+            route.dependant.call = profiled(route.dependant.call)
@@ -0,0 +1,32 @@
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Type
+from fastapi import Response
+from pydantic import BaseModel
+from pydantic_core import to_json, to_jsonable_python
+from app.core.utils import success_response
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+    
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
+
+def response_fields(schema: Type[BaseModel]) -> List[str]:
+    return list(schema.model_fields)
+
+def response_columns(model, schema: Type[BaseModel]) -> list:
+    return [getattr(model, field) for field in response_fields(schema)]
+
+def rows_as_dicts(rows: Iterable[Sequence], fields: List[str]) -> List[dict]:
+    return [dict(zip(fields, row)) for row in rows]
+
+def rows_as_json(rows: Iterable[Sequence], fields: List[str]) -> List[dict]:
+    return to_jsonable_python(rows_as_dicts(rows, fields))
+
+def fast_success_response(
+    data: Any,
+    message: str = "Operación exitosa",
+    next_cursor: Optional[str] = None,
+    status_code: int = 200,
+    headers: Optional[Dict[str, str]] = None
+) -> FastJSONResponse:
+    return FastJSONResponse(success_response(data, message, next_cursor), status_code=status_code, headers=headers)
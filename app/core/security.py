@@ -1,16 +1,201 @@
+import asyncio
+import multiprocessing
+import threading
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
-from jose import JWTError, jwt
+from pathlib import Path
+from typing import Callable, Optional, Tuple
+from fastapi.concurrency import run_in_threadpool
+from jose import JWTError, jwk, jwt
+from jose.backends.base import Key
 from passlib.context import CryptContext
+from app.core.cache import TTLCache
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
+principal_cache = TTLCache(
+    maxsize=settings.PRINCIPAL_CACHE_SIZE,
+    ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS
+)
+
+def _hash_password(password: str) -> str:
+    return pwd_context.hash(password)
+
+def _verify_and_update(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+def _timed_call(function: Callable, *args) -> tuple:
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+class PasswordHasher:
+    def __init__(self, workers: int, max_concurrency: int):
+        self.workers = workers
+        self.max_concurrency = max_concurrency
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._async_slots = None
+        self._metrics_lock = threading.Lock()
+        self.in_flight = 0
+        self.calls = 0
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+        self.run_time_total = 0.0
+    
+    def _get_executor(self) -> Optional[ProcessPoolExecutor]:
+        if self.workers <= 0:
+            return None
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+    
+    def _record(self, elapsed: float, run_time: float) -> None:
+        queue_wait = max(0.0, elapsed - run_time)
+        with self._metrics_lock:
+            self.in_flight -= 1
+            self.calls += 1
+            self.queue_wait_total += queue_wait
+            self.queue_wait_max = max(self.queue_wait_max, queue_wait)
+            self.run_time_total += run_time
+    
+    def _enter(self) -> None:
+        with self._metrics_lock:
+            self.in_flight += 1
+    
+    def run(self, function: Callable, *args):
+        start = time.perf_counter()
+        self._enter()
+        run_time = 0.0
+        try:
+            with self._slots:
+                executor = self._get_executor()
+                if executor is None:
+                    result, run_time = _timed_call(function, *args)
+                else:
+                    result, run_time = executor.submit(_timed_call, function, *args).result()
+            return result
+        finally:
+            self._record(time.perf_counter() - start, run_time)
+    
+    async def run_async(self, function: Callable, *args):
+        if self._async_slots is None:
+            self._async_slots = asyncio.Semaphore(self.max_concurrency)
+        start = time.perf_counter()
+        self._enter()
+        run_time = 0.0
+        try:
+            async with self._async_slots:
+                executor = self._get_executor()
+                if executor is None:
+                    result, run_time = await run_in_threadpool(_timed_call, function, *args)
+                else:
+                    loop = asyncio.get_running_loop()
+                    result, run_time = await loop.run_in_executor(executor, _timed_call, function, *args)
+            return result
+        finally:
+            self._record(time.perf_counter() - start, run_time)
+    
+    def start(self) -> None:
+        executor = self._get_executor()
+        if executor is not None:
+            for future in [executor.submit(_timed_call, len, "") for _ in range(self.workers)]:
+                future.result()
+    
+    def shutdown(self) -> None:
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True, cancel_futures=True)
+                self._executor = None
+    
+    def stats(self) -> dict:
+        with self._metrics_lock:
+            return {
+                "workers": self.workers,
+                "max_concurrency": self.max_concurrency,
+                "in_flight": self.in_flight,
+                "calls": self.calls,
+                "queue_wait_avg_ms": round(self.queue_wait_total * 1000 / self.calls, 3) if self.calls else 0.0,
+                "queue_wait_max_ms": round(self.queue_wait_max * 1000, 3),
+                "hash_time_avg_ms": round(self.run_time_total * 1000 / self.calls, 3) if self.calls else 0.0
+            }
+
+password_hasher = PasswordHasher(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    max_concurrency=settings.PASSWORD_HASH_MAX_CONCURRENCY
+)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return verify_and_update_password(plain_password, hashed_password)[0]
+
+def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return password_hasher.run(_verify_and_update, plain_password, hashed_password)
+
+async def verify_and_update_password_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    return await password_hasher.run_async(_verify_and_update, plain_password, hashed_password)
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return password_hasher.run(_hash_password, password)
+
+async def get_password_hash_async(password: str) -> str:
+    return await password_hasher.run_async(_hash_password, password)
+
+class TokenKeys:
+    def __init__(self, algorithm: str, secret: str, private_key_file: Optional[str] = None, public_key_file: Optional[str] = None):
+        self.algorithm = algorithm
+        self.secret = secret
+        self.private_key_file = private_key_file
+        self.public_key_file = public_key_file
+        self._lock = threading.Lock()
+        self._signing_key = None
+        self._verification_key = None
+    
+    @property
+    def asymmetric(self) -> bool:
+        return not self.algorithm.startswith("HS")
+    
+    def _construct(self, path: str) -> Key:
+        return jwk.construct(Path(path).read_text(), self.algorithm)
+    
+    def signing_key(self) -> Key:
+        if self._signing_key is None:
+            with self._lock:
+                if self._signing_key is None:
+                    if not self.asymmetric:
+                        self._signing_key = jwk.construct(self.secret, self.algorithm)
+                    elif self.private_key_file:
+                        self._signing_key = self._construct(self.private_key_file)
+                    else:
+                        raise RuntimeError(f"JWT_PRIVATE_KEY_FILE es obligatorio para firmar tokens {self.algorithm}")
+        return self._signing_key
+    
+    def verification_key(self) -> Key:
+        if self._verification_key is None:
+            with self._lock:
+                if self._verification_key is None:
+                    if not self.asymmetric:
+                        self._verification_key = jwk.construct(self.secret, self.algorithm)
+                    elif self.public_key_file:
+                        self._verification_key = self._construct(self.public_key_file)
+                    elif self.private_key_file:
+                        self._verification_key = self._construct(self.private_key_file).public_key()
+                    else:
+                        raise RuntimeError(f"JWT_PUBLIC_KEY_FILE es obligatorio para verificar tokens {self.algorithm}")
+        return self._verification_key
+
+token_keys = TokenKeys(
+    settings.ALGORITHM,
+    settings.SECRET_KEY,
+    settings.JWT_PRIVATE_KEY_FILE,
+    settings.JWT_PUBLIC_KEY_FILE
+)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
@@ -18,13 +203,19 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
         expire = datetime.utcnow() + expires_delta
     else:
         expire = datetime.utcnow() + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
-    to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+    to_encode.update({"exp": expire, "iat": round(time.time(), 3), "jti": uuid.uuid4().hex})
+    encoded_jwt = jwt.encode(to_encode, token_keys.signing_key(), algorithm=settings.ALGORITHM)
     return encoded_jwt
 
 def decode_access_token(token: str) -> Optional[dict]:
-    try:
-        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    payload = principal_cache.get(token)
+    if payload is not None:
         return payload
+    try:
+        payload = jwt.decode(token, token_keys.verification_key(), algorithms=[settings.ALGORITHM])
     except JWTError:
         return None
+    ttl = min(payload.get("exp", 0) - time.time(), settings.PRINCIPAL_CACHE_TTL_SECONDS)
+    if ttl > 0:
+        principal_cache.set(token, payload, ttl)
+    return payload
@@ -0,0 +1,109 @@
+import csv
+import io
+import json
+from datetime import date, datetime
+from typing import Any, AsyncIterator, Iterable, Iterator, List, Mapping, Tuple
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+
+CSV_CONTENT_TYPES = ("text/csv", "application/csv")
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+EVENT_STREAM_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+async def iter_lines(request: Request) -> AsyncIterator[str]:
+    buffer = bytearray()
+    async for chunk in request.stream():
+        buffer.extend(chunk)
+        start = 0
+        while True:
+            end = buffer.find(b"\n", start)
+            if end == -1:
+                break
+            yield buffer[start:end].decode("utf-8").rstrip("\r")
+            start = end + 1
+        del buffer[:start]
+    if buffer:
+        yield buffer.decode("utf-8").rstrip("\r")
+
+async def iter_rows(request: Request) -> AsyncIterator[Tuple[int, Any]]:
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type in CSV_CONTENT_TYPES:
+        rows = _iter_csv_rows(request)
+    else:
+        rows = _iter_ndjson_rows(request)
+    async for row in rows:
+        yield row
+
+async def _iter_ndjson_rows(request: Request) -> AsyncIterator[Tuple[int, Any]]:
+    line_number = 0
+    async for line in iter_lines(request):
+        line_number += 1
+        if not line.strip():
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except ValueError:
+            yield line_number, ValueError("JSON inválido")
+
+async def _iter_csv_rows(request: Request) -> AsyncIterator[Tuple[int, Any]]:
+    header = None
+    line_number = 0
+    async for line in iter_lines(request):
+        line_number += 1
+        if not line.strip():
+            continue
+        values = next(csv.reader([line]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        if len(values) != len(header):
+            yield line_number, ValueError("Número de columnas incorrecto")
+            continue
+        yield line_number, {name: value for name, value in zip(header, values) if value != ""}
+
+def _export_value(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, separators=(",", ":"), ensure_ascii=False)
+    return str(value)
+
+def ndjson_chunks(rows: Iterable[Mapping], fields: List[str], batch_size: int) -> Iterator[bytes]:
+    buffer = []
+    for row in rows:
+        buffer.append(json.dumps({field: row[field] for field in fields}, separators=(",", ":"), default=_export_value, ensure_ascii=False))
+        if len(buffer) >= batch_size:
+            yield ("\n".join(buffer) + "\n").encode("utf-8")
+            buffer = []
+    if buffer:
+        yield ("\n".join(buffer) + "\n").encode("utf-8")
+
+def _csv_chunks(rows: Iterable[Mapping], fields: List[str], batch_size: int) -> Iterator[bytes]:
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(fields)
+    pending = 0
+    for row in rows:
+        writer.writerow(["" if row[field] is None else _export_value(row[field]) for field in fields])
+        pending += 1
+        if pending >= batch_size:
+            yield output.getvalue().encode("utf-8")
+            output.seek(0)
+            output.truncate()
+            pending = 0
+    if output.tell():
+        yield output.getvalue().encode("utf-8")
+
+def export_response(rows: Iterable[Mapping], fields: List[str], export_format: str, filename: str, batch_size: int = 1000) -> StreamingResponse:
+    if export_format == "csv":
+        chunks = _csv_chunks(rows, fields, batch_size)
+    else:
+        chunks = ndjson_chunks(rows, fields, batch_size)
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_FORMATS[export_format],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{export_format}"'}
+    )
+
+def event_stream_response(events: AsyncIterator[str]) -> StreamingResponse:
+    return StreamingResponse(events, media_type="text/event-stream", headers=EVENT_STREAM_HEADERS)
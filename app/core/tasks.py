@@ -0,0 +1,34 @@
+import logging
+import threading
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+class PeriodicTask:
+    def __init__(self, name: str, interval: float, target: Callable[[], None]):
+        self.name = name
+        self.interval = interval
+        self.target = target
+        self._stop = threading.Event()
+        self._thread = None
+    
+    def start(self) -> None:
+        if self.interval <= 0 or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+    
+    def stop(self) -> None:
+        if self._thread is None:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+    
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.target()
+            except Exception:
+                logger.exception("Fallo en la tarea periódica %s", self.name)
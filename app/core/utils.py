@@ -1,13 +1,19 @@
-from typing import Any, Dict
+import base64
+import json
+from typing import Any, Callable, Dict, Iterator, List, Optional
 from datetime import datetime
+from pydantic import ValidationError
 
-def success_response(data: Any, message: str = "Operación exitosa") -> Dict:
-    return {
+def success_response(data: Any, message: str = "Operación exitosa", next_cursor: Optional[str] = None) -> Dict:
+    response = {
         "success": True,
         "message": message,
         "data": data,
         "timestamp": datetime.utcnow().isoformat()
     }
+    if next_cursor:
+        response["next_cursor"] = next_cursor
+    return response
 
 def error_response(message: str, details: Any = None) -> Dict:
     response = {
@@ -18,3 +24,50 @@ def error_response(message: str, details: Any = None) -> Dict:
     if details:
         response["details"] = details
     return response
+
+def format_validation_error(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in item['loc']) or 'fila'}: {item['msg']}"
+        for item in error.errors()
+    )
+
+def unique_ids(ids: List[int], limit: int) -> List[int]:
+    unique = list(dict.fromkeys(ids))
+    if len(unique) > limit:
+        raise ValueError(f"Se admiten como máximo {limit} ids distintos por petición")
+    return unique
+
+def chunked(items: List[Any], size: int) -> Iterator[List[Any]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def batch_result(ids: List[int], found: Dict[int, Any], key: str) -> Dict:
+    return {
+        "resultados": [{"id": item_id, "encontrado": item_id in found, key: found.get(item_id)} for item_id in ids],
+        "no_encontrados": [item_id for item_id in ids if item_id not in found]
+    }
+
+def _cursor_default(value: Any) -> str:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+def encode_cursor(values: Dict[str, Any]) -> str:
+    raw = json.dumps(values, separators=(",", ":"), default=_cursor_default)
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, **fields: Callable[[Any], Any]) -> tuple:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        return tuple(convert(values[name]) for name, convert in fields.items())
+    except (ValueError, TypeError, KeyError):
+        raise ValueError("Cursor de paginación inválido")
+
+def build_next_cursor(items: List[Any], limit: int, *fields: str) -> Optional[str]:
+    if not items or len(items) < limit:
+        return None
+    last = items[-1]
+    if isinstance(last, dict):
+        return encode_cursor({field: last[field] for field in fields})
+    return encode_cursor({field: getattr(last, field) for field in fields})
@@ -1,7 +1,20 @@
-from fastapi import FastAPI
+from fastapi import APIRouter, FastAPI
+from fastapi.responses import PlainTextResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.core.config import settings
-from app.core.database import init_db
+from app.core.database import async_engine, async_replica_engines, engine, init_db
+from app.core.metrics import database_metrics, instrument_requests, render_prometheus, route_metrics
+from app.core.profiling import profile_routes
+from app.core.security import password_hasher, principal_cache
+from app.core.tasks import PeriodicTask
+from app.modules.logs.partitions import ensure_log_partitions, maintain_log_storage
+from app.modules.logs.sink import audit_sink
+from app.modules.products.alerts import flush_stock_alerts, stock_alerts
+from app.modules.products.cache import product_cache
+from app.modules.products.changes import product_change_feed, prune_product_changes
+from app.modules.products.search import product_search_index, refresh_search_index
+from app.modules.products.statistics import reconcile_statistics
+from app.modules.users.revocation import sync_token_revocations, token_revocations
 from app.modules.users.controller import router as users_router, auth_router
 from app.modules.products.controller import router as products_router
 from app.modules.logs.controller import router as logs_router
@@ -12,6 +25,37 @@ app = FastAPI(
     description="Inventory Management API with JWT Authentication"
 )
 
+statistics_reconciler = PeriodicTask(
+    "product-statistics-reconciler",
+    settings.STATS_RECONCILE_INTERVAL_SECONDS,
+    reconcile_statistics
+)
+search_refresher = PeriodicTask(
+    "product-search-refresh",
+    settings.PRODUCT_SEARCH_REFRESH_SECONDS,
+    refresh_search_index
+)
+revocation_sync = PeriodicTask(
+    "token-revocation-sync",
+    settings.TOKEN_REVOCATION_SYNC_SECONDS,
+    sync_token_revocations
+)
+stock_alert_flusher = PeriodicTask(
+    "stock-alert-flush",
+    settings.STOCK_ALERT_DEBOUNCE_SECONDS / 2,
+    flush_stock_alerts
+)
+change_log_pruner = PeriodicTask(
+    "product-change-prune",
+    settings.PRODUCT_CHANGES_PRUNE_INTERVAL_SECONDS,
+    prune_product_changes
+)
+log_maintenance = PeriodicTask(
+    "log-maintenance",
+    settings.LOG_MAINTENANCE_INTERVAL_SECONDS,
+    maintain_log_storage
+)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],
@@ -19,10 +63,43 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.middleware("http")(instrument_requests)
 
 @app.on_event("startup")
 def startup_event():
-    init_db()
+    if settings.DB_AUTO_MIGRATE:
+        init_db()
+    ensure_log_partitions()
+    sync_token_revocations()
+    reconcile_statistics(only_if_empty=True)
+    statistics_reconciler.start()
+    revocation_sync.start()
+    log_maintenance.start()
+    search_refresher.start()
+    stock_alert_flusher.start()
+    change_log_pruner.start()
+    password_hasher.start()
+    if settings.AUDIT_ASYNC_ENABLED:
+        audit_sink.start()
+
+@app.on_event("shutdown")
+def shutdown_event():
+    statistics_reconciler.stop()
+    revocation_sync.stop()
+    log_maintenance.stop()
+    search_refresher.stop()
+    stock_alert_flusher.stop()
+    change_log_pruner.stop()
+    stock_alerts.flush(force=True)
+    audit_sink.stop()
+    password_hasher.shutdown()
+
+@app.on_event("shutdown")
+async def dispose_async_engine():
+    if async_engine is not None:
+        await async_engine.dispose()
+    for replica in async_replica_engines:
+        await replica.dispose()
 
 @app.get("/")
 def root():
@@ -36,7 +113,46 @@ def root():
 def health_check():
     return {"status": "healthy"}
 
+def metrics_snapshot() -> dict:
+    return {
+        "principal_cache": principal_cache.stats(),
+        "token_revocations": token_revocations.stats(),
+        "product_cache": product_cache.stats(),
+        "product_search": product_search_index.stats(),
+        "stock_alerts": stock_alerts.stats(),
+        "product_changes": product_change_feed.stats(),
+        "audit_sink": audit_sink.stats(),
+        "database": database_metrics.stats(engine),
+        "password_hashing": password_hasher.stats()
+    }
+
+@app.get("/metrics")
+def metrics():
+    return {**metrics_snapshot(), "routes": route_metrics.stats()}
+
+@app.get("/metrics/prometheus", response_class=PlainTextResponse)
+def prometheus_metrics():
+    return PlainTextResponse(render_prometheus(metrics_snapshot()), media_type="text/plain; version=0.0.4")
+
+def prefer_routes(sync_router: APIRouter, async_router: APIRouter) -> APIRouter:
+    async_routes = {(route.path, frozenset(route.methods)): route for route in async_router.routes}
+    router = APIRouter()
+    for route in sync_router.routes:
+        router.routes.append(async_routes.pop((route.path, frozenset(route.methods)), route))
+    router.routes.extend(async_routes.values())
+    return router
+
+if settings.ASYNC_DB_ENABLED:
+    from app.modules.users.controller_async import router as async_users_router, auth_router as async_auth_router
+    from app.modules.products.controller_async import router as async_products_router
+    from app.modules.logs.controller_async import router as async_logs_router
+    auth_router = prefer_routes(auth_router, async_auth_router)
+    users_router = prefer_routes(users_router, async_users_router)
+    products_router = prefer_routes(products_router, async_products_router)
+    logs_router = prefer_routes(logs_router, async_logs_router)
+
 app.include_router(auth_router, prefix=settings.API_PREFIX)
 app.include_router(users_router, prefix=settings.API_PREFIX)
 app.include_router(products_router, prefix=settings.API_PREFIX)
 app.include_router(logs_router, prefix=settings.API_PREFIX)
+profile_routes(app.routes)
@@ -0,0 +1,88 @@
+import logging
+from typing import List
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect, select, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.sql import func
+
+logger = logging.getLogger(__name__)
+
+ADVISORY_LOCK_ID = 41_013_001
+
+schema_metadata = MetaData()
+schema_migrations = Table(
+    "schema_migrations",
+    schema_metadata,
+    Column("version", Integer, primary_key=True),
+    Column("description", String, nullable=False),
+    Column("applied", DateTime(timezone=True), server_default=func.now())
+)
+
+def has_column(connection: Connection, table_name: str, column_name: str) -> bool:
+    return any(column["name"] == column_name for column in inspect(connection).get_columns(table_name))
+
+def add_column(connection: Connection, table_name: str, column_name: str, definition: str) -> None:
+    if not has_column(connection, table_name, column_name):
+        connection.execute(text(f"ALTER TABLE {table_name} ADD COLUMN {column_name} {definition}"))
+
+def create_index(connection: Connection, name: str, table_name: str, columns: str, where: str = None, using: str = None) -> None:
+    postgresql = connection.dialect.name == "postgresql"
+    concurrently = postgresql and connection.get_isolation_level() == "AUTOCOMMIT"
+    if postgresql:
+        valid = connection.execute(
+            text("SELECT i.indisvalid FROM pg_class c JOIN pg_index i ON i.indexrelid = c.oid WHERE c.relname = :name"),
+            {"name": name}
+        ).scalar()
+        if valid is False:
+            connection.execute(text(f"DROP INDEX {'CONCURRENTLY ' if concurrently else ''}{name}"))
+    statement = f"CREATE INDEX {'CONCURRENTLY ' if concurrently else ''}IF NOT EXISTS {name} ON {table_name} {f'USING {using} ' if using else ''}({columns})"
+    if where:
+        statement += f" WHERE {where}"
+    connection.execute(text(statement))
+
+def _migrations() -> list:
+    from app.migrations import (
+        m0001_baseline, m0002_product_versions, m0003_query_indexes, m0004_log_partitions, m0005_product_search,
+        m0006_token_revocations, m0007_reorder_points, m0008_product_changes,
+        m0009_log_rollups, m0010_structured_logs, m0011_user_versions
+    )
+    return [
+        m0001_baseline, m0002_product_versions, m0003_query_indexes, m0004_log_partitions, m0005_product_search,
+        m0006_token_revocations, m0007_reorder_points, m0008_product_changes,
+        m0009_log_rollups, m0010_structured_logs, m0011_user_versions
+    ]
+
+def applied_versions(engine: Engine) -> List[int]:
+    with engine.begin() as connection:
+        schema_migrations.create(connection, checkfirst=True)
+        return sorted(connection.scalars(select(schema_migrations.c.version)))
+
+def _apply(engine: Engine, migration) -> None:
+    if getattr(migration, "TRANSACTIONAL", True):
+        with engine.begin() as connection:
+            migration.upgrade(connection)
+            connection.execute(schema_migrations.insert().values(version=migration.VERSION, description=migration.DESCRIPTION))
+        return
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        migration.upgrade(connection)
+        connection.execute(schema_migrations.insert().values(version=migration.VERSION, description=migration.DESCRIPTION))
+
+def run_migrations(engine: Engine) -> List[int]:
+    with engine.connect() as lock_connection:
+        postgresql = lock_connection.dialect.name == "postgresql"
+        if postgresql:
+            lock_connection.execute(text("SELECT pg_advisory_lock(:id)"), {"id": ADVISORY_LOCK_ID})
+            lock_connection.commit()
+        try:
+            applied = set(applied_versions(engine))
+            done = []
+            for migration in _migrations():
+                if migration.VERSION in applied:
+                    continue
+                logger.info("Applying migration %04d: %s", migration.VERSION, migration.DESCRIPTION)
+                _apply(engine, migration)
+                done.append(migration.VERSION)
+            return done
+        finally:
+            if postgresql:
+                lock_connection.execute(text("SELECT pg_advisory_unlock(:id)"), {"id": ADVISORY_LOCK_ID})
+                lock_connection.commit()
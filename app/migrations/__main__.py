@@ -0,0 +1,9 @@
+import logging
+from app.core.database import engine
+from app.migrations import applied_versions, run_migrations
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    applied = run_migrations(engine)
+    print(f"Migraciones aplicadas: {applied or 'ninguna'}")
+    print(f"Versión actual del esquema: {max(applied_versions(engine), default=0)}")
@@ -0,0 +1,11 @@
+from sqlalchemy.engine import Connection
+from app.core.database import Base
+from app.modules.logs.models import Log
+from app.modules.products.models import Product
+from app.modules.users.models import User
+
+VERSION = 1
+DESCRIPTION = "Tablas base de usuarios, productos y logs"
+
+def upgrade(connection: Connection) -> None:
+    Base.metadata.create_all(connection, tables=[User.__table__, Product.__table__, Log.__table__])
@@ -0,0 +1,11 @@
+from sqlalchemy.engine import Connection
+from app.migrations import add_column
+from app.modules.products.models import ProductCategoryStats
+
+VERSION = 2
+DESCRIPTION = "Estadísticas por categoría y columnas de versión de productos"
+
+def upgrade(connection: Connection) -> None:
+    ProductCategoryStats.__table__.create(connection, checkfirst=True)
+    add_column(connection, "product_category_stats", "version", "BIGINT NOT NULL DEFAULT 1")
+    add_column(connection, "products", "version", "INTEGER NOT NULL DEFAULT 1")
@@ -0,0 +1,11 @@
+from sqlalchemy.engine import Connection
+from app.migrations import create_index
+
+VERSION = 3
+DESCRIPTION = "Índices para listados de logs por usuario y fecha, y productos por categoría"
+TRANSACTIONAL = False
+
+def upgrade(connection: Connection) -> None:
+    create_index(connection, "ix_logs_user_id_created_id", "logs", "user_id, created DESC, id DESC")
+    create_index(connection, "ix_logs_created_id", "logs", "created DESC, id DESC")
+    create_index(connection, "ix_products_category_id", "products", "category, id")
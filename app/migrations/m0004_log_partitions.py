@@ -0,0 +1,38 @@
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from app.core.config import settings
+from app.migrations import create_index
+from app.modules.logs.partitions import DEFAULT_PARTITION, ensure_partitions, is_partitioned, month_start
+
+VERSION = 4
+DESCRIPTION = "Particionado mensual de logs en PostgreSQL"
+
+def upgrade(connection: Connection) -> None:
+    if connection.dialect.name != "postgresql" or is_partitioned(connection):
+        return
+    sequence = connection.execute(text("SELECT pg_get_serial_sequence('logs', 'id')")).scalar()
+    connection.execute(text("ALTER TABLE logs RENAME TO logs_unpartitioned"))
+    connection.execute(text("ALTER TABLE logs_unpartitioned RENAME CONSTRAINT logs_pkey TO logs_unpartitioned_pkey"))
+    for index in ("ix_logs_id", "ix_logs_user_id_created_id", "ix_logs_created_id"):
+        connection.execute(text(f"DROP INDEX IF EXISTS {index}"))
+    connection.execute(text(f"""
+        CREATE TABLE logs (
+            id INTEGER NOT NULL DEFAULT nextval('{sequence}'::regclass),
+            user_id INTEGER NOT NULL REFERENCES users (id) ON DELETE CASCADE,
+            action VARCHAR NOT NULL,
+            created TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT now(),
+            updated TIMESTAMP WITH TIME ZONE,
+            PRIMARY KEY (id, created)
+        ) PARTITION BY RANGE (created)
+    """))
+    connection.execute(text(f"ALTER SEQUENCE {sequence} OWNED BY logs.id"))
+    connection.execute(text(f"CREATE TABLE {DEFAULT_PARTITION} PARTITION OF logs DEFAULT"))
+    first = connection.execute(text("SELECT MIN(created) FROM logs_unpartitioned")).scalar()
+    ensure_partitions(connection, month_start(first) if first else None, settings.LOG_PARTITION_PREMAKE_MONTHS)
+    connection.execute(text(
+        "INSERT INTO logs (id, user_id, action, created, updated) "
+        "SELECT id, user_id, action, COALESCE(created, now()), updated FROM logs_unpartitioned"
+    ))
+    connection.execute(text("DROP TABLE logs_unpartitioned"))
+    create_index(connection, "ix_logs_user_id_created_id", "logs", "user_id, created DESC, id DESC")
+    create_index(connection, "ix_logs_created_id", "logs", "created DESC, id DESC")
@@ -0,0 +1,21 @@
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+from app.migrations import add_column, create_index
+
+VERSION = 5
+DESCRIPTION = "Búsqueda de texto completo y por trigramas sobre productos"
+TRANSACTIONAL = False
+
+def upgrade(connection: Connection) -> None:
+    if connection.dialect.name != "postgresql":
+        return
+    connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    add_column(
+        connection, "products", "search_vector",
+        "tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('simple', coalesce(name, '')), 'A') || "
+        "setweight(to_tsvector('simple', coalesce(category, '')), 'B')) STORED"
+    )
+    add_column(connection, "products", "search_text", "text GENERATED ALWAYS AS (lower(name || ' ' || category)) STORED")
+    create_index(connection, "ix_products_search_vector", "products", "search_vector", using="gin")
+    create_index(connection, "ix_products_search_text", "products", "search_text gin_trgm_ops", using="gin")
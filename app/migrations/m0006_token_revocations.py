@@ -0,0 +1,8 @@
+from sqlalchemy.engine import Connection
+from app.modules.users.models import TokenRevocation
+
+VERSION = 6
+DESCRIPTION = "Revocación de tokens por jti y por usuario"
+
+def upgrade(connection: Connection) -> None:
+    TokenRevocation.__table__.create(connection, checkfirst=True)
@@ -0,0 +1,14 @@
+from sqlalchemy.engine import Connection
+from app.migrations import add_column, create_index
+from app.modules.products.models import CategoryReorderPoint
+
+VERSION = 7
+DESCRIPTION = "Puntos de pedido por producto y categoría con índice parcial de stock bajo"
+TRANSACTIONAL = False
+
+def upgrade(connection: Connection) -> None:
+    CategoryReorderPoint.__table__.create(connection, checkfirst=True)
+    add_column(connection, "products", "reorder_point", "INTEGER")
+    add_column(connection, "products", "reorder_level", "INTEGER")
+    create_index(connection, "ix_products_low_stock", "products", "id", where="stock <= reorder_level")
+    create_index(connection, "ix_products_low_stock_category", "products", "category, id", where="stock <= reorder_level")
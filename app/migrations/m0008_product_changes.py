@@ -0,0 +1,8 @@
+from sqlalchemy.engine import Connection
+from app.modules.products.models import ProductChange
+
+VERSION = 8
+DESCRIPTION = "Registro de cambios de productos para el feed de eventos"
+
+def upgrade(connection: Connection) -> None:
+    ProductChange.__table__.create(connection, checkfirst=True)
@@ -0,0 +1,9 @@
+from sqlalchemy.engine import Connection
+from app.modules.logs.models import LogEntityRollupDaily, LogRollupDaily, LogRollupHourly
+
+VERSION = 9
+DESCRIPTION = "Agregados horarios y diarios de logs de auditoría"
+
+def upgrade(connection: Connection) -> None:
+    for model in (LogRollupHourly, LogRollupDaily, LogEntityRollupDaily):
+        model.__table__.create(connection, checkfirst=True)
@@ -0,0 +1,45 @@
+from sqlalchemy import bindparam, select, update
+from sqlalchemy.engine import Connection
+from app.migrations import add_column, create_index
+from app.modules.logs.actions import classify_action, parse_changes
+from app.modules.logs.models import Log
+
+VERSION = 10
+DESCRIPTION = "Campos estructurados de auditoría con índice de historial por entidad"
+BACKFILL_BATCH_SIZE = 1000
+
+def backfill(connection: Connection) -> int:
+    logs = Log.__table__
+    statement = update(logs).where(logs.c.id == bindparam("log_id")).values(
+        action_type=bindparam("action_type"),
+        entity_type=bindparam("entity_type"),
+        entity_id=bindparam("entity_id"),
+        changes=bindparam("changes", type_=logs.c.changes.type)
+    )
+    last_id, total = 0, 0
+    while True:
+        rows = connection.execute(
+            select(logs.c.id, logs.c.user_id, logs.c.action)
+            .where(logs.c.id > last_id, logs.c.action_type.is_(None))
+            .order_by(logs.c.id)
+            .limit(BACKFILL_BATCH_SIZE)
+        ).all()
+        if not rows:
+            return total
+        values = []
+        for row in rows:
+            kind = classify_action(row.action, row.user_id)
+            values.append({"log_id": row.id, **kind._asdict(), "changes": parse_changes(row.action, kind.action_type)})
+        connection.execute(statement, values)
+        last_id = rows[-1].id
+        total += len(rows)
+
+def upgrade(connection: Connection) -> None:
+    add_column(connection, "logs", "action_type", "VARCHAR")
+    add_column(connection, "logs", "entity_type", "VARCHAR")
+    add_column(connection, "logs", "entity_id", "INTEGER")
+    add_column(connection, "logs", "changes", "JSON")
+    backfill(connection)
+    create_index(
+        connection, "ix_logs_entity_created_id", "logs", "entity_type, entity_id, created DESC, id DESC", where="entity_id IS NOT NULL"
+    )
@@ -0,0 +1,8 @@
+from sqlalchemy.engine import Connection
+from app.migrations import add_column
+
+VERSION = 11
+DESCRIPTION = "Columna de versión de usuarios para las ETag"
+
+def upgrade(connection: Connection) -> None:
+    add_column(connection, "users", "version", "INTEGER NOT NULL DEFAULT 1")
@@ -0,0 +1,110 @@
+import re
+from enum import Enum
+from typing import Any, Dict, Mapping, NamedTuple, Optional
+
+ENTITY_ID = re.compile(r"\(ID: (\d+)")
+PRODUCT_CREATED = re.compile(r"^Producto creado: (.*) \(Categoría: (.*), Stock: (\d+)\)$")
+STOCK_ADJUSTED = re.compile(r"\): ([+-]\d+), stock actual (\d+)$")
+UPDATED_FIELD = re.compile(
+    r"(?:^|, )(?:(?P<text>nombre|categoría|email) a '(?P<text_value>.*?)'|(?P<price>precio) a \$(?P<price_value>[\d.]+)"
+    r"|(?P<count>stock|punto de pedido) a (?P<count_value>\d+|el de la categoría)|(?P<secret>contraseña))(?=, |$)"
+)
+FIELD_NAMES = {
+    "nombre": "name",
+    "categoría": "category",
+    "email": "email",
+    "precio": "price",
+    "stock": "stock",
+    "punto de pedido": "reorder_point",
+    "contraseña": "password",
+}
+REDACTED = "***"
+REDACTED_FIELDS = {"password"}
+
+class ActionType(str, Enum):
+    CREATE = "create"
+    UPDATE = "update"
+    DELETE = "delete"
+    STOCK_ADJUST = "stock_adjust"
+    STOCK_ADJUST_BATCH = "stock_adjust_batch"
+    BULK_CREATE = "bulk_create"
+    BULK_UPDATE = "bulk_update"
+    REORDER_POINT = "reorder_point"
+    REGISTER = "register"
+    LOGIN = "login"
+    LOGOUT = "logout"
+    OTHER = "other"
+
+class EntityType(str, Enum):
+    PRODUCT = "product"
+    USER = "user"
+    CATEGORY = "category"
+    OTHER = "other"
+
+class LogAction(NamedTuple):
+    action_type: str
+    entity_type: str
+    entity_id: Optional[int]
+
+def product_action(action_type: ActionType, product_id: Optional[int]) -> LogAction:
+    return LogAction(action_type.value, EntityType.PRODUCT.value, product_id)
+
+def user_action(action_type: ActionType, user_id: int) -> LogAction:
+    return LogAction(action_type.value, EntityType.USER.value, user_id)
+
+def redact(changes: Mapping[str, Any]) -> Dict[str, Any]:
+    return {field: REDACTED if field in REDACTED_FIELDS else value for field, value in changes.items()}
+
+ACTION_PREFIXES = (
+    ("Producto creado", ActionType.CREATE, EntityType.PRODUCT),
+    ("Producto actualizado", ActionType.UPDATE, EntityType.PRODUCT),
+    ("Producto eliminado", ActionType.DELETE, EntityType.PRODUCT),
+    ("Stock ajustado", ActionType.STOCK_ADJUST, EntityType.PRODUCT),
+    ("Ajuste masivo de stock", ActionType.STOCK_ADJUST_BATCH, EntityType.PRODUCT),
+    ("Importación masiva de productos", ActionType.BULK_CREATE, EntityType.PRODUCT),
+    ("Actualización masiva de productos", ActionType.BULK_UPDATE, EntityType.PRODUCT),
+    ("Punto de pedido de la categoría", ActionType.REORDER_POINT, EntityType.CATEGORY),
+    ("Usuario registrado", ActionType.REGISTER, EntityType.USER),
+    ("Inicio de sesión", ActionType.LOGIN, EntityType.USER),
+    ("Cierre de sesión", ActionType.LOGOUT, EntityType.USER),
+    ("Usuario actualizado", ActionType.UPDATE, EntityType.USER),
+    ("Usuario eliminado", ActionType.DELETE, EntityType.USER),
+)
+SELF_ACTIONS = {ActionType.REGISTER, ActionType.LOGIN, ActionType.LOGOUT}
+
+def classify_action(action: str, user_id: int) -> LogAction:
+    for prefix, action_type, entity_type in ACTION_PREFIXES:
+        if action.startswith(prefix):
+            if entity_type == EntityType.USER and action_type in SELF_ACTIONS:
+                return user_action(action_type, user_id)
+            match = ENTITY_ID.search(action)
+            return LogAction(action_type.value, entity_type.value, int(match.group(1)) if match else None)
+    return LogAction(ActionType.OTHER.value, EntityType.OTHER.value, None)
+
+def log_action(row: Mapping[str, Any]) -> LogAction:
+    if row.get("action_type") is not None:
+        return LogAction(row["action_type"], row["entity_type"], row["entity_id"])
+    return classify_action(row["action"], row["user_id"])
+
+def _field_value(field: str, value: str) -> Any:
+    if field in ("stock", "reorder_point"):
+        return int(value) if value.isdigit() else None
+    return value
+
+def parse_changes(action: str, action_type: str) -> Optional[Dict[str, Any]]:
+    if action_type == ActionType.CREATE and action.startswith("Producto creado"):
+        match = PRODUCT_CREATED.match(action)
+        if match:
+            return {"name": match.group(1), "category": match.group(2), "stock": int(match.group(3))}
+    if action_type == ActionType.STOCK_ADJUST:
+        match = STOCK_ADJUSTED.search(action)
+        if match:
+            return {"delta": int(match.group(1)), "stock": int(match.group(2))}
+    if action_type == ActionType.UPDATE and "): cambió " in action:
+        changes = {}
+        for match in UPDATED_FIELD.finditer(action.split("): cambió ", 1)[1]):
+            field = FIELD_NAMES[match.group("text") or match.group("price") or match.group("count") or match.group("secret")]
+            value = match.group("text_value") or match.group("price_value") or match.group("count_value")
+            changes[field] = REDACTED if field in REDACTED_FIELDS else _field_value(field, value)
+        return changes or None
+    return None
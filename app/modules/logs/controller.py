@@ -1,10 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from app.core.database import get_db
-from app.core.utils import success_response
+from typing import Optional
+from datetime import datetime
+from app.core.config import settings
+from app.core.database import get_db, iterate_in_session
+from app.core.streaming import EXPORT_FORMATS, export_response
+from app.core.responses import fast_success_response
+from app.core.utils import success_response, build_next_cursor
 from app.modules.logs.service import LogService
+from app.modules.logs.schemas import LogResponse
 from app.modules.users.controller import get_current_user
-from app.modules.users.schemas import UserResponse
+from app.modules.users.schemas import Principal
 
 router = APIRouter(prefix="/logs", tags=["Logs"])
 
@@ -12,13 +18,72 @@ router = APIRouter(prefix="/logs", tags=["Logs"])
 def get_all_logs(
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: UserResponse = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     try:
         service = LogService(db)
-        logs = service.get_all_logs(skip, limit)
-        return success_response([log.model_dump() for log in logs], "Logs obtenidos exitosamente")
+        logs = service.get_all_logs(skip, limit, cursor)
+        return fast_success_response(
+            logs,
+            "Logs obtenidos exitosamente",
+            build_next_cursor(logs, limit, "created", "id")
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+@router.get("/export")
+def export_logs(
+    format: str = "ndjson",
+    user_id: Optional[int] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    current_user: Principal = Depends(get_current_user)
+):
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Formato de exportación no soportado")
+    rows = iterate_in_session(
+        lambda db: LogService(db).export_logs(user_id, date_from, date_to, settings.EXPORT_BATCH_SIZE)
+    )
+    return export_response(rows, list(LogResponse.model_fields), format, "logs", settings.EXPORT_BATCH_SIZE)
+
+@router.get("/statistics", response_model=dict)
+def get_log_statistics(
+    exact: bool = False,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    try:
+        service = LogService(db)
+        return success_response(service.get_statistics(exact), "Estadísticas de logs obtenidas exitosamente")
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+@router.get("/stats", response_model=dict)
+def get_activity_stats(
+    bucket: str = "day",
+    group_by: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    user_id: Optional[int] = None,
+    action_type: Optional[str] = None,
+    entity_type: Optional[str] = None,
+    entity_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    try:
+        service = LogService(db)
+        stats = service.get_activity_stats(
+            bucket, group_by, date_from, date_to,
+            user_id=user_id, action_type=action_type, entity_type=entity_type, entity_id=entity_id
+        )
+        return success_response(stats, "Estadísticas de actividad obtenidas exitosamente")
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
@@ -27,12 +92,19 @@ def get_logs_by_user(
     user_id: int,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: UserResponse = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     try:
         service = LogService(db)
-        logs = service.get_logs_by_user(user_id, skip, limit)
-        return success_response([log.model_dump() for log in logs], "Logs del usuario obtenidos exitosamente")
+        logs = service.get_logs_by_user(user_id, skip, limit, cursor)
+        return fast_success_response(
+            logs,
+            "Logs del usuario obtenidos exitosamente",
+            build_next_cursor(logs, limit, "created", "id")
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
@@ -0,0 +1,80 @@
+from fastapi import APIRouter, Depends, HTTPException, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from datetime import datetime
+from app.core.database import get_async_db
+from app.core.responses import fast_success_response
+from app.core.utils import build_next_cursor, success_response
+from app.modules.logs.service_async import AsyncLogService
+from app.modules.users.controller import get_current_user
+from app.modules.users.schemas import Principal
+
+router = APIRouter(prefix="/logs", tags=["Logs"])
+
+@router.get("/", response_model=dict)
+async def get_all_logs(
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    try:
+        service = AsyncLogService(db)
+        logs = await service.get_all_logs(skip, limit, cursor)
+        return fast_success_response(
+            logs,
+            "Logs obtenidos exitosamente",
+            build_next_cursor(logs, limit, "created", "id")
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+@router.get("/stats", response_model=dict)
+async def get_activity_stats(
+    bucket: str = "day",
+    group_by: Optional[str] = None,
+    date_from: Optional[datetime] = None,
+    date_to: Optional[datetime] = None,
+    user_id: Optional[int] = None,
+    action_type: Optional[str] = None,
+    entity_type: Optional[str] = None,
+    entity_id: Optional[int] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    try:
+        service = AsyncLogService(db)
+        stats = await service.get_activity_stats(
+            bucket, group_by, date_from, date_to,
+            user_id=user_id, action_type=action_type, entity_type=entity_type, entity_id=entity_id
+        )
+        return success_response(stats, "Estadísticas de actividad obtenidas exitosamente")
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+
+@router.get("/user/{user_id}", response_model=dict)
+async def get_logs_by_user(
+    user_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    try:
+        service = AsyncLogService(db)
+        logs = await service.get_logs_by_user(user_id, skip, limit, cursor)
+        return fast_success_response(
+            logs,
+            "Logs del usuario obtenidos exitosamente",
+            build_next_cursor(logs, limit, "created", "id")
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
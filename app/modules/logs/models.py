@@ -1,4 +1,5 @@
-from sqlalchemy import Column, String, DateTime, Integer, ForeignKey
+from sqlalchemy import BigInteger, Column, String, DateTime, Integer, ForeignKey, Index, JSON
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.sql import func
 from app.core.database import Base
 
@@ -8,5 +9,61 @@ class Log(Base):
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False)
     action = Column(String, nullable=False)
-    created = Column(DateTime(timezone=True), server_default=func.now())
+    action_type = Column(String)
+    entity_type = Column(String)
+    entity_id = Column(Integer)
+    changes = Column(JSON(none_as_null=True))
+    created = Column(
+        DateTime(timezone=True).with_variant(sqlite.DATETIME(truncate_microseconds=True), "sqlite"),
+        server_default=func.now()
+    )
     updated = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    __table_args__ = (
+        Index("ix_logs_user_id_created_id", user_id, created.desc(), id.desc()),
+        Index("ix_logs_created_id", created.desc(), id.desc()),
+        Index(
+            "ix_logs_entity_created_id", entity_type, entity_id, created.desc(), id.desc(),
+            sqlite_where=entity_id.isnot(None),
+            postgresql_where=entity_id.isnot(None)
+        ),
+    )
+
+class LogRollupHourly(Base):
+    __tablename__ = "log_rollups_hourly"
+    
+    bucket = Column(DateTime(timezone=True), primary_key=True)
+    user_id = Column(Integer, primary_key=True)
+    entity_type = Column(String, primary_key=True)
+    action_type = Column(String, primary_key=True)
+    total = Column(BigInteger, nullable=False, default=0)
+    
+    __table_args__ = (
+        Index("ix_log_rollups_hourly_user_bucket", user_id, bucket),
+    )
+
+class LogRollupDaily(Base):
+    __tablename__ = "log_rollups_daily"
+    
+    bucket = Column(DateTime(timezone=True), primary_key=True)
+    user_id = Column(Integer, primary_key=True)
+    entity_type = Column(String, primary_key=True)
+    action_type = Column(String, primary_key=True)
+    total = Column(BigInteger, nullable=False, default=0)
+    
+    __table_args__ = (
+        Index("ix_log_rollups_daily_user_bucket", user_id, bucket),
+    )
+
+class LogEntityRollupDaily(Base):
+    __tablename__ = "log_entity_rollups_daily"
+    
+    bucket = Column(DateTime(timezone=True), primary_key=True)
+    entity_type = Column(String, primary_key=True)
+    entity_id = Column(Integer, primary_key=True)
+    action_type = Column(String, primary_key=True)
+    total = Column(BigInteger, nullable=False, default=0)
+    
+    __table_args__ = (
+        Index("ix_log_entity_rollups_daily_entity_bucket", entity_type, entity_id, bucket),
+    )
@@ -0,0 +1,168 @@
+import gzip
+import logging
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Optional
+from sqlalchemy import func, select, text
+from sqlalchemy.engine import Connection
+from app.core.config import settings
+from app.core.database import engine
+from app.core.streaming import ndjson_chunks
+from app.modules.logs.models import Log
+from app.modules.logs.rollups import prune_hourly_rollups
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_FIELDS = ["id", "user_id", "action", "action_type", "entity_type", "entity_id", "changes", "created", "updated"]
+DEFAULT_PARTITION = "logs_default"
+
+def month_start(value: datetime) -> datetime:
+    return datetime(value.year, value.month, 1, tzinfo=timezone.utc)
+
+def add_months(month: datetime, count: int) -> datetime:
+    index = month.year * 12 + month.month - 1 + count
+    return datetime(index // 12, index % 12 + 1, 1, tzinfo=timezone.utc)
+
+def current_month() -> datetime:
+    return month_start(datetime.now(timezone.utc))
+
+def partition_name(month: datetime) -> str:
+    return f"logs_p{month:%Y%m}"
+
+def _bound(month: datetime) -> str:
+    return f"{month:%Y-%m-%d} 00:00:00+00"
+
+def is_partitioned(connection: Connection) -> bool:
+    if connection.dialect.name != "postgresql":
+        return False
+    return connection.execute(
+        text("SELECT EXISTS (SELECT 1 FROM pg_partitioned_table WHERE partrelid = to_regclass('logs'))")
+    ).scalar()
+
+def list_partitions(connection: Connection) -> List[datetime]:
+    if is_partitioned(connection):
+        names = connection.scalars(text(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = 'logs'::regclass"
+        ))
+        return sorted(
+            datetime.strptime(name[len("logs_p"):], "%Y%m").replace(tzinfo=timezone.utc)
+            for name in names if name.startswith("logs_p")
+        )
+    first = connection.execute(select(func.min(Log.created))).scalar()
+    if first is None:
+        return []
+    months, month, last = [], month_start(first), current_month()
+    while month <= last:
+        end = add_months(month, 1)
+        if connection.execute(select(Log.id).where(Log.created >= month, Log.created < end).limit(1)).first():
+            months.append(month)
+        month = end
+    return months
+
+def create_partition(connection: Connection, month: datetime) -> None:
+    name = partition_name(month)
+    bounds = {"start": _bound(month), "end": _bound(add_months(month, 1))}
+    connection.execute(text(f"CREATE TABLE IF NOT EXISTS {name} (LIKE logs INCLUDING DEFAULTS)"))
+    connection.execute(text(
+        f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} "
+        f"WHERE created >= CAST(:start AS timestamptz) AND created < CAST(:end AS timestamptz) RETURNING *) "
+        f"INSERT INTO {name} SELECT * FROM moved"
+    ), bounds)
+    connection.execute(text(
+        f"ALTER TABLE logs ATTACH PARTITION {name} FOR VALUES FROM ('{bounds['start']}') TO ('{bounds['end']}')"
+    ))
+
+def ensure_partitions(connection: Connection, first: Optional[datetime] = None, months_ahead: int = 3) -> List[str]:
+    if not is_partitioned(connection):
+        return []
+    existing = set(list_partitions(connection))
+    month, last = first or current_month(), add_months(current_month(), months_ahead)
+    created = []
+    while month <= last:
+        if month not in existing:
+            create_partition(connection, month)
+            created.append(partition_name(month))
+        month = add_months(month, 1)
+    return created
+
+def archive_rows(connection: Connection, path: Path, start: Optional[datetime], end: datetime) -> int:
+    statement = select(*(getattr(Log, field) for field in ARCHIVE_FIELDS)).where(Log.created < end).order_by(Log.created, Log.id)
+    if start is not None:
+        statement = statement.where(Log.created >= start)
+    rows = connection.execute(statement.execution_options(yield_per=settings.EXPORT_BATCH_SIZE)).mappings()
+    path.parent.mkdir(parents=True, exist_ok=True)
+    pending = path.with_name(path.name + ".tmp")
+    written = 0
+    with gzip.open(pending, "wb") as archive:
+        for chunk in ndjson_chunks(rows, ARCHIVE_FIELDS, settings.EXPORT_BATCH_SIZE):
+            archive.write(chunk)
+            written += chunk.count(b"\n")
+    if written:
+        os.replace(pending, path)
+    else:
+        pending.unlink()
+    return written
+
+def apply_retention(connection: Connection, retention_months: int, archive_dir: Optional[str] = None) -> List[str]:
+    if retention_months <= 0:
+        return []
+    cutoff = add_months(current_month(), -retention_months)
+    partitioned = is_partitioned(connection)
+    removed = []
+    for month in list_partitions(connection):
+        if month >= cutoff:
+            continue
+        end = add_months(month, 1)
+        if archive_dir:
+            archived = archive_rows(connection, Path(archive_dir) / f"{partition_name(month)}.ndjson.gz", month, end)
+            logger.info("Archivados %s logs de %s", archived, f"{month:%Y-%m}")
+        if partitioned:
+            connection.execute(text(f"ALTER TABLE logs DETACH PARTITION {partition_name(month)}"))
+            connection.execute(text(f"DROP TABLE {partition_name(month)}"))
+        else:
+            connection.execute(Log.__table__.delete().where(Log.created >= month, Log.created < end))
+        removed.append(partition_name(month))
+    if partitioned:
+        stale = connection.execute(
+            text(f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE created < CAST(:cutoff AS timestamptz))"),
+            {"cutoff": _bound(cutoff)}
+        ).scalar()
+        if stale:
+            if archive_dir:
+                archive_rows(connection, Path(archive_dir) / f"{DEFAULT_PARTITION}_{cutoff:%Y%m}.ndjson.gz", None, cutoff)
+            connection.execute(
+                text(f"DELETE FROM {DEFAULT_PARTITION} WHERE created < CAST(:cutoff AS timestamptz)"),
+                {"cutoff": _bound(cutoff)}
+            )
+    return removed
+
+def approximate_count(connection: Connection) -> Optional[int]:
+    if connection.dialect.name == "postgresql":
+        estimate = connection.execute(text(
+            "SELECT COALESCE(SUM(GREATEST(c.reltuples, 0)), 0)::bigint FROM pg_class c "
+            "WHERE c.oid = 'logs'::regclass OR c.oid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = 'logs'::regclass)"
+        )).scalar()
+        return estimate or None
+    if connection.dialect.name == "sqlite":
+        if not connection.execute(text("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'")).first():
+            return None
+        stat = connection.execute(text("SELECT stat FROM sqlite_stat1 WHERE tbl = 'logs' LIMIT 1")).scalar()
+        return int(stat.split()[0]) if stat else None
+    return None
+
+def ensure_log_partitions() -> List[str]:
+    with engine.begin() as connection:
+        return ensure_partitions(connection, months_ahead=settings.LOG_PARTITION_PREMAKE_MONTHS)
+
+def maintain_log_storage() -> dict:
+    with engine.begin() as connection:
+        created = ensure_partitions(connection, months_ahead=settings.LOG_PARTITION_PREMAKE_MONTHS)
+        removed = apply_retention(
+            connection,
+            settings.LOG_RETENTION_MONTHS,
+            settings.LOG_ARCHIVE_DIR if settings.LOG_ARCHIVE_ENABLED else None
+        )
+        pruned = prune_hourly_rollups(connection)
+    return {"creadas": created, "eliminadas": removed, "agregados_horarios_eliminados": pruned}
@@ -1,27 +1,97 @@
+from sqlalchemy import insert, select, tuple_
 from sqlalchemy.orm import Session
-from typing import Optional, List
+from typing import Iterator, Mapping, Optional, List, Tuple
+from datetime import datetime, timezone
+from app.modules.logs.actions import log_action
 from app.modules.logs.models import Log
-from app.modules.logs.schemas import LogCreate
+from app.modules.logs.partitions import approximate_count, list_partitions
+from app.modules.logs.rollups import RollupDelta, stats_statement
+from app.modules.logs.schemas import LogCreate, LogResponse
+from app.core.database import replica_read
+from app.core.responses import response_columns
+
+LOG_COLUMNS = response_columns(Log, LogResponse)
+
+def stamp_logs(logs: List[dict]) -> RollupDelta:
+    now = datetime.now(timezone.utc)
+    for log in logs:
+        if log.get("created") is None:
+            log["created"] = now
+        log["action_type"], log["entity_type"], log["entity_id"] = log_action(log)
+        log.setdefault("changes", None)
+    delta = RollupDelta()
+    delta.add_rows(logs)
+    return delta
 
 class LogRepository:
     def __init__(self, db: Session):
         self.db = db
     
     def create(self, log: LogCreate) -> Log:
-        db_log = Log(**log.model_dump())
-        self.db.add(db_log)
+        db_log = self.add(log)
         self.db.commit()
-        self.db.refresh(db_log)
         return db_log
     
+    def add(self, log: LogCreate) -> Log:
+        values = log.model_dump()
+        stamp_logs([values]).apply(self.db)
+        db_log = Log(**values)
+        self.db.add(db_log)
+        return db_log
+    
+    def bulk_create(self, logs: List[dict]) -> None:
+        delta = stamp_logs(logs)
+        self.db.execute(insert(Log), logs)
+        delta.apply(self.db)
+        self.db.commit()
+    
+    @replica_read
+    def get_entity_history(
+        self,
+        entity_type: str,
+        entity_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[Tuple[datetime, int]] = None
+    ) -> List:
+        query = self.db.query(*LOG_COLUMNS).filter(Log.entity_type == entity_type, Log.entity_id == entity_id)
+        return self._paginate(query, skip, limit, after)
+    
     def get_by_id(self, log_id: int) -> Optional[Log]:
         return self.db.query(Log).filter(Log.id == log_id).first()
     
-    def get_all(self, skip: int = 0, limit: int = 100) -> List[Log]:
-        return self.db.query(Log).order_by(Log.created.desc()).offset(skip).limit(limit).all()
+    def _paginate(self, query, skip: int, limit: int, after: Optional[Tuple[datetime, int]]) -> List:
+        query = query.order_by(Log.created.desc(), Log.id.desc())
+        if after is not None:
+            return query.filter(tuple_(Log.created, Log.id) < after).limit(limit).all()
+        return query.offset(skip).limit(limit).all()
+    
+    @replica_read
+    def get_all(self, skip: int = 0, limit: int = 100, after: Optional[Tuple[datetime, int]] = None) -> List:
+        return self._paginate(self.db.query(*LOG_COLUMNS), skip, limit, after)
+    
+    @replica_read
+    def get_by_user_id(self, user_id: int, skip: int = 0, limit: int = 100, after: Optional[Tuple[datetime, int]] = None) -> List:
+        query = self.db.query(*LOG_COLUMNS).filter(Log.user_id == user_id)
+        return self._paginate(query, skip, limit, after)
     
-    def get_by_user_id(self, user_id: int, skip: int = 0, limit: int = 100) -> List[Log]:
-        return self.db.query(Log).filter(Log.user_id == user_id).order_by(Log.created.desc()).offset(skip).limit(limit).all()
+    def iter_export(
+        self,
+        user_id: Optional[int] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        batch_size: int = 1000
+    ) -> Iterator[Mapping]:
+        statement = select(*LOG_COLUMNS).order_by(Log.created, Log.id)
+        if user_id is not None:
+            statement = statement.where(Log.user_id == user_id)
+        if date_from:
+            statement = statement.where(Log.created >= date_from)
+        if date_to:
+            statement = statement.where(Log.created < date_to)
+        result = self.db.execute(statement.execution_options(yield_per=batch_size))
+        for row in result.mappings():
+            yield row
     
     def delete(self, log_id: int) -> bool:
         db_log = self.get_by_id(log_id)
@@ -31,5 +101,15 @@ class LogRepository:
         self.db.commit()
         return True
     
+    @replica_read
+    def get_rollup_stats(self, bucket: str, groups: List[str], start: datetime, end: datetime, **filters) -> List:
+        return self.db.execute(stats_statement(bucket, groups, start, end, **filters)).all()
+    
     def count_total(self) -> int:
         return self.db.query(Log).count()
+    
+    def count_estimate(self) -> Optional[int]:
+        return approximate_count(self.db.connection())
+    
+    def list_partitions(self) -> List[datetime]:
+        return list_partitions(self.db.connection())
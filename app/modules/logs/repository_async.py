@@ -0,0 +1,61 @@
+from sqlalchemy import insert, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional, List, Tuple
+from datetime import datetime
+from app.modules.logs.models import Log
+from app.modules.logs.repository import LOG_COLUMNS, stamp_logs
+from app.modules.logs.rollups import stats_statement
+from app.modules.logs.schemas import LogCreate
+from app.core.database import replica_read
+
+class AsyncLogRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def create(self, log: LogCreate) -> Log:
+        values = log.model_dump()
+        await stamp_logs([values]).apply_async(self.db)
+        db_log = Log(**values)
+        self.db.add(db_log)
+        await self.db.commit()
+        return db_log
+    
+    async def bulk_create(self, logs: List[dict]) -> None:
+        delta = stamp_logs(logs)
+        await self.db.execute(insert(Log), logs)
+        await delta.apply_async(self.db)
+        await self.db.commit()
+    
+    async def _paginate(self, statement, skip: int, limit: int, after: Optional[Tuple[datetime, int]]) -> List:
+        statement = statement.order_by(Log.created.desc(), Log.id.desc())
+        if after is not None:
+            statement = statement.where(tuple_(Log.created, Log.id) < after)
+        else:
+            statement = statement.offset(skip)
+        result = await self.db.execute(statement.limit(limit))
+        return result.all()
+    
+    @replica_read
+    async def get_all(self, skip: int = 0, limit: int = 100, after: Optional[Tuple[datetime, int]] = None) -> List:
+        return await self._paginate(select(*LOG_COLUMNS), skip, limit, after)
+    
+    @replica_read
+    async def get_by_user_id(self, user_id: int, skip: int = 0, limit: int = 100, after: Optional[Tuple[datetime, int]] = None) -> List:
+        return await self._paginate(select(*LOG_COLUMNS).where(Log.user_id == user_id), skip, limit, after)
+    
+    @replica_read
+    async def get_entity_history(
+        self,
+        entity_type: str,
+        entity_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        after: Optional[Tuple[datetime, int]] = None
+    ) -> List:
+        statement = select(*LOG_COLUMNS).where(Log.entity_type == entity_type, Log.entity_id == entity_id)
+        return await self._paginate(statement, skip, limit, after)
+    
+    @replica_read
+    async def get_rollup_stats(self, bucket: str, groups: List[str], start: datetime, end: datetime, **filters) -> List:
+        result = await self.db.execute(stats_statement(bucket, groups, start, end, **filters))
+        return result.all()
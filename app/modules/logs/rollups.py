@@ -0,0 +1,189 @@
+import argparse
+import logging
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, List, Mapping, Optional, Tuple
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import SessionLocal, dialect_insert
+from app.core.utils import chunked
+from app.modules.logs.actions import log_action
+from app.modules.logs.models import Log, LogEntityRollupDaily, LogRollupDaily, LogRollupHourly
+
+logger = logging.getLogger(__name__)
+
+BUCKETS = ("hour", "day", "total")
+GROUPS = ("user", "action", "entity")
+DEFAULT_RANGE_DAYS = 30
+UPSERT_CHUNK_SIZE = 1000
+
+def as_utc(value: datetime) -> datetime:
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+def hour_start(value: datetime) -> datetime:
+    return as_utc(value).replace(minute=0, second=0, microsecond=0)
+
+def day_start(value: datetime) -> datetime:
+    return hour_start(value).replace(hour=0)
+
+class RollupDelta:
+    def __init__(self):
+        self.hourly = Counter()
+        self.daily = Counter()
+        self.entities = Counter()
+    
+    def add(self, row: Mapping) -> None:
+        kind = log_action(row)
+        user_id = row["user_id"]
+        hour = hour_start(row["created"])
+        day = hour.replace(hour=0)
+        self.hourly[(hour, user_id, kind.entity_type, kind.action_type)] += 1
+        self.daily[(day, user_id, kind.entity_type, kind.action_type)] += 1
+        if kind.entity_id is not None:
+            self.entities[(day, kind.entity_type, kind.entity_id, kind.action_type)] += 1
+    
+    def add_rows(self, rows: Iterable[Mapping]) -> None:
+        for row in rows:
+            self.add(row)
+    
+    def statements(self, db) -> list:
+        statements = []
+        for model, counts in ((LogRollupHourly, self.hourly), (LogRollupDaily, self.daily), (LogEntityRollupDaily, self.entities)):
+            if not counts:
+                continue
+            table = model.__table__
+            keys = [column.name for column in table.primary_key.columns]
+            values = [{**dict(zip(keys, key)), "total": total} for key, total in sorted(counts.items())]
+            for chunk in chunked(values, UPSERT_CHUNK_SIZE):
+                statement = dialect_insert(db, table).values(chunk)
+                statements.append(statement.on_conflict_do_update(
+                    index_elements=keys,
+                    set_={"total": table.c.total + statement.excluded.total}
+                ))
+            counts.clear()
+        return statements
+    
+    def apply(self, db: Session) -> None:
+        for statement in self.statements(db):
+            db.execute(statement)
+    
+    async def apply_async(self, db) -> None:
+        for statement in self.statements(db):
+            await db.execute(statement)
+
+def stats_range(date_from: Optional[datetime], date_to: Optional[datetime]) -> Tuple[datetime, datetime]:
+    end = as_utc(date_to) if date_to else datetime.now(timezone.utc)
+    start = as_utc(date_from) if date_from else end - timedelta(days=DEFAULT_RANGE_DAYS)
+    if start >= end:
+        raise ValueError("date_from debe ser anterior a date_to")
+    return start, end
+
+def parse_group_by(group_by: Optional[str]) -> List[str]:
+    groups = [group.strip() for group in (group_by or "").split(",") if group.strip()]
+    unknown = [group for group in groups if group not in GROUPS]
+    if unknown:
+        raise ValueError(f"Agrupación no soportada: {', '.join(unknown)} (use {', '.join(GROUPS)})")
+    return sorted(set(groups), key=GROUPS.index)
+
+def stats_statement(
+    bucket: str,
+    groups: List[str],
+    start: datetime,
+    end: datetime,
+    user_id: Optional[int] = None,
+    action_type: Optional[str] = None,
+    entity_type: Optional[str] = None,
+    entity_id: Optional[int] = None
+):
+    if bucket not in BUCKETS:
+        raise ValueError(f"Intervalo no soportado: {bucket} (use {', '.join(BUCKETS)})")
+    by_entity = "entity" in groups or entity_id is not None
+    if by_entity and ("user" in groups or user_id is not None):
+        raise ValueError("Las estadísticas por entidad no se pueden combinar con usuario")
+    if by_entity and bucket == "hour":
+        raise ValueError("Las estadísticas por entidad solo están disponibles por día")
+    if by_entity:
+        table = LogEntityRollupDaily.__table__
+    elif bucket == "hour":
+        table = LogRollupHourly.__table__
+    else:
+        table = LogRollupDaily.__table__
+    columns = []
+    if bucket != "total":
+        columns.append(table.c.bucket)
+    if "user" in groups:
+        columns.append(table.c.user_id)
+    if "action" in groups or "entity" in groups:
+        columns.append(table.c.entity_type)
+    if "entity" in groups:
+        columns.append(table.c.entity_id)
+    if "action" in groups:
+        columns.append(table.c.action_type)
+    align = hour_start if table is LogRollupHourly.__table__ else day_start
+    statement = select(*columns, func.sum(table.c.total).label("total")).where(
+        table.c.bucket >= align(start),
+        table.c.bucket < end
+    )
+    for name, value in (("user_id", user_id), ("action_type", action_type), ("entity_type", entity_type), ("entity_id", entity_id)):
+        if value is not None:
+            statement = statement.where(table.c[name] == value)
+    if columns:
+        statement = statement.group_by(*columns).order_by(*columns)
+    return statement
+
+def rebuild_day(db: Session, day: datetime) -> int:
+    end = day + timedelta(days=1)
+    for model in (LogRollupHourly, LogRollupDaily, LogEntityRollupDaily):
+        db.execute(delete(model).where(model.bucket >= day, model.bucket < end))
+    delta = RollupDelta()
+    statement = select(
+        Log.user_id, Log.action, Log.action_type, Log.entity_type, Log.entity_id, Log.created
+    ).where(Log.created >= day, Log.created < end)
+    rows = 0
+    for row in db.execute(statement.execution_options(yield_per=settings.EXPORT_BATCH_SIZE)).mappings():
+        delta.add(row)
+        rows += 1
+    delta.apply(db)
+    db.commit()
+    return rows
+
+def rebuild_log_rollups(date_from: Optional[datetime] = None, date_to: Optional[datetime] = None) -> Tuple[int, int]:
+    today = day_start(datetime.now(timezone.utc))
+    db = SessionLocal()
+    try:
+        first = db.scalar(select(func.min(Log.created)))
+        if first is None:
+            return 0, 0
+        day = day_start(max(as_utc(first), as_utc(date_from)) if date_from else first)
+        end = min(day_start(date_to) if date_to else today, today)
+        days = rows = 0
+        while day < end:
+            count = rebuild_day(db, day)
+            logger.info("Agregados de logs recalculados para %s: %s logs", day.date(), count)
+            rows += count
+            days += 1
+            day += timedelta(days=1)
+        return days, rows
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+def prune_hourly_rollups(connection) -> int:
+    if settings.LOG_ROLLUP_HOURLY_RETENTION_DAYS <= 0:
+        return 0
+    cutoff = day_start(datetime.now(timezone.utc)) - timedelta(days=settings.LOG_ROLLUP_HOURLY_RETENTION_DAYS)
+    return connection.execute(delete(LogRollupHourly).where(LogRollupHourly.bucket < cutoff)).rowcount
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    parser = argparse.ArgumentParser(description="Recalcula los agregados de logs a partir de la tabla logs (solo días completos)")
+    parser.add_argument("--from", dest="date_from", type=datetime.fromisoformat, help="Primer día (por defecto el del log más antiguo)")
+    parser.add_argument("--to", dest="date_to", type=datetime.fromisoformat, help="Día final excluido (por defecto hoy)")
+    args = parser.parse_args()
+    days, rows = rebuild_log_rollups(args.date_from, args.date_to)
+    print(f"Días recalculados: {days}; logs procesados: {rows}")
@@ -1,13 +1,21 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Any, Dict, Optional
 from datetime import datetime
+from app.modules.logs.actions import ActionType, EntityType
 
 class LogBase(BaseModel):
     user_id: int
     action: str = Field(..., min_length=1, max_length=500)
+    action_type: Optional[ActionType] = None
+    entity_type: Optional[EntityType] = None
+    entity_id: Optional[int] = None
+    changes: Optional[Dict[str, Any]] = None
+    
+    class Config:
+        use_enum_values = True
 
 class LogCreate(LogBase):
-    pass
+    created: Optional[datetime] = None
 
 class LogResponse(LogBase):
     id: int
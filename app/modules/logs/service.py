@@ -1,20 +1,115 @@
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from pydantic_core import to_jsonable_python
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+from datetime import datetime, timezone
+from app.modules.logs.actions import LogAction, redact
 from app.modules.logs.repository import LogRepository
+from app.modules.logs.rollups import parse_group_by, stats_range
 from app.modules.logs.schemas import LogCreate, LogResponse
+from app.modules.logs.sink import audit_sink
+from app.core.responses import response_fields, rows_as_dicts
+from app.core.utils import decode_cursor
+
+LOG_FIELDS = response_fields(LogResponse)
+
+LogEntry = Tuple[str, LogAction, Optional[Dict[str, Any]]]
+
+def build_log(user_id: int, action: str, kind: Optional[LogAction] = None, changes: Optional[Mapping[str, Any]] = None) -> LogCreate:
+    return LogCreate(
+        user_id=user_id,
+        action=action,
+        changes=to_jsonable_python(redact(changes)) if changes else None,
+        created=datetime.now(timezone.utc),
+        **(kind._asdict() if kind else {})
+    )
+
+def build_logs(user_id: int, entries: Iterable[LogEntry]) -> List[dict]:
+    return [build_log(user_id, action, kind, changes).model_dump() for action, kind, changes in entries]
+
+def build_activity_stats(rows, bucket: str, groups: List[str], start: datetime, end: datetime) -> dict:
+    grouped = [row._asdict() for row in rows]
+    return {
+        "intervalo": bucket,
+        "agrupacion": groups,
+        "desde": start,
+        "hasta": end,
+        "total": sum(row["total"] for row in grouped),
+        "grupos": grouped
+    }
 
 class LogService:
     def __init__(self, db: Session):
         self.repository = LogRepository(db)
     
-    def create_log(self, user_id: int, action: str) -> None:
-        log = LogCreate(user_id=user_id, action=action)
+    def create_log(
+        self,
+        user_id: int,
+        action: str,
+        kind: Optional[LogAction] = None,
+        changes: Optional[Mapping[str, Any]] = None,
+        same_transaction: bool = False
+    ) -> None:
+        log = build_log(user_id, action, kind, changes)
+        if same_transaction:
+            self.repository.add(log)
+            return
+        if audit_sink.submit(log.model_dump()):
+            return
         self.repository.create(log)
     
-    def get_all_logs(self, skip: int = 0, limit: int = 100) -> List[LogResponse]:
-        logs = self.repository.get_all(skip, limit)
-        return [LogResponse.model_validate(log) for log in logs]
+    def create_logs(self, user_id: int, entries: Iterable[LogEntry]) -> None:
+        pending = [log for log in build_logs(user_id, entries) if not audit_sink.submit(log, block=False)]
+        if pending:
+            self.repository.bulk_create(pending)
+    
+    def _decode_cursor(self, cursor: Optional[str]):
+        if not cursor:
+            return None
+        return decode_cursor(cursor, created=datetime.fromisoformat, id=int)
+    
+    def get_all_logs(self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[dict]:
+        return rows_as_dicts(self.repository.get_all(skip, limit, self._decode_cursor(cursor)), LOG_FIELDS)
+    
+    def get_logs_by_user(self, user_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[dict]:
+        return rows_as_dicts(self.repository.get_by_user_id(user_id, skip, limit, self._decode_cursor(cursor)), LOG_FIELDS)
+    
+    def get_entity_history(
+        self,
+        entity_type: str,
+        entity_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> List[dict]:
+        rows = self.repository.get_entity_history(entity_type, entity_id, skip, limit, self._decode_cursor(cursor))
+        return rows_as_dicts(rows, LOG_FIELDS)
+    
+    def export_logs(
+        self,
+        user_id: Optional[int] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        batch_size: int = 1000
+    ) -> Iterator[Mapping]:
+        return self.repository.iter_export(user_id, date_from, date_to, batch_size)
+    
+    def get_statistics(self, exact: bool = False) -> dict:
+        total = None if exact else self.repository.count_estimate()
+        return {
+            "total_logs": total if total is not None else self.repository.count_total(),
+            "aproximado": total is not None,
+            "particiones": [f"{month:%Y-%m}" for month in self.repository.list_partitions()]
+        }
     
-    def get_logs_by_user(self, user_id: int, skip: int = 0, limit: int = 100) -> List[LogResponse]:
-        logs = self.repository.get_by_user_id(user_id, skip, limit)
-        return [LogResponse.model_validate(log) for log in logs]
+    def get_activity_stats(
+        self,
+        bucket: str = "day",
+        group_by: Optional[str] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        **filters
+    ) -> dict:
+        groups = parse_group_by(group_by)
+        start, end = stats_range(date_from, date_to)
+        rows = self.repository.get_rollup_stats(bucket, groups, start, end, **filters)
+        return build_activity_stats(rows, bucket, groups, start, end)
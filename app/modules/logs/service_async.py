@@ -0,0 +1,66 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Any, Iterable, List, Mapping, Optional
+from datetime import datetime
+from app.modules.logs.actions import LogAction
+from app.modules.logs.repository_async import AsyncLogRepository
+from app.modules.logs.rollups import parse_group_by, stats_range
+from app.modules.logs.service import LOG_FIELDS, LogEntry, build_activity_stats, build_log, build_logs
+from app.modules.logs.sink import audit_sink
+from app.core.responses import rows_as_dicts
+from app.core.utils import decode_cursor
+
+class AsyncLogService:
+    def __init__(self, db: AsyncSession):
+        self.repository = AsyncLogRepository(db)
+    
+    async def create_log(
+        self,
+        user_id: int,
+        action: str,
+        kind: Optional[LogAction] = None,
+        changes: Optional[Mapping[str, Any]] = None
+    ) -> None:
+        log = build_log(user_id, action, kind, changes)
+        if audit_sink.submit(log.model_dump(), block=False):
+            return
+        await self.repository.create(log)
+    
+    async def create_logs(self, user_id: int, entries: Iterable[LogEntry]) -> None:
+        pending = [log for log in build_logs(user_id, entries) if not audit_sink.submit(log, block=False)]
+        if pending:
+            await self.repository.bulk_create(pending)
+    
+    def _decode_cursor(self, cursor: Optional[str]):
+        if not cursor:
+            return None
+        return decode_cursor(cursor, created=datetime.fromisoformat, id=int)
+    
+    async def get_all_logs(self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[dict]:
+        return rows_as_dicts(await self.repository.get_all(skip, limit, self._decode_cursor(cursor)), LOG_FIELDS)
+    
+    async def get_logs_by_user(self, user_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[dict]:
+        return rows_as_dicts(await self.repository.get_by_user_id(user_id, skip, limit, self._decode_cursor(cursor)), LOG_FIELDS)
+    
+    async def get_entity_history(
+        self,
+        entity_type: str,
+        entity_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        cursor: Optional[str] = None
+    ) -> List[dict]:
+        rows = await self.repository.get_entity_history(entity_type, entity_id, skip, limit, self._decode_cursor(cursor))
+        return rows_as_dicts(rows, LOG_FIELDS)
+    
+    async def get_activity_stats(
+        self,
+        bucket: str = "day",
+        group_by: Optional[str] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        **filters
+    ) -> dict:
+        groups = parse_group_by(group_by)
+        start, end = stats_range(date_from, date_to)
+        rows = await self.repository.get_rollup_stats(bucket, groups, start, end, **filters)
+        return build_activity_stats(rows, bucket, groups, start, end)
@@ -0,0 +1,150 @@
+import logging
+import queue
+import threading
+import time
+from typing import List
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.modules.logs.repository import LogRepository
+
+logger = logging.getLogger(__name__)
+
+class AuditSink:
+    def __init__(self, max_queue_size: int, batch_size: int, flush_interval: float, enqueue_timeout: float):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self._queue: "queue.Queue[dict]" = queue.Queue(maxsize=max_queue_size)
+        self._stop = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self.enqueued = 0
+        self.rejected = 0
+        self.written = 0
+        self.failed = 0
+        self.flushes = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self.total_flush_ms = 0.0
+    
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+    
+    def start(self) -> None:
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="audit-sink", daemon=True)
+        self._thread.start()
+    
+    def stop(self) -> None:
+        if not self.running:
+            return
+        self._stop.set()
+        self._thread.join()
+        self._thread = None
+        self._drain()
+    
+    def submit(self, entry: dict, block: bool = True) -> bool:
+        if not self.running:
+            return False
+        try:
+            if block:
+                self._queue.put(entry, timeout=self.enqueue_timeout)
+            else:
+                self._queue.put_nowait(entry)
+        except queue.Full:
+            with self._lock:
+                self.rejected += 1
+            return False
+        with self._lock:
+            self.enqueued += 1
+        return True
+    
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            batch = self._collect()
+            if batch:
+                self._flush(batch)
+    
+    def _collect(self) -> List[dict]:
+        batch = []
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+    
+    def _drain(self) -> None:
+        while True:
+            batch = []
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            if not batch:
+                return
+            self._flush(batch)
+    
+    def _flush(self, batch: List[dict]) -> None:
+        start = time.perf_counter()
+        written, failed = self._write(batch)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        with self._lock:
+            self.written += written
+            self.failed += failed
+            self.flushes += 1
+            self.last_flush_ms = elapsed_ms
+            self.max_flush_ms = max(self.max_flush_ms, elapsed_ms)
+            self.total_flush_ms += elapsed_ms
+    
+    def _write(self, batch: List[dict]) -> tuple:
+        db = SessionLocal()
+        try:
+            try:
+                LogRepository(db).bulk_create(batch)
+                return len(batch), 0
+            except Exception:
+                db.rollback()
+                logger.exception("Fallo al escribir un lote de %d logs; reintentando fila por fila", len(batch))
+            written = 0
+            for entry in batch:
+                try:
+                    LogRepository(db).bulk_create([entry])
+                    written += 1
+                except Exception:
+                    db.rollback()
+                    logger.exception("Log de auditoría descartado: %s", entry)
+            return written, len(batch) - written
+        finally:
+            db.close()
+    
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "running": self.running,
+                "queue_depth": self._queue.qsize(),
+                "queue_capacity": self._queue.maxsize,
+                "enqueued": self.enqueued,
+                "rejected": self.rejected,
+                "written": self.written,
+                "failed": self.failed,
+                "flushes": self.flushes,
+                "last_flush_ms": round(self.last_flush_ms, 3),
+                "max_flush_ms": round(self.max_flush_ms, 3),
+                "avg_flush_ms": round(self.total_flush_ms / self.flushes, 3) if self.flushes else 0.0
+            }
+
+audit_sink = AuditSink(
+    max_queue_size=settings.AUDIT_QUEUE_MAX_SIZE,
+    batch_size=settings.AUDIT_BATCH_SIZE,
+    flush_interval=settings.AUDIT_FLUSH_INTERVAL_SECONDS,
+    enqueue_timeout=settings.AUDIT_ENQUEUE_TIMEOUT_SECONDS
+)
@@ -0,0 +1,151 @@
+import logging
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import select
+from app.core.config import settings
+from app.modules.products.models import CategoryReorderPoint
+
+logger = logging.getLogger(__name__)
+
+def is_low_stock(stock: Optional[int], reorder_level: Optional[int]) -> bool:
+    return stock is not None and reorder_level is not None and stock <= reorder_level
+
+def reorder_points_statement(categories: Iterable[str]):
+    return select(CategoryReorderPoint.category, CategoryReorderPoint.reorder_point).where(
+        CategoryReorderPoint.category.in_(sorted(set(categories)))
+    )
+
+def reorder_level(reorder_point: Optional[int], category: str, category_points: Dict[str, int]) -> Optional[int]:
+    return reorder_point if reorder_point is not None else category_points.get(category)
+
+class LoggingAlertSink:
+    def emit(self, event: dict) -> None:
+        if event["low_stock"]:
+            logger.warning(
+                "Stock bajo: %s (ID: %s, %s) con %s unidades, punto de pedido %s",
+                event["name"], event["product_id"], event["category"], event["stock"], event["reorder_level"]
+            )
+        else:
+            logger.info("Stock repuesto: %s (ID: %s) con %s unidades", event["name"], event["product_id"], event["stock"])
+
+class MemoryAlertSink:
+    def __init__(self, maxsize: int = 1000):
+        self.events = deque(maxlen=maxsize)
+    
+    def emit(self, event: dict) -> None:
+        self.events.append(event)
+
+class NullAlertSink:
+    def emit(self, event: dict) -> None:
+        pass
+
+def create_sink():
+    if settings.STOCK_ALERT_SINK == "memory":
+        return MemoryAlertSink()
+    if settings.STOCK_ALERT_SINK == "none":
+        return NullAlertSink()
+    return LoggingAlertSink()
+
+class StockAlertEngine:
+    def __init__(self, sink, debounce_seconds: float):
+        self.sink = sink
+        self.debounce_seconds = debounce_seconds
+        self._lock = threading.Lock()
+        self._emitted: Dict[int, Tuple[bool, float]] = {}
+        self._pending: Dict[int, dict] = {}
+        self.crossings = 0
+        self.emitted = 0
+        self.debounced = 0
+        self.failed = 0
+    
+    def set_sink(self, sink) -> None:
+        self.sink = sink
+    
+    def observe(self, row, previous_stock: Optional[int], previous_level: Optional[int]) -> None:
+        low = is_low_stock(row.stock, row.reorder_level)
+        if low == is_low_stock(previous_stock, previous_level):
+            return
+        self._record({
+            "product_id": row.id,
+            "name": row.name,
+            "category": row.category,
+            "stock": row.stock,
+            "reorder_level": row.reorder_level,
+            "low_stock": low,
+            "timestamp": datetime.now(timezone.utc).isoformat()
+        })
+    
+    def _record(self, event: dict) -> None:
+        now = time.monotonic()
+        product_id = event["product_id"]
+        with self._lock:
+            self.crossings += 1
+            last = self._emitted.get(product_id)
+            if last is not None and now - last[1] < self.debounce_seconds:
+                if product_id in self._pending:
+                    self.debounced += 1
+                self._pending[product_id] = event
+                return
+            self._pending.pop(product_id, None)
+            self._emitted[product_id] = (event["low_stock"], now)
+        self._emit([event])
+    
+    def forget(self, product_id: int) -> None:
+        with self._lock:
+            self._emitted.pop(product_id, None)
+            self._pending.pop(product_id, None)
+    
+    def flush(self, force: bool = False) -> None:
+        now = time.monotonic()
+        ready: List[dict] = []
+        with self._lock:
+            for product_id, event in list(self._pending.items()):
+                low, emitted_at = self._emitted[product_id]
+                if not force and now - emitted_at < self.debounce_seconds:
+                    continue
+                del self._pending[product_id]
+                if event["low_stock"] == low:
+                    self.debounced += 1
+                    continue
+                self._emitted[product_id] = (event["low_stock"], now)
+                ready.append(event)
+            expired = [
+                product_id for product_id, (_, emitted_at) in self._emitted.items()
+                if now - emitted_at >= self.debounce_seconds and product_id not in self._pending
+            ]
+            for product_id in expired:
+                del self._emitted[product_id]
+        self._emit(ready)
+    
+    def _emit(self, events: List[dict]) -> None:
+        for event in events:
+            try:
+                self.sink.emit(event)
+                emitted, failed = 1, 0
+            except Exception:
+                logger.exception("Fallo al emitir la alerta de stock del producto %s", event["product_id"])
+                emitted, failed = 0, 1
+            with self._lock:
+                self.emitted += emitted
+                self.failed += failed
+    
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "sink": type(self.sink).__name__,
+                "debounce_seconds": self.debounce_seconds,
+                "crossings": self.crossings,
+                "emitted": self.emitted,
+                "debounced": self.debounced,
+                "failed": self.failed,
+                "pending": len(self._pending),
+                "tracked": len(self._emitted)
+            }
+
+stock_alerts = StockAlertEngine(create_sink(), settings.STOCK_ALERT_DEBOUNCE_SECONDS)
+
+def flush_stock_alerts() -> None:
+    stock_alerts.flush()
@@ -0,0 +1,159 @@
+import json
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+from fastapi.concurrency import run_in_threadpool
+from app.core.cache import MemoryBackend, RedisBackend, SingleFlight
+from app.core.config import settings
+from app.core.database import primary_reads
+
+logger = logging.getLogger(__name__)
+
+EPOCH_KEY = "products:epoch"
+
+def item_key(product_id: int, kind: str) -> str:
+    return f"products:item:{product_id}:{kind}"
+
+def page_key(kind: str, category: Optional[str], skip: int, limit: int, cursor: Optional[str]) -> str:
+    return "products:page:" + json.dumps([kind, category, skip, limit, cursor], separators=(",", ":"))
+
+def search_key(tokens: List[str], filters: dict, skip: int, limit: int) -> str:
+    return "products:search:" + json.dumps([tokens, filters, skip, limit], separators=(",", ":"), default=str)
+
+def item_counters(product_id: int) -> Tuple[str, ...]:
+    return (f"products:version:{product_id}",)
+
+def page_counters(category: Optional[str]) -> Tuple[str, ...]:
+    return (f"products:generation:{category or ''}", EPOCH_KEY)
+
+def encode_version(version: Optional[Tuple[str, Optional[datetime]]]) -> Optional[list]:
+    if not version:
+        return None
+    etag, last_modified = version
+    return [etag, last_modified.isoformat() if last_modified else None]
+
+def decode_version(value: Optional[list]) -> Optional[Tuple[str, Optional[datetime]]]:
+    if not value:
+        return None
+    etag, last_modified = value
+    return etag, datetime.fromisoformat(last_modified) if last_modified else None
+
+def create_backend():
+    if settings.PRODUCT_CACHE_BACKEND == "redis":
+        return RedisBackend(settings.PRODUCT_CACHE_URL, settings.PRODUCT_CACHE_TTL_SECONDS)
+    return MemoryBackend(settings.PRODUCT_CACHE_SIZE, settings.PRODUCT_CACHE_TTL_SECONDS)
+
+class ProductCache:
+    def __init__(self, backend, enabled: bool = True):
+        self.backend = backend
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.errors = 0
+        self._flight = SingleFlight()
+        self._lock = threading.Lock()
+    
+    def _count(self, counter: str) -> None:
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+    
+    def _lookup(self, key: str, counters: Tuple[str, ...]) -> Tuple[bool, Any, Optional[list]]:
+        try:
+            entry, versions = self.backend.fetch(key, *counters)
+        except Exception:
+            self._count("errors")
+            logger.exception("Product cache lookup failed")
+            return False, None, None
+        versions = list(versions)
+        if entry is not None and entry["versions"] == versions:
+            return True, entry["value"], versions
+        return False, None, versions
+    
+    def _store(self, key: str, versions: Optional[list], value: Any) -> None:
+        if value is None or versions is None:
+            return
+        try:
+            self.backend.set(key, {"versions": versions, "value": value})
+        except Exception:
+            self._count("errors")
+            logger.exception("Product cache store failed")
+    
+    def read_through(self, key: str, counters: Tuple[str, ...], loader: Callable[[], Any]) -> Any:
+        if not self.enabled:
+            return loader()
+        hit, value, _ = self._lookup(key, counters)
+        if hit:
+            self._count("hits")
+            return value
+        with self._flight.hold(key):
+            hit, value, versions = self._lookup(key, counters)
+            if hit:
+                self._count("coalesced")
+                return value
+            self._count("misses")
+            with primary_reads():
+                value = loader()
+            self._store(key, versions, value)
+            return value
+    
+    async def _call(self, function, *args):
+        if self.backend.blocking:
+            return await run_in_threadpool(function, *args)
+        return function(*args)
+    
+    async def read_through_async(self, key: str, counters: Tuple[str, ...], loader) -> Any:
+        if not self.enabled:
+            return await loader()
+        hit, value, _ = await self._call(self._lookup, key, counters)
+        if hit:
+            self._count("hits")
+            return value
+        async with self._flight.hold_async(key):
+            hit, value, versions = await self._call(self._lookup, key, counters)
+            if hit:
+                self._count("coalesced")
+                return value
+            self._count("misses")
+            with primary_reads():
+                value = await loader()
+            await self._call(self._store, key, versions, value)
+            return value
+    
+    def _counters_for(self, product_ids: Iterable[int], categories: Iterable[str], all_pages: bool) -> list:
+        keys = {"products:generation:"}
+        keys.update(f"products:generation:{category}" for category in categories)
+        for product_id in product_ids:
+            keys.update(item_counters(product_id))
+        if all_pages:
+            keys.add(EPOCH_KEY)
+        return sorted(keys)
+    
+    def invalidate(self, product_ids: Iterable[int] = (), categories: Iterable[str] = (), all_pages: bool = False) -> None:
+        if not self.enabled:
+            return
+        try:
+            self.backend.incr(*self._counters_for(product_ids, categories, all_pages))
+        except Exception:
+            self._count("errors")
+            logger.exception("Product cache invalidation failed")
+    
+    async def invalidate_async(self, product_ids: Iterable[int] = (), categories: Iterable[str] = (), all_pages: bool = False) -> None:
+        if self.enabled:
+            await self._call(self.invalidate, list(product_ids), list(categories), all_pages)
+    
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses + self.coalesced
+            return {
+                "enabled": self.enabled,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "errors": self.errors,
+                "hit_ratio": round((self.hits + self.coalesced) / lookups, 4) if lookups else 0.0,
+                **self.backend.stats()
+            }
+
+product_cache = ProductCache(create_backend(), settings.PRODUCT_CACHE_ENABLED)
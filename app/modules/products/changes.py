@@ -0,0 +1,229 @@
+import asyncio
+import json
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import AsyncIterator, Iterable, List, Optional, Set, Tuple
+from fastapi.concurrency import run_in_threadpool
+from pydantic_core import to_jsonable_python
+from sqlalchemy import delete, func, insert, select
+from app.core.config import settings
+from app.core.database import engine
+from app.modules.products.models import Product, ProductChange
+
+logger = logging.getLogger(__name__)
+
+CREATE = "create"
+UPDATE = "update"
+DELETE = "delete"
+CHANGE_FIELDS = ("id", "name", "category", "price", "stock", "reorder_point", "reorder_level", "version")
+CHANGE_COLUMNS = [getattr(Product, field) for field in CHANGE_FIELDS]
+HEARTBEAT = ": keep-alive\n\n"
+
+Event = Tuple[int, str]
+
+def change_rows(operation: str, rows: Iterable) -> List[dict]:
+    return [
+        {
+            "product_id": row.id,
+            "operation": operation,
+            "data": None if operation == DELETE else to_jsonable_python({field: getattr(row, field) for field in CHANGE_FIELDS})
+        }
+        for row in rows
+    ]
+
+def record_changes(db, operation: str, rows: Iterable) -> None:
+    values = change_rows(operation, rows)
+    if values:
+        db.execute(insert(ProductChange.__table__), values)
+
+async def record_changes_async(db, operation: str, rows: Iterable) -> None:
+    values = change_rows(operation, rows)
+    if values:
+        await db.execute(insert(ProductChange.__table__), values)
+
+def format_event(seq: int, event: str, payload) -> str:
+    data = json.dumps(to_jsonable_python(payload), ensure_ascii=False, separators=(",", ":"))
+    return f"id: {seq}\nevent: {event}\ndata: {data}\n\n"
+
+def read_changes(after: int, upper: Optional[int], limit: int) -> List[Event]:
+    statement = select(
+        ProductChange.seq, ProductChange.product_id, ProductChange.operation, ProductChange.data, ProductChange.created
+    ).where(ProductChange.seq > after).order_by(ProductChange.seq).limit(limit)
+    if upper is not None:
+        statement = statement.where(ProductChange.seq <= upper)
+    with engine.connect() as connection:
+        rows = connection.execute(statement).all()
+    return [(row.seq, format_event(row.seq, row.operation, row._asdict())) for row in rows]
+
+def change_bounds() -> Tuple[Optional[int], Optional[int]]:
+    with engine.connect() as connection:
+        return tuple(connection.execute(select(func.min(ProductChange.seq), func.max(ProductChange.seq))).one())
+
+def resume_point(since: Optional[int], last_event_id: Optional[str]) -> Optional[int]:
+    if last_event_id:
+        try:
+            since = int(last_event_id)
+        except ValueError:
+            raise ValueError("Last-Event-ID no válido")
+    if since is not None and since < 0:
+        raise ValueError("since debe ser mayor o igual que 0")
+    return since
+
+def contiguous(events: List[Event], after: int) -> List[Event]:
+    ready = []
+    for event in events:
+        if event[0] != after + 1:
+            break
+        ready.append(event)
+        after = event[0]
+    return ready
+
+class Subscriber:
+    def __init__(self, maxsize: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self.overflowed = False
+
+class ProductChangeFeed:
+    def __init__(self, poll_seconds: float, buffer_size: int, batch_size: int, gap_grace_seconds: float):
+        self.poll_seconds = poll_seconds
+        self.buffer_size = buffer_size
+        self.batch_size = batch_size
+        self.gap_grace_seconds = gap_grace_seconds
+        self.cursor: Optional[int] = None
+        self._subscribers: Set[Subscriber] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._start_lock: Optional[asyncio.Lock] = None
+        self._gap_since: Optional[float] = None
+        self.published = 0
+        self.overflows = 0
+        self.gaps_skipped = 0
+    
+    def notify(self) -> None:
+        loop, wakeup = self._loop, self._wakeup
+        if loop is None or wakeup is None:
+            return
+        try:
+            loop.call_soon_threadsafe(wakeup.set)
+        except RuntimeError:
+            pass
+    
+    async def subscribe(self) -> Tuple[Subscriber, int]:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop:
+            self._loop, self._wakeup, self._start_lock, self._task, self.cursor = loop, asyncio.Event(), asyncio.Lock(), None, None
+        async with self._start_lock:
+            if self.cursor is None:
+                self.cursor = (await run_in_threadpool(change_bounds))[1] or 0
+        subscriber = Subscriber(self.buffer_size)
+        self._subscribers.add(subscriber)
+        if self._task is None or self._task.done():
+            self._task = loop.create_task(self._run())
+        return subscriber, self.cursor
+    
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        self._subscribers.discard(subscriber)
+    
+    async def _run(self) -> None:
+        while self._subscribers:
+            self._wakeup.clear()
+            try:
+                await self._poll()
+            except Exception:
+                logger.exception("Fallo al leer el registro de cambios de productos")
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_seconds)
+            except asyncio.TimeoutError:
+                pass
+        self.cursor = None
+        self._gap_since = None
+    
+    async def _poll(self) -> None:
+        while self._subscribers:
+            events = await run_in_threadpool(read_changes, self.cursor, None, self.batch_size)
+            ready = contiguous(events, self.cursor)
+            if len(ready) < len(events):
+                now = time.monotonic()
+                if self._gap_since is None:
+                    self._gap_since = now
+                if now - self._gap_since >= self.gap_grace_seconds:
+                    self.gaps_skipped += 1
+                    self._gap_since = None
+                    ready = events
+            else:
+                self._gap_since = None
+            if ready:
+                self._publish(ready)
+                self.cursor = ready[-1][0]
+            if len(events) < self.batch_size or len(ready) < len(events):
+                return
+    
+    def _publish(self, events: List[Event]) -> None:
+        for subscriber in list(self._subscribers):
+            for event in events:
+                try:
+                    subscriber.queue.put_nowait(event)
+                except asyncio.QueueFull:
+                    subscriber.overflowed = True
+                    self.overflows += 1
+                    self._subscribers.discard(subscriber)
+                    break
+        self.published += len(events)
+    
+    def stats(self) -> dict:
+        return {
+            "subscribers": len(self._subscribers),
+            "cursor": self.cursor,
+            "published": self.published,
+            "overflows": self.overflows,
+            "gaps_skipped": self.gaps_skipped,
+            "buffer_size": self.buffer_size
+        }
+
+product_change_feed = ProductChangeFeed(
+    settings.PRODUCT_CHANGES_POLL_SECONDS,
+    settings.PRODUCT_CHANGES_BUFFER_SIZE,
+    settings.PRODUCT_CHANGES_BATCH_SIZE,
+    settings.PRODUCT_CHANGES_GAP_GRACE_SECONDS
+)
+
+async def stream_changes(since: Optional[int]) -> AsyncIterator[str]:
+    last = since
+    first, _ = await run_in_threadpool(change_bounds)
+    if since is not None and first is not None and since + 1 < first:
+        yield format_event(first - 1, "reset", {"desde": since, "primer_cambio_disponible": first})
+    while True:
+        subscriber, upper = await product_change_feed.subscribe()
+        try:
+            if last is None:
+                last = upper
+            while last < upper:
+                events = await run_in_threadpool(read_changes, last, upper, settings.PRODUCT_CHANGES_BATCH_SIZE)
+                if not events:
+                    break
+                for seq, text in events:
+                    yield text
+                last = events[-1][0]
+            while not (subscriber.overflowed and subscriber.queue.empty()):
+                try:
+                    seq, text = await asyncio.wait_for(subscriber.queue.get(), settings.PRODUCT_CHANGES_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield HEARTBEAT
+                    continue
+                if seq <= last:
+                    continue
+                yield text
+                last = seq
+        finally:
+            product_change_feed.unsubscribe(subscriber)
+
+def prune_product_changes() -> None:
+    if settings.PRODUCT_CHANGES_RETENTION_DAYS <= 0:
+        return
+    cutoff = datetime.now(timezone.utc) - timedelta(days=settings.PRODUCT_CHANGES_RETENTION_DAYS)
+    with engine.begin() as connection:
+        deleted = connection.execute(delete(ProductChange).where(ProductChange.created < cutoff)).rowcount
+    if deleted:
+        logger.info("Eliminados %s cambios de productos anteriores a %s", deleted, cutoff.date())
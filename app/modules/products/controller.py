@@ -1,19 +1,86 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import logging
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+from pydantic import ValidationError
 from sqlalchemy.orm import Session
-from app.core.database import get_db
-from app.core.utils import success_response
+from typing import Optional
+from datetime import datetime
+from decimal import Decimal
+from app.core.config import settings
+from app.core.database import get_db, iterate_in_session
+from app.core.exceptions import ConflictError, NotFoundError
+from app.core.http_cache import not_modified_response, set_validators
+from app.core.responses import fast_success_response
+from app.core.streaming import EXPORT_FORMATS, event_stream_response, export_response, iter_rows
+from app.core.utils import success_response, build_next_cursor, format_validation_error
+from app.modules.products.changes import resume_point, stream_changes
 from app.modules.products.service import ProductService
-from app.modules.products.schemas import ProductCreate, ProductUpdate, ProductResponse
+from app.modules.products.schemas import (
+    CategoryReorderPointUpdate, ProductBatchGet, ProductCreate, ProductUpdate, ProductBulkUpdate, ProductResponse, ProductSearchFilters, StockAdjustment,
+    StockAdjustmentBatch
+)
 from app.modules.users.controller import get_current_user
-from app.modules.users.schemas import UserResponse
+from app.modules.users.schemas import Principal
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/products", tags=["Productos"])
 
+async def _process_bulk(request: Request, schema, write_chunk, rollback) -> dict:
+    summary = {"procesados": 0, "escritos": 0, "total_errores": 0, "errores": []}
+    
+    def report(row_number: int, message: str):
+        summary["total_errores"] += 1
+        if len(summary["errores"]) < settings.BULK_MAX_REPORTED_ERRORS:
+            summary["errores"].append({"fila": row_number, "error": message})
+    
+    def record(chunk, errors):
+        for row_number, item in chunk:
+            if getattr(item, "id", None) in errors:
+                report(row_number, errors[item.id])
+            else:
+                summary["escritos"] += 1
+    
+    async def write(chunk) -> bool:
+        try:
+            record(chunk, await run_in_threadpool(write_chunk, [item for _, item in chunk]))
+            return True
+        except Exception:
+            await run_in_threadpool(rollback)
+            if len(chunk) == 1:
+                logger.exception("Fallo al escribir la fila %s de la operación masiva", chunk[0][0])
+            return False
+    
+    async def flush(chunk):
+        if await write(chunk):
+            return
+        for row_number, item in chunk:
+            if not await write([(row_number, item)]):
+                report(row_number, "No se pudo escribir la fila")
+    
+    chunk = []
+    async for row_number, row in iter_rows(request):
+        summary["procesados"] += 1
+        if isinstance(row, Exception):
+            report(row_number, str(row))
+            continue
+        try:
+            chunk.append((row_number, schema.model_validate(row)))
+        except ValidationError as e:
+            report(row_number, format_validation_error(e))
+            continue
+        if len(chunk) >= settings.BULK_CHUNK_SIZE:
+            await flush(chunk)
+            chunk = []
+    if chunk:
+        await flush(chunk)
+    return summary
+
 @router.post("/", response_model=dict, status_code=status.HTTP_201_CREATED)
 def create_product(
     product: ProductCreate,
     db: Session = Depends(get_db),
-    current_user: UserResponse = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     try:
         service = ProductService(db)
@@ -22,28 +89,133 @@ def create_product(
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error interno del servidor")
 
+@router.post("/bulk", response_model=dict)
+async def bulk_create_products(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    service = ProductService(db)
+    
+    def write_chunk(rows):
+        service.bulk_create_products(rows, current_user.id)
+        return {}
+    
+    try:
+        summary = await _process_bulk(request, ProductCreate, write_chunk, db.rollback)
+        return success_response(summary, "Importación de productos finalizada")
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error interno del servidor")
+
+@router.patch("/bulk", response_model=dict)
+async def bulk_update_products(
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    service = ProductService(db)
+    
+    def write_chunk(rows):
+        return service.bulk_update_products(rows, current_user.id)
+    
+    try:
+        summary = await _process_bulk(request, ProductBulkUpdate, write_chunk, db.rollback)
+        return success_response(summary, "Actualización de productos finalizada")
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error interno del servidor")
+
+@router.post("/stock/adjust", response_model=dict)
+def adjust_stock_batch(
+    batch: StockAdjustmentBatch,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    try:
+        service = ProductService(db)
+        products = service.adjust_stock_batch(batch.items, current_user.id)
+        return success_response([product.model_dump() for product in products], "Stock ajustado exitosamente")
+    except NotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except ConflictError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error interno del servidor")
+
+@router.post("/batch-get", response_model=dict)
+def batch_get_products(
+    batch: ProductBatchGet,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    try:
+        service = ProductService(db)
+        result = service.get_products_batch(batch.ids)
+        return fast_success_response(result, "Productos obtenidos exitosamente")
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error interno del servidor")
+
 @router.get("/", response_model=dict)
 def get_all_products(
+    request: Request,
     skip: int = 0,
     limit: int = 100,
     category: str = None,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: UserResponse = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     try:
         service = ProductService(db)
-        if category:
-            products = service.get_products_by_category(category, skip, limit)
-        else:
-            products = service.get_all_products(skip, limit)
-        return success_response([product.model_dump() for product in products], "Productos obtenidos exitosamente")
+        etag, last_modified = service.get_products_version(category, skip, limit, cursor)
+        not_modified = not_modified_response(request, etag, last_modified)
+        if not_modified:
+            return not_modified
+        products = service.get_products_page(category, skip, limit, cursor)
+        result = fast_success_response(
+            products,
+            "Productos obtenidos exitosamente",
+            build_next_cursor(products, limit, "id")
+        )
+        set_validators(result, etag, last_modified)
+        return result
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error interno del servidor")
 
+@router.get("/export")
+def export_products(
+    format: str = "ndjson",
+    category: Optional[str] = None,
+    created_from: Optional[datetime] = None,
+    created_to: Optional[datetime] = None,
+    current_user: Principal = Depends(get_current_user)
+):
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Formato de exportación no soportado")
+    rows = iterate_in_session(
+        lambda db: ProductService(db).export_products(category, created_from, created_to, settings.EXPORT_BATCH_SIZE)
+    )
+    return export_response(rows, list(ProductResponse.model_fields), format, "productos", settings.EXPORT_BATCH_SIZE)
+
+@router.get("/changes")
+def stream_product_changes(
+    request: Request,
+    since: Optional[int] = None,
+    current_user: Principal = Depends(get_current_user)
+):
+    try:
+        start = resume_point(since, request.headers.get("last-event-id"))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return event_stream_response(stream_changes(start))
+
 @router.get("/statistics", response_model=dict)
 def get_statistics(
     db: Session = Depends(get_db),
-    current_user: UserResponse = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     try:
         service = ProductService(db)
@@ -52,24 +224,126 @@ def get_statistics(
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error interno del servidor")
 
+@router.get("/search", response_model=dict)
+def search_products(
+    q: str,
+    min_price: Optional[Decimal] = None,
+    max_price: Optional[Decimal] = None,
+    min_stock: Optional[int] = None,
+    max_stock: Optional[int] = None,
+    skip: int = 0,
+    limit: int = 20,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    try:
+        filters = ProductSearchFilters(min_price=min_price, max_price=max_price, min_stock=min_stock, max_stock=max_stock)
+        service = ProductService(db)
+        products = service.search_products(q, filters, skip, limit)
+        return fast_success_response(products, "Búsqueda de productos completada")
+    except ValidationError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=format_validation_error(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error interno del servidor")
+
+@router.get("/low-stock", response_model=dict)
+def get_low_stock_products(
+    skip: int = 0,
+    limit: int = 100,
+    category: Optional[str] = None,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    try:
+        service = ProductService(db)
+        products = service.get_low_stock_products(category, skip, limit, cursor)
+        return fast_success_response(
+            products,
+            "Productos con stock bajo obtenidos exitosamente",
+            build_next_cursor(products, limit, "id")
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error interno del servidor")
+
+@router.get("/categories/reorder-points", response_model=dict)
+def get_category_reorder_points(
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    try:
+        service = ProductService(db)
+        return success_response(service.get_category_reorder_points(), "Puntos de pedido obtenidos exitosamente")
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error interno del servidor")
+
+@router.put("/categories/{category}/reorder-point", response_model=dict)
+def set_category_reorder_point(
+    category: str,
+    reorder_point: CategoryReorderPointUpdate,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    try:
+        service = ProductService(db)
+        result = service.set_category_reorder_point(category, reorder_point.reorder_point, current_user.id)
+        return success_response(result, "Punto de pedido actualizado exitosamente")
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error interno del servidor")
+
 @router.get("/{product_id}", response_model=dict)
 def get_product(
     product_id: int,
+    request: Request,
     db: Session = Depends(get_db),
-    current_user: UserResponse = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     service = ProductService(db)
-    product = service.get_product_by_id(product_id)
+    version = service.get_product_version(product_id)
+    if not version:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Producto no encontrado")
+    not_modified = not_modified_response(request, *version)
+    if not_modified:
+        return not_modified
+    product = service.get_product_data(product_id)
     if not product:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Producto no encontrado")
-    return success_response(product.model_dump(), "Producto obtenido exitosamente")
+    result = fast_success_response(product, "Producto obtenido exitosamente")
+    set_validators(result, *version)
+    return result
+
+@router.get("/{product_id}/history", response_model=dict)
+def get_product_history(
+    product_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    try:
+        service = ProductService(db)
+        logs = service.get_product_history(product_id, skip, limit, cursor)
+        return fast_success_response(
+            logs,
+            "Historial del producto obtenido exitosamente",
+            build_next_cursor(logs, limit, "created", "id")
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error interno del servidor")
 
 @router.put("/{product_id}", response_model=dict)
 def update_product(
     product_id: int,
     product_update: ProductUpdate,
     db: Session = Depends(get_db),
-    current_user: UserResponse = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     try:
         service = ProductService(db)
@@ -77,14 +351,34 @@ def update_product(
         if not updated_product:
             raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Producto no encontrado")
         return success_response(updated_product.model_dump(), "Producto actualizado exitosamente")
+    except ConflictError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error interno del servidor")
 
+@router.post("/{product_id}/stock/adjust", response_model=dict)
+def adjust_stock(
+    product_id: int,
+    adjustment: StockAdjustment,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    try:
+        service = ProductService(db)
+        product = service.adjust_stock(product_id, adjustment.delta, current_user.id)
+    except ConflictError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error interno del servidor")
+    if not product:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Producto no encontrado")
+    return success_response(product.model_dump(), "Stock ajustado exitosamente")
+
 @router.delete("/{product_id}", response_model=dict)
 def delete_product(
     product_id: int,
     db: Session = Depends(get_db),
-    current_user: UserResponse = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     service = ProductService(db)
     deleted = service.delete_product(product_id, current_user.id)
@@ -0,0 +1,268 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from decimal import Decimal
+from app.core.database import get_async_db
+from app.core.exceptions import ConflictError, NotFoundError
+from app.core.http_cache import not_modified_response, set_validators
+from app.core.responses import fast_success_response
+from app.core.utils import success_response, build_next_cursor, format_validation_error
+from app.modules.products.service_async import AsyncProductService
+from app.modules.products.schemas import (
+    CategoryReorderPointUpdate, ProductBatchGet, ProductCreate, ProductSearchFilters, ProductUpdate, StockAdjustment, StockAdjustmentBatch
+)
+from app.modules.users.controller import get_current_user
+from app.modules.users.schemas import Principal
+
+router = APIRouter(prefix="/products", tags=["Productos"])
+
+@router.post("/", response_model=dict, status_code=status.HTTP_201_CREATED)
+async def create_product(
+    product: ProductCreate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    try:
+        service = AsyncProductService(db)
+        new_product = await service.create_product(product, current_user.id)
+        return success_response(new_product.model_dump(), "Producto creado exitosamente")
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error interno del servidor")
+
+@router.post("/stock/adjust", response_model=dict)
+async def adjust_stock_batch(
+    batch: StockAdjustmentBatch,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    try:
+        service = AsyncProductService(db)
+        products = await service.adjust_stock_batch(batch.items, current_user.id)
+        return success_response([product.model_dump() for product in products], "Stock ajustado exitosamente")
+    except NotFoundError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except ConflictError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error interno del servidor")
+
+@router.post("/batch-get", response_model=dict)
+async def batch_get_products(
+    batch: ProductBatchGet,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    try:
+        service = AsyncProductService(db)
+        result = await service.get_products_batch(batch.ids)
+        return fast_success_response(result, "Productos obtenidos exitosamente")
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error interno del servidor")
+
+@router.get("/", response_model=dict)
+async def get_all_products(
+    request: Request,
+    skip: int = 0,
+    limit: int = 100,
+    category: str = None,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    try:
+        service = AsyncProductService(db)
+        etag, last_modified = await service.get_products_version(category, skip, limit, cursor)
+        not_modified = not_modified_response(request, etag, last_modified)
+        if not_modified:
+            return not_modified
+        products = await service.get_products_page(category, skip, limit, cursor)
+        result = fast_success_response(
+            products,
+            "Productos obtenidos exitosamente",
+            build_next_cursor(products, limit, "id")
+        )
+        set_validators(result, etag, last_modified)
+        return result
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error interno del servidor")
+
+@router.get("/statistics", response_model=dict)
+async def get_statistics(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    try:
+        service = AsyncProductService(db)
+        stats = await service.get_statistics()
+        return success_response(stats, "Estadísticas obtenidas exitosamente")
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error interno del servidor")
+
+@router.get("/search", response_model=dict)
+async def search_products(
+    q: str,
+    min_price: Optional[Decimal] = None,
+    max_price: Optional[Decimal] = None,
+    min_stock: Optional[int] = None,
+    max_stock: Optional[int] = None,
+    skip: int = 0,
+    limit: int = 20,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    try:
+        filters = ProductSearchFilters(min_price=min_price, max_price=max_price, min_stock=min_stock, max_stock=max_stock)
+        service = AsyncProductService(db)
+        products = await service.search_products(q, filters, skip, limit)
+        return fast_success_response(products, "Búsqueda de productos completada")
+    except ValidationError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=format_validation_error(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error interno del servidor")
+
+@router.get("/low-stock", response_model=dict)
+async def get_low_stock_products(
+    skip: int = 0,
+    limit: int = 100,
+    category: Optional[str] = None,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    try:
+        service = AsyncProductService(db)
+        products = await service.get_low_stock_products(category, skip, limit, cursor)
+        return fast_success_response(
+            products,
+            "Productos con stock bajo obtenidos exitosamente",
+            build_next_cursor(products, limit, "id")
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error interno del servidor")
+
+@router.get("/categories/reorder-points", response_model=dict)
+async def get_category_reorder_points(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    try:
+        service = AsyncProductService(db)
+        return success_response(await service.get_category_reorder_points(), "Puntos de pedido obtenidos exitosamente")
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error interno del servidor")
+
+@router.put("/categories/{category}/reorder-point", response_model=dict)
+async def set_category_reorder_point(
+    category: str,
+    reorder_point: CategoryReorderPointUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    try:
+        service = AsyncProductService(db)
+        result = await service.set_category_reorder_point(category, reorder_point.reorder_point, current_user.id)
+        return success_response(result, "Punto de pedido actualizado exitosamente")
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error interno del servidor")
+
+@router.get("/{product_id}", response_model=dict)
+async def get_product(
+    product_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    service = AsyncProductService(db)
+    version = await service.get_product_version(product_id)
+    if not version:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Producto no encontrado")
+    not_modified = not_modified_response(request, *version)
+    if not_modified:
+        return not_modified
+    product = await service.get_product_data(product_id)
+    if not product:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Producto no encontrado")
+    result = fast_success_response(product, "Producto obtenido exitosamente")
+    set_validators(result, *version)
+    return result
+
+@router.get("/{product_id}/history", response_model=dict)
+async def get_product_history(
+    product_id: int,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    try:
+        service = AsyncProductService(db)
+        logs = await service.get_product_history(product_id, skip, limit, cursor)
+        return fast_success_response(
+            logs,
+            "Historial del producto obtenido exitosamente",
+            build_next_cursor(logs, limit, "created", "id")
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error interno del servidor")
+
+@router.put("/{product_id}", response_model=dict)
+async def update_product(
+    product_id: int,
+    product_update: ProductUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    try:
+        service = AsyncProductService(db)
+        updated_product = await service.update_product(product_id, product_update, current_user.id)
+        if not updated_product:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Producto no encontrado")
+        return success_response(updated_product.model_dump(), "Producto actualizado exitosamente")
+    except HTTPException:
+        raise
+    except ConflictError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error interno del servidor")
+
+@router.post("/{product_id}/stock/adjust", response_model=dict)
+async def adjust_stock(
+    product_id: int,
+    adjustment: StockAdjustment,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    try:
+        service = AsyncProductService(db)
+        product = await service.adjust_stock(product_id, adjustment.delta, current_user.id)
+    except ConflictError as e:
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error interno del servidor")
+    if not product:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Producto no encontrado")
+    return success_response(product.model_dump(), "Stock ajustado exitosamente")
+
+@router.delete("/{product_id}", response_model=dict)
+async def delete_product(
+    product_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    service = AsyncProductService(db)
+    deleted = await service.delete_product(product_id, current_user.id)
+    if not deleted:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Producto no encontrado")
+    return success_response(None, "Producto eliminado exitosamente")
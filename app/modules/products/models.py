@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Integer, Numeric
+from sqlalchemy import BigInteger, Column, JSON, String, DateTime, Index, Integer, Numeric
 from sqlalchemy.sql import func
 from app.core.database import Base
 
@@ -10,5 +10,47 @@ class Product(Base):
     category = Column(String, nullable=False)
     price = Column(Numeric(10, 2), nullable=False)
     stock = Column(Integer, nullable=False, default=0)
+    reorder_point = Column(Integer, nullable=True)
+    reorder_level = Column(Integer, nullable=True)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
     created = Column(DateTime(timezone=True), server_default=func.now())
     updated = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    __table_args__ = (
+        Index("ix_products_category_id", category, id),
+        Index("ix_products_low_stock", id, postgresql_where=stock <= reorder_level, sqlite_where=stock <= reorder_level),
+        Index(
+            "ix_products_low_stock_category", category, id,
+            postgresql_where=stock <= reorder_level, sqlite_where=stock <= reorder_level
+        ),
+    )
+
+class CategoryReorderPoint(Base):
+    __tablename__ = "category_reorder_points"
+    
+    category = Column(String, primary_key=True)
+    reorder_point = Column(Integer, nullable=False)
+    updated = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+
+class ProductChange(Base):
+    __tablename__ = "product_changes"
+    
+    seq = Column(BigInteger().with_variant(Integer, "sqlite"), primary_key=True, autoincrement=True)
+    product_id = Column(Integer, nullable=False)
+    operation = Column(String, nullable=False)
+    data = Column(JSON, nullable=True)
+    created = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        Index("ix_product_changes_created", created),
+    )
+
+class ProductCategoryStats(Base):
+    __tablename__ = "product_category_stats"
+    
+    category = Column(String, primary_key=True)
+    product_count = Column(Integer, nullable=False, default=0)
+    stock_units = Column(BigInteger, nullable=False, default=0)
+    stock_value = Column(Numeric(18, 2), nullable=False, default=0)
+    version = Column(BigInteger, nullable=False, default=1)
+    updated = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
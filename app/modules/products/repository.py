@@ -1,56 +1,320 @@
+from types import SimpleNamespace
+from sqlalchemy import case, delete, func, insert, select, update
 from sqlalchemy.orm import Session
-from typing import Optional, List
-from app.modules.products.models import Product
-from app.modules.products.schemas import ProductCreate, ProductUpdate
+from typing import Dict, Iterable, Iterator, Mapping, Optional, List, Tuple
+from datetime import datetime
+from app.core.config import settings
+from app.core.database import dialect_insert, replica_read
+from app.core.exceptions import ConflictError, NotFoundError
+from app.core.responses import response_columns
+from app.core.utils import chunked
+from app.modules.products.alerts import reorder_level, reorder_points_statement, stock_alerts
+from app.modules.products.changes import CHANGE_COLUMNS, CREATE, DELETE, UPDATE, product_change_feed, record_changes
+from app.modules.products.models import CategoryReorderPoint, Product
+from app.modules.products.schemas import ProductCreate, ProductResponse, ProductSearchFilters, ProductUpdate
+from app.modules.products.search import documents_statement, full_text_statement, matching_ids_statement, order_ranked, uses_full_text
+from app.modules.products.statistics import StatisticsDelta, get_aggregate_version, get_snapshot
+
+PRODUCT_COLUMNS = response_columns(Product, ProductResponse)
 
 class ProductRepository:
     def __init__(self, db: Session):
         self.db = db
     
+    def category_reorder_points(self, categories: Iterable[str]) -> Dict[str, int]:
+        return dict(self.db.execute(reorder_points_statement(categories)).all())
+    
+    def _reorder_level(self, reorder_point: Optional[int], category: str) -> Optional[int]:
+        if reorder_point is not None:
+            return reorder_point
+        return self.db.scalar(select(CategoryReorderPoint.reorder_point).where(CategoryReorderPoint.category == category))
+    
     def create(self, product: ProductCreate) -> Product:
         db_product = Product(**product.model_dump())
+        db_product.reorder_level = self._reorder_level(db_product.reorder_point, db_product.category)
         self.db.add(db_product)
+        self.db.flush()
+        record_changes(self.db, CREATE, [db_product])
+        stats = StatisticsDelta()
+        stats.add(db_product.category, db_product.price, db_product.stock)
+        stats.apply(self.db)
         self.db.commit()
         self.db.refresh(db_product)
+        stock_alerts.observe(db_product, None, None)
+        product_change_feed.notify()
         return db_product
     
+    def bulk_create(self, products: List[dict]) -> List:
+        points = self.category_reorder_points(product["category"] for product in products)
+        for product in products:
+            product["reorder_level"] = reorder_level(product.get("reorder_point"), product["category"], points)
+        rows = self.db.execute(insert(Product).returning(*CHANGE_COLUMNS, sort_by_parameter_order=True), products).all()
+        record_changes(self.db, CREATE, rows)
+        stats = StatisticsDelta()
+        for product in products:
+            stats.add(product["category"], product["price"], product["stock"])
+        stats.apply(self.db)
+        self.db.commit()
+        product_change_feed.notify()
+        return rows
+    
+    def bulk_update(self, updates: List[dict]) -> Tuple[List, List[int], List[int]]:
+        ids = {row["id"] for row in updates}
+        current = {
+            row.id: row._asdict()
+            for row in self.db.query(
+                Product.id, Product.name, Product.category, Product.price, Product.stock,
+                Product.reorder_point, Product.reorder_level, Product.version
+            ).filter(Product.id.in_(ids)).order_by(Product.id).with_for_update()
+        }
+        conflicts = set()
+        for row in updates:
+            expected_version = row.pop("version", None)
+            if row["id"] in current and expected_version not in (None, current[row["id"]]["version"]):
+                conflicts.add(row["id"])
+        found = [row for row in updates if row["id"] in current and row["id"] not in conflicts and len(row) > 1]
+        states = []
+        if found:
+            points = self.category_reorder_points(row.get("category", current[row["id"]]["category"]) for row in found)
+            stats = StatisticsDelta()
+            previous = {}
+            for row in found:
+                state = current[row["id"]]
+                previous[row["id"]] = (state["stock"], state["reorder_level"])
+                stats.remove(state["category"], state["price"], state["stock"])
+                state.update({field: row[field] for field in ("name", "category", "price", "stock", "reorder_point") if field in row})
+                if "category" in row or "reorder_point" in row:
+                    state["reorder_level"] = row["reorder_level"] = reorder_level(state["reorder_point"], state["category"], points)
+                state["version"] += 1
+                row["version"] = state["version"]
+                stats.add(state["category"], state["price"], state["stock"])
+            self.db.execute(update(Product), found)
+            states = [SimpleNamespace(**current[product_id]) for product_id in previous]
+            record_changes(self.db, UPDATE, states)
+            stats.apply(self.db)
+            self.db.commit()
+            for state in states:
+                stock_alerts.observe(state, *previous[state.id])
+            product_change_feed.notify()
+        return states, sorted(ids - set(current)), sorted(conflicts)
+    
     def get_by_id(self, product_id: int) -> Optional[Product]:
         return self.db.query(Product).filter(Product.id == product_id).first()
     
-    def get_all(self, skip: int = 0, limit: int = 100) -> List[Product]:
-        return self.db.query(Product).offset(skip).limit(limit).all()
+    @replica_read
+    def get_many(self, product_ids: List[int]) -> List:
+        rows = []
+        for chunk in chunked(product_ids, settings.BATCH_GET_CHUNK_SIZE):
+            rows.extend(self.db.query(*PRODUCT_COLUMNS).filter(Product.id.in_(chunk)).all())
+        return rows
     
-    def get_by_category(self, category: str, skip: int = 0, limit: int = 100) -> List[Product]:
-        return self.db.query(Product).filter(Product.category == category).offset(skip).limit(limit).all()
+    def get_version(self, product_id: int):
+        return self.db.query(Product.id, Product.version, Product.created, Product.updated).filter(Product.id == product_id).first()
     
-    def update(self, product_id: int, product_update: ProductUpdate) -> Optional[Product]:
-        db_product = self.get_by_id(product_id)
-        if not db_product:
-            return None
-        
+    def get_list_version(self, category: Optional[str] = None) -> Tuple[int, int, Optional[datetime]]:
+        return get_aggregate_version(self.db, category)
+    
+    def _paginate(self, query, skip: int, limit: int, after_id: Optional[int]) -> List:
+        if after_id is not None:
+            return query.filter(Product.id > after_id).order_by(Product.id).limit(limit).all()
+        return query.order_by(Product.id).offset(skip).limit(limit).all()
+    
+    @replica_read
+    def get_all(self, skip: int = 0, limit: int = 100, after_id: Optional[int] = None) -> List:
+        return self._paginate(self.db.query(*PRODUCT_COLUMNS), skip, limit, after_id)
+    
+    @replica_read
+    def get_by_category(self, category: str, skip: int = 0, limit: int = 100, after_id: Optional[int] = None) -> List:
+        query = self.db.query(*PRODUCT_COLUMNS).filter(Product.category == category)
+        return self._paginate(query, skip, limit, after_id)
+    
+    def iter_export(
+        self,
+        category: Optional[str] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        batch_size: int = 1000
+    ) -> Iterator[Mapping]:
+        statement = select(
+            Product.id, Product.name, Product.category, Product.price,
+            Product.stock, Product.reorder_point, Product.version, Product.reorder_level, Product.created, Product.updated
+        ).order_by(Product.id)
+        if category:
+            statement = statement.where(Product.category == category)
+        if created_from:
+            statement = statement.where(Product.created >= created_from)
+        if created_to:
+            statement = statement.where(Product.created < created_to)
+        result = self.db.execute(statement.execution_options(yield_per=batch_size))
+        for row in result.mappings():
+            yield row
+    
+    def supports_full_text(self) -> bool:
+        return uses_full_text(self.db.get_bind())
+    
+    @replica_read
+    def search(self, tokens: List[str], filters: ProductSearchFilters, skip: int = 0, limit: int = 20) -> List:
+        return self.db.execute(full_text_statement(PRODUCT_COLUMNS, tokens, filters, skip, limit)).all()
+    
+    @replica_read
+    def filter_ids(self, product_ids: List[int], filters: ProductSearchFilters) -> List[int]:
+        matching = set(self.db.scalars(matching_ids_statement(product_ids, filters)))
+        return [product_id for product_id in product_ids if product_id in matching]
+    
+    @replica_read
+    def get_ranked(self, product_ids: List[int]) -> List:
+        return order_ranked(self.db.execute(select(*PRODUCT_COLUMNS).where(Product.id.in_(product_ids))), product_ids)
+    
+    def iter_search_documents(self, batch_size: int = 10000) -> Iterator[Tuple[int, str, str]]:
+        result = self.db.execute(documents_statement().execution_options(yield_per=batch_size))
+        for row in result:
+            yield tuple(row)
+    
+    def get_for_update(self, product_id: int) -> Optional[Product]:
+        return self.db.query(Product).filter(Product.id == product_id).with_for_update().first()
+    
+    def update(self, db_product: Product, product_update: ProductUpdate) -> Product:
         update_data = product_update.model_dump(exclude_unset=True)
+        expected_version = update_data.pop("version", None)
+        if expected_version is not None and expected_version != db_product.version:
+            self.db.rollback()
+            raise ConflictError("El producto fue modificado por otra operación")
+        
+        previous_stock, previous_level = db_product.stock, db_product.reorder_level
+        stats = StatisticsDelta()
+        stats.remove(db_product.category, db_product.price, db_product.stock)
         for field, value in update_data.items():
             setattr(db_product, field, value)
+        if "reorder_point" in update_data or "category" in update_data:
+            db_product.reorder_level = self._reorder_level(db_product.reorder_point, db_product.category)
+        db_product.version = db_product.version + 1
+        record_changes(self.db, UPDATE, [db_product])
+        stats.add(db_product.category, db_product.price, db_product.stock)
+        stats.apply(self.db)
         
         self.db.commit()
         self.db.refresh(db_product)
+        stock_alerts.observe(db_product, previous_stock, previous_level)
+        product_change_feed.notify()
         return db_product
     
-    def delete(self, product_id: int) -> bool:
-        db_product = self.get_by_id(product_id)
-        if not db_product:
-            return False
+    def adjust_stock(self, product_id: int, delta: int):
+        statement = (
+            update(Product)
+            .where(Product.id == product_id, Product.stock + delta >= 0)
+            .values(stock=Product.stock + delta, version=Product.version + 1)
+            .returning(*Product.__table__.columns)
+            .execution_options(synchronize_session=False)
+        )
+        row = self.db.execute(statement).first()
+        if row is None:
+            self.db.rollback()
+            if self.get_version(product_id) is None:
+                return None
+            raise ConflictError("Stock insuficiente")
+        record_changes(self.db, UPDATE, [row])
+        stats = StatisticsDelta()
+        stats.adjust_stock(row.category, row.price, delta)
+        stats.apply(self.db)
+        self.db.commit()
+        stock_alerts.observe(row, row.stock - delta, row.reorder_level)
+        product_change_feed.notify()
+        return row
+    
+    def adjust_stock_batch(self, deltas: Dict[int, int]) -> List:
+        ids = sorted(deltas)
+        current = {
+            row.id: row
+            for row in self.db.query(Product.id, Product.stock)
+            .filter(Product.id.in_(ids)).order_by(Product.id).with_for_update()
+        }
+        missing = [product_id for product_id in ids if product_id not in current]
+        if missing:
+            self.db.rollback()
+            raise NotFoundError("Productos no encontrados: " + ", ".join(map(str, missing)))
+        insufficient = [product_id for product_id in ids if current[product_id].stock + deltas[product_id] < 0]
+        if insufficient:
+            self.db.rollback()
+            raise ConflictError("Stock insuficiente para los productos: " + ", ".join(map(str, insufficient)))
+        change = case(deltas, value=Product.id)
+        statement = (
+            update(Product)
+            .where(Product.id.in_(ids), Product.stock + change >= 0)
+            .values(stock=Product.stock + change, version=Product.version + 1)
+            .returning(*Product.__table__.columns)
+            .execution_options(synchronize_session=False)
+        )
+        rows = sorted(self.db.execute(statement).all(), key=lambda row: row.id)
+        if len(rows) != len(ids):
+            self.db.rollback()
+            applied = {row.id for row in rows}
+            raise ConflictError("Stock insuficiente para los productos: " + ", ".join(str(product_id) for product_id in ids if product_id not in applied))
+        record_changes(self.db, UPDATE, rows)
+        stats = StatisticsDelta()
+        for row in rows:
+            stats.adjust_stock(row.category, row.price, deltas[row.id])
+        stats.apply(self.db)
+        self.db.commit()
+        for row in rows:
+            stock_alerts.observe(row, row.stock - deltas[row.id], row.reorder_level)
+        product_change_feed.notify()
+        return rows
+    
+    def delete(self, db_product: Product) -> None:
+        product_id = db_product.id
+        stats = StatisticsDelta()
+        stats.remove(db_product.category, db_product.price, db_product.stock)
         self.db.delete(db_product)
+        record_changes(self.db, DELETE, [db_product])
+        stats.apply(self.db)
         self.db.commit()
-        return True
-    
-    def count_total(self) -> int:
-        return self.db.query(Product).count()
-    
-    def count_by_category(self) -> List[dict]:
-        from sqlalchemy import func
-        result = self.db.query(
-            Product.category,
-            func.count(Product.id).label('count')
-        ).group_by(Product.category).all()
-        return [{"category": row[0], "count": row[1]} for row in result]
+        stock_alerts.forget(product_id)
+        product_change_feed.notify()
+    
+    @replica_read
+    def get_low_stock(self, category: Optional[str] = None, skip: int = 0, limit: int = 100, after_id: Optional[int] = None) -> List:
+        query = self.db.query(*PRODUCT_COLUMNS).filter(Product.stock <= Product.reorder_level)
+        if category:
+            query = query.filter(Product.category == category)
+        return self._paginate(query, skip, limit, after_id)
+    
+    def get_category_reorder_points(self) -> List:
+        return self.db.query(CategoryReorderPoint.category, CategoryReorderPoint.reorder_point).order_by(CategoryReorderPoint.category).all()
+    
+    def set_category_reorder_point(self, category: str, reorder_point: Optional[int]) -> List:
+        previous = self.db.scalar(
+            select(CategoryReorderPoint.reorder_point).where(CategoryReorderPoint.category == category).with_for_update()
+        )
+        if reorder_point is None:
+            self.db.execute(delete(CategoryReorderPoint).where(CategoryReorderPoint.category == category))
+        else:
+            statement = dialect_insert(self.db, CategoryReorderPoint.__table__).values(category=category, reorder_point=reorder_point)
+            self.db.execute(statement.on_conflict_do_update(
+                index_elements=[CategoryReorderPoint.category],
+                set_={"reorder_point": reorder_point, "updated": func.now()}
+            ))
+        rows = []
+        if previous != reorder_point:
+            statement = (
+                update(Product)
+                .where(Product.category == category, Product.reorder_point.is_(None))
+                .values(reorder_level=reorder_point, version=Product.version + 1)
+                .returning(*Product.__table__.columns)
+                .execution_options(synchronize_session=False)
+            )
+            rows = self.db.execute(statement).all()
+        if rows:
+            record_changes(self.db, UPDATE, rows)
+            stats = StatisticsDelta()
+            stats.touch(category)
+            stats.apply(self.db)
+        self.db.commit()
+        for row in rows:
+            stock_alerts.observe(row, row.stock, previous)
+        if rows:
+            product_change_feed.notify()
+        return rows
+    
+    @replica_read
+    def get_statistics(self) -> List:
+        return get_snapshot(self.db)
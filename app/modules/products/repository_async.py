@@ -0,0 +1,250 @@
+from sqlalchemy import case, delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, Optional, List, Tuple
+from datetime import datetime
+from app.core.config import settings
+from app.core.database import dialect_insert, replica_read
+from app.core.exceptions import ConflictError, NotFoundError
+from app.modules.products.alerts import stock_alerts
+from app.modules.products.changes import CREATE, DELETE, UPDATE, product_change_feed, record_changes_async
+from app.modules.products.models import CategoryReorderPoint, Product, ProductCategoryStats
+from app.modules.products.schemas import ProductCreate, ProductSearchFilters, ProductUpdate
+from app.modules.products.repository import PRODUCT_COLUMNS
+from app.modules.products.search import documents_statement, full_text_statement, matching_ids_statement, order_ranked, uses_full_text
+from app.modules.products.statistics import StatisticsDelta, snapshot_statement, version_statement
+from app.core.utils import chunked
+
+class AsyncProductRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def _reorder_level(self, reorder_point: Optional[int], category: str) -> Optional[int]:
+        if reorder_point is not None:
+            return reorder_point
+        return await self.db.scalar(select(CategoryReorderPoint.reorder_point).where(CategoryReorderPoint.category == category))
+    
+    async def create(self, product: ProductCreate) -> Product:
+        db_product = Product(**product.model_dump())
+        db_product.reorder_level = await self._reorder_level(db_product.reorder_point, db_product.category)
+        self.db.add(db_product)
+        await self.db.flush()
+        await record_changes_async(self.db, CREATE, [db_product])
+        stats = StatisticsDelta()
+        stats.add(db_product.category, db_product.price, db_product.stock)
+        await stats.apply_async(self.db)
+        await self.db.commit()
+        await self.db.refresh(db_product)
+        stock_alerts.observe(db_product, None, None)
+        product_change_feed.notify()
+        return db_product
+    
+    async def get_by_id(self, product_id: int) -> Optional[Product]:
+        return await self.db.scalar(select(Product).where(Product.id == product_id))
+    
+    @replica_read
+    async def get_many(self, product_ids: List[int]) -> List:
+        rows = []
+        for chunk in chunked(product_ids, settings.BATCH_GET_CHUNK_SIZE):
+            result = await self.db.execute(select(*PRODUCT_COLUMNS).where(Product.id.in_(chunk)))
+            rows.extend(result.all())
+        return rows
+    
+    async def get_version(self, product_id: int):
+        result = await self.db.execute(
+            select(Product.id, Product.version, Product.created, Product.updated).where(Product.id == product_id)
+        )
+        return result.first()
+    
+    async def get_list_version(self, category: Optional[str] = None) -> Tuple[int, int, Optional[datetime]]:
+        result = await self.db.execute(version_statement(category))
+        return tuple(result.one())
+    
+    async def _paginate(self, statement, skip: int, limit: int, after_id: Optional[int]) -> List:
+        statement = statement.order_by(Product.id).limit(limit)
+        if after_id is not None:
+            statement = statement.where(Product.id > after_id)
+        else:
+            statement = statement.offset(skip)
+        result = await self.db.execute(statement)
+        return result.all()
+    
+    @replica_read
+    async def get_all(self, skip: int = 0, limit: int = 100, after_id: Optional[int] = None) -> List:
+        return await self._paginate(select(*PRODUCT_COLUMNS), skip, limit, after_id)
+    
+    @replica_read
+    async def get_by_category(self, category: str, skip: int = 0, limit: int = 100, after_id: Optional[int] = None) -> List:
+        return await self._paginate(select(*PRODUCT_COLUMNS).where(Product.category == category), skip, limit, after_id)
+    
+    def supports_full_text(self) -> bool:
+        return uses_full_text(self.db.get_bind())
+    
+    @replica_read
+    async def search(self, tokens: List[str], filters: ProductSearchFilters, skip: int = 0, limit: int = 20) -> List:
+        result = await self.db.execute(full_text_statement(PRODUCT_COLUMNS, tokens, filters, skip, limit))
+        return result.all()
+    
+    @replica_read
+    async def filter_ids(self, product_ids: List[int], filters: ProductSearchFilters) -> List[int]:
+        matching = set(await self.db.scalars(matching_ids_statement(product_ids, filters)))
+        return [product_id for product_id in product_ids if product_id in matching]
+    
+    @replica_read
+    async def get_ranked(self, product_ids: List[int]) -> List:
+        return order_ranked(await self.db.execute(select(*PRODUCT_COLUMNS).where(Product.id.in_(product_ids))), product_ids)
+    
+    async def get_search_documents(self) -> List[Tuple[int, str, str]]:
+        result = await self.db.execute(documents_statement())
+        return [tuple(row) for row in result]
+    
+    async def get_for_update(self, product_id: int) -> Optional[Product]:
+        return await self.db.scalar(select(Product).where(Product.id == product_id).with_for_update())
+    
+    async def update(self, db_product: Product, product_update: ProductUpdate) -> Product:
+        update_data = product_update.model_dump(exclude_unset=True)
+        expected_version = update_data.pop("version", None)
+        if expected_version is not None and expected_version != db_product.version:
+            await self.db.rollback()
+            raise ConflictError("El producto fue modificado por otra operación")
+        
+        previous_stock, previous_level = db_product.stock, db_product.reorder_level
+        stats = StatisticsDelta()
+        stats.remove(db_product.category, db_product.price, db_product.stock)
+        for field, value in update_data.items():
+            setattr(db_product, field, value)
+        if "reorder_point" in update_data or "category" in update_data:
+            db_product.reorder_level = await self._reorder_level(db_product.reorder_point, db_product.category)
+        db_product.version = db_product.version + 1
+        await record_changes_async(self.db, UPDATE, [db_product])
+        stats.add(db_product.category, db_product.price, db_product.stock)
+        await stats.apply_async(self.db)
+        
+        await self.db.commit()
+        await self.db.refresh(db_product, ["updated"])
+        stock_alerts.observe(db_product, previous_stock, previous_level)
+        product_change_feed.notify()
+        return db_product
+    
+    async def adjust_stock(self, product_id: int, delta: int):
+        statement = (
+            update(Product)
+            .where(Product.id == product_id, Product.stock + delta >= 0)
+            .values(stock=Product.stock + delta, version=Product.version + 1)
+            .returning(*Product.__table__.columns)
+            .execution_options(synchronize_session=False)
+        )
+        row = (await self.db.execute(statement)).first()
+        if row is None:
+            await self.db.rollback()
+            if await self.get_version(product_id) is None:
+                return None
+            raise ConflictError("Stock insuficiente")
+        await record_changes_async(self.db, UPDATE, [row])
+        stats = StatisticsDelta()
+        stats.adjust_stock(row.category, row.price, delta)
+        await stats.apply_async(self.db)
+        await self.db.commit()
+        stock_alerts.observe(row, row.stock - delta, row.reorder_level)
+        product_change_feed.notify()
+        return row
+    
+    async def adjust_stock_batch(self, deltas: Dict[int, int]) -> List:
+        ids = sorted(deltas)
+        result = await self.db.execute(
+            select(Product.id, Product.stock).where(Product.id.in_(ids)).order_by(Product.id).with_for_update()
+        )
+        current = {row.id: row for row in result}
+        missing = [product_id for product_id in ids if product_id not in current]
+        if missing:
+            await self.db.rollback()
+            raise NotFoundError("Productos no encontrados: " + ", ".join(map(str, missing)))
+        insufficient = [product_id for product_id in ids if current[product_id].stock + deltas[product_id] < 0]
+        if insufficient:
+            await self.db.rollback()
+            raise ConflictError("Stock insuficiente para los productos: " + ", ".join(map(str, insufficient)))
+        change = case(deltas, value=Product.id)
+        statement = (
+            update(Product)
+            .where(Product.id.in_(ids), Product.stock + change >= 0)
+            .values(stock=Product.stock + change, version=Product.version + 1)
+            .returning(*Product.__table__.columns)
+            .execution_options(synchronize_session=False)
+        )
+        rows = sorted((await self.db.execute(statement)).all(), key=lambda row: row.id)
+        if len(rows) != len(ids):
+            await self.db.rollback()
+            applied = {row.id for row in rows}
+            raise ConflictError("Stock insuficiente para los productos: " + ", ".join(str(product_id) for product_id in ids if product_id not in applied))
+        await record_changes_async(self.db, UPDATE, rows)
+        stats = StatisticsDelta()
+        for row in rows:
+            stats.adjust_stock(row.category, row.price, deltas[row.id])
+        await stats.apply_async(self.db)
+        await self.db.commit()
+        for row in rows:
+            stock_alerts.observe(row, row.stock - deltas[row.id], row.reorder_level)
+        product_change_feed.notify()
+        return rows
+    
+    async def delete(self, db_product: Product) -> None:
+        product_id = db_product.id
+        stats = StatisticsDelta()
+        stats.remove(db_product.category, db_product.price, db_product.stock)
+        await self.db.delete(db_product)
+        await record_changes_async(self.db, DELETE, [db_product])
+        await stats.apply_async(self.db)
+        await self.db.commit()
+        stock_alerts.forget(product_id)
+        product_change_feed.notify()
+    
+    @replica_read
+    async def get_low_stock(self, category: Optional[str] = None, skip: int = 0, limit: int = 100, after_id: Optional[int] = None) -> List:
+        statement = select(*PRODUCT_COLUMNS).where(Product.stock <= Product.reorder_level)
+        if category:
+            statement = statement.where(Product.category == category)
+        return await self._paginate(statement, skip, limit, after_id)
+    
+    async def get_category_reorder_points(self) -> List:
+        result = await self.db.execute(
+            select(CategoryReorderPoint.category, CategoryReorderPoint.reorder_point).order_by(CategoryReorderPoint.category)
+        )
+        return result.all()
+    
+    async def set_category_reorder_point(self, category: str, reorder_point: Optional[int]) -> List:
+        previous = await self.db.scalar(
+            select(CategoryReorderPoint.reorder_point).where(CategoryReorderPoint.category == category).with_for_update()
+        )
+        if reorder_point is None:
+            await self.db.execute(delete(CategoryReorderPoint).where(CategoryReorderPoint.category == category))
+        else:
+            statement = dialect_insert(self.db, CategoryReorderPoint.__table__).values(category=category, reorder_point=reorder_point)
+            await self.db.execute(statement.on_conflict_do_update(
+                index_elements=[CategoryReorderPoint.category],
+                set_={"reorder_point": reorder_point, "updated": func.now()}
+            ))
+        rows = []
+        if previous != reorder_point:
+            statement = (
+                update(Product)
+                .where(Product.category == category, Product.reorder_point.is_(None))
+                .values(reorder_level=reorder_point, version=Product.version + 1)
+                .returning(*Product.__table__.columns)
+                .execution_options(synchronize_session=False)
+            )
+            rows = (await self.db.execute(statement)).all()
+        if rows:
+            await record_changes_async(self.db, UPDATE, rows)
+            stats = StatisticsDelta()
+            stats.touch(category)
+            await stats.apply_async(self.db)
+        await self.db.commit()
+        for row in rows:
+            stock_alerts.observe(row, row.stock, previous)
+        if rows:
+            product_change_feed.notify()
+        return rows
+    
+    @replica_read
+    async def get_statistics(self) -> List[ProductCategoryStats]:
+        result = await self.db.scalars(snapshot_statement())
+        return list(result)
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field, field_validator
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 from decimal import Decimal
 
@@ -8,6 +8,7 @@ class ProductBase(BaseModel):
     category: str = Field(..., min_length=1, max_length=100)
     price: Decimal = Field(..., gt=0)
     stock: int = Field(..., ge=0)
+    reorder_point: Optional[int] = Field(None, ge=0)
     
     @field_validator('price')
     @classmethod
@@ -24,6 +25,8 @@ class ProductUpdate(BaseModel):
     category: Optional[str] = Field(None, min_length=1, max_length=100)
     price: Optional[Decimal] = Field(None, gt=0)
     stock: Optional[int] = Field(None, ge=0)
+    reorder_point: Optional[int] = Field(None, ge=0)
+    version: Optional[int] = Field(None, ge=1)
     
     @field_validator('price')
     @classmethod
@@ -34,8 +37,48 @@ class ProductUpdate(BaseModel):
             return round(v, 2)
         return v
 
+class ProductBulkUpdate(ProductUpdate):
+    id: int
+    
+    @field_validator('name', 'category', 'price', 'stock')
+    @classmethod
+    def reject_null(cls, v):
+        if v is None:
+            raise ValueError('El campo no puede ser nulo')
+        return v
+
+class StockAdjustment(BaseModel):
+    delta: int
+    
+    @field_validator('delta')
+    @classmethod
+    def validate_delta(cls, v):
+        if v == 0:
+            raise ValueError('El ajuste de stock no puede ser 0')
+        return v
+
+class StockAdjustmentItem(StockAdjustment):
+    id: int
+
+class StockAdjustmentBatch(BaseModel):
+    items: List[StockAdjustmentItem] = Field(..., min_length=1, max_length=1000)
+
+class CategoryReorderPointUpdate(BaseModel):
+    reorder_point: Optional[int] = Field(..., ge=0)
+
+class ProductBatchGet(BaseModel):
+    ids: List[int] = Field(..., min_length=1)
+
+class ProductSearchFilters(BaseModel):
+    min_price: Optional[Decimal] = Field(None, ge=0)
+    max_price: Optional[Decimal] = Field(None, ge=0)
+    min_stock: Optional[int] = Field(None, ge=0)
+    max_stock: Optional[int] = Field(None, ge=0)
+
 class ProductResponse(ProductBase):
     id: int
+    version: int = 1
+    reorder_level: Optional[int] = None
     created: datetime
     updated: Optional[datetime] = None
     
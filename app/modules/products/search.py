@@ -0,0 +1,284 @@
+import bisect
+import heapq
+import logging
+import re
+import threading
+import unicodedata
+from collections import Counter, defaultdict
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+from sqlalchemy import column, func, literal, or_, select
+from sqlalchemy.dialects.postgresql import TSVECTOR
+from sqlalchemy.sql import Select
+from app.core.database import engine
+from app.modules.products.models import Product
+from app.modules.products.schemas import ProductSearchFilters
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r"\w+")
+NAME_WEIGHT = 2.0
+CATEGORY_WEIGHT = 1.0
+EXACT_FACTOR = 1.0
+PREFIX_FACTOR = 0.6
+FUZZY_FACTOR = 0.3
+MAX_EXPANSIONS = 64
+MAX_QUERY_TOKENS = 8
+RANKED_CHUNK_SIZE = 1000
+
+search_vector = column("search_vector", TSVECTOR)
+search_text = column("search_text")
+
+def normalize(value: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", value.lower())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+def tokenize(value: str) -> List[str]:
+    return TOKEN_PATTERN.findall(value.lower())
+
+def query_tokens(query: str) -> List[str]:
+    tokens = list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TOKENS]
+    if not tokens:
+        raise ValueError("La búsqueda debe contener al menos una palabra")
+    return tokens
+
+def validate_filters(filters: ProductSearchFilters) -> None:
+    if filters.min_price is not None and filters.max_price is not None and filters.min_price > filters.max_price:
+        raise ValueError("El precio mínimo no puede ser mayor que el máximo")
+    if filters.min_stock is not None and filters.max_stock is not None and filters.min_stock > filters.max_stock:
+        raise ValueError("El stock mínimo no puede ser mayor que el máximo")
+
+def max_typos(token: str) -> int:
+    if len(token) < 4:
+        return 0
+    return 1 if len(token) < 8 else 2
+
+def trigrams(token: str) -> Set[str]:
+    padded = f"  {token} "
+    return {padded[index:index + 3] for index in range(len(padded) - 2)}
+
+def within_distance(left: str, right: str, limit: int) -> bool:
+    if abs(len(left) - len(right)) > limit:
+        return False
+    before, previous = None, list(range(len(right) + 1))
+    for row, left_char in enumerate(left, 1):
+        current = [row]
+        for position, right_char in enumerate(right, 1):
+            distance = min(
+                previous[position] + 1,
+                current[position - 1] + 1,
+                previous[position - 1] + (left_char != right_char)
+            )
+            if before and position > 1 and left_char == right[position - 2] and left[row - 2] == right_char:
+                distance = min(distance, before[position - 2] + 1)
+            current.append(distance)
+        if min(current) > limit:
+            return False
+        before, previous = previous, current
+    return previous[-1] <= limit
+
+def apply_filters(statement: Select, filters: ProductSearchFilters) -> Select:
+    if filters.min_price is not None:
+        statement = statement.where(Product.price >= filters.min_price)
+    if filters.max_price is not None:
+        statement = statement.where(Product.price <= filters.max_price)
+    if filters.min_stock is not None:
+        statement = statement.where(Product.stock >= filters.min_stock)
+    if filters.max_stock is not None:
+        statement = statement.where(Product.stock <= filters.max_stock)
+    return statement
+
+def full_text_statement(columns: list, tokens: List[str], filters: ProductSearchFilters, skip: int, limit: int) -> Select:
+    phrase = " ".join(tokens)
+    ts_query = func.to_tsquery("simple", " & ".join(f"{token}:*" for token in tokens))
+    rank = func.ts_rank(search_vector, ts_query) * 2 + func.word_similarity(phrase, search_text)
+    statement = (
+        select(*columns)
+        .where(or_(search_vector.op("@@")(ts_query), literal(phrase).op("<%")(search_text)))
+        .order_by(rank.desc(), Product.id)
+        .offset(skip)
+        .limit(limit)
+    )
+    return apply_filters(statement, filters)
+
+def rank_key(item: Tuple[int, float]) -> Tuple[float, int]:
+    return -item[1], item[0]
+
+def ranked_windows(scores: Dict[int, float], wanted: int, filtered: bool) -> Iterator[List[int]]:
+    size, seen = wanted * 4 if filtered else wanted, 0
+    while seen < len(scores):
+        ranked = heapq.nsmallest(seen + size, scores.items(), key=rank_key)
+        for start in range(seen, len(ranked), RANKED_CHUNK_SIZE):
+            yield [product_id for product_id, _ in ranked[start:start + RANKED_CHUNK_SIZE]]
+        seen, size = len(ranked), size * 4
+
+def uses_full_text(bind) -> bool:
+    return bind.dialect.name == "postgresql"
+
+def documents_statement() -> Select:
+    return select(Product.id, Product.name, Product.category)
+
+def matching_ids_statement(product_ids: List[int], filters: ProductSearchFilters) -> Select:
+    return apply_filters(select(Product.id).where(Product.id.in_(product_ids)), filters)
+
+def order_ranked(rows: Iterable, product_ids: List[int]) -> List:
+    by_id = {row.id: row for row in rows}
+    return [by_id[product_id] for product_id in product_ids if product_id in by_id]
+
+class SearchIndex:
+    def __init__(self):
+        self.ready = False
+        self._lock = threading.RLock()
+        self._build_lock = threading.Lock()
+        self._documents: Dict[int, Tuple[str, ...]] = {}
+        self._postings: Dict[str, Dict[int, float]] = {}
+        self._tokens: List[str] = []
+        self._trigrams: Dict[str, Set[str]] = defaultdict(set)
+        self._journal: Optional[Dict[int, Optional[Tuple[str, str]]]] = None
+    
+    def _weights(self, name: str, category: str) -> Dict[str, float]:
+        weights = defaultdict(float)
+        for token in set(tokenize(normalize(category))):
+            weights[token] += CATEGORY_WEIGHT
+        for token in set(tokenize(normalize(name))):
+            weights[token] += NAME_WEIGHT
+        return weights
+    
+    def _insert(self, product_id: int, name: str, category: str) -> None:
+        weights = self._weights(name, category)
+        for token, weight in weights.items():
+            postings = self._postings.get(token)
+            if postings is None:
+                postings = self._postings[token] = {}
+                bisect.insort(self._tokens, token)
+                for trigram in trigrams(token):
+                    self._trigrams[trigram].add(token)
+            postings[product_id] = weight
+        self._documents[product_id] = tuple(weights)
+    
+    def _discard(self, product_id: int) -> None:
+        for token in self._documents.pop(product_id, ()):
+            postings = self._postings[token]
+            postings.pop(product_id, None)
+            if not postings:
+                del self._postings[token]
+                del self._tokens[bisect.bisect_left(self._tokens, token)]
+                for trigram in trigrams(token):
+                    self._trigrams[trigram].discard(token)
+    
+    def rebuild(self, rows: Iterable[Tuple[int, str, str]]) -> None:
+        with self._build_lock:
+            self._rebuild(rows)
+    
+    def _rebuild(self, rows: Iterable[Tuple[int, str, str]]) -> None:
+        with self._lock:
+            self._journal = {}
+        fresh = SearchIndex()
+        try:
+            for product_id, name, category in rows:
+                fresh._insert(product_id, name, category)
+        except Exception:
+            with self._lock:
+                self._journal = None
+            raise
+        with self._lock:
+            for product_id, document in self._journal.items():
+                fresh._discard(product_id)
+                if document is not None:
+                    fresh._insert(product_id, *document)
+            self._journal = None
+            self._documents = fresh._documents
+            self._postings = fresh._postings
+            self._tokens = fresh._tokens
+            self._trigrams = fresh._trigrams
+            self.ready = True
+    
+    def ensure(self, load_rows: Callable[[], Iterable[Tuple[int, str, str]]]) -> None:
+        if self.ready:
+            return
+        with self._build_lock:
+            if not self.ready:
+                self._rebuild(load_rows())
+    
+    def add(self, product_id: int, name: str, category: str) -> None:
+        self.add_many([(product_id, name, category)])
+    
+    def add_many(self, rows: Iterable[Tuple[int, str, str]]) -> None:
+        with self._lock:
+            for product_id, name, category in rows:
+                if self._journal is not None:
+                    self._journal[product_id] = (name, category)
+                if self.ready:
+                    self._discard(product_id)
+                    self._insert(product_id, name, category)
+    
+    def remove(self, product_id: int) -> None:
+        with self._lock:
+            if self._journal is not None:
+                self._journal[product_id] = None
+            if self.ready:
+                self._discard(product_id)
+    
+    def _expand(self, token: str) -> List[Tuple[str, float]]:
+        matches = []
+        if token in self._postings:
+            matches.append((token, EXACT_FACTOR))
+        start = bisect.bisect_right(self._tokens, token)
+        for candidate in self._tokens[start:start + MAX_EXPANSIONS]:
+            if not candidate.startswith(token):
+                break
+            matches.append((candidate, PREFIX_FACTOR))
+        typos = max_typos(token)
+        if typos:
+            grams = trigrams(token)
+            shared = Counter(candidate for trigram in grams for candidate in self._trigrams.get(trigram, ()))
+            required = len(grams) - 3 * typos
+            known = {match for match, _ in matches}
+            fuzzy = [
+                candidate for candidate, count in shared.most_common()
+                if count >= required and candidate not in known and within_distance(token, candidate, typos)
+            ]
+            matches.extend((candidate, FUZZY_FACTOR) for candidate in fuzzy[:MAX_EXPANSIONS])
+        return matches
+    
+    def _token_scores(self, token: str) -> Dict[int, float]:
+        token_scores: Dict[int, float] = {}
+        for match, factor in self._expand(token):
+            postings = self._postings[match]
+            if not token_scores:
+                token_scores = postings.copy() if factor == EXACT_FACTOR else {
+                    product_id: weight * factor for product_id, weight in postings.items()
+                }
+                continue
+            for product_id, weight in postings.items():
+                score = weight * factor
+                if score > token_scores.get(product_id, 0.0):
+                    token_scores[product_id] = score
+        return token_scores
+    
+    def score(self, tokens: List[str]) -> Dict[int, float]:
+        with self._lock:
+            scores: Optional[Dict[int, float]] = None
+            for token in dict.fromkeys(normalize(token) for token in tokens):
+                token_scores = self._token_scores(token)
+                if scores is None:
+                    scores = token_scores
+                else:
+                    smaller, larger = sorted((scores, token_scores), key=len)
+                    scores = {product_id: score + larger[product_id] for product_id, score in smaller.items() if product_id in larger}
+                if not scores:
+                    return {}
+        return scores
+    
+    def stats(self) -> dict:
+        with self._lock:
+            return {"ready": self.ready, "documents": len(self._documents), "tokens": len(self._tokens)}
+
+product_search_index = SearchIndex()
+
+def refresh_search_index() -> None:
+    if uses_full_text(engine) or not product_search_index.ready:
+        return
+    with engine.connect() as connection:
+        rows = connection.execute(documents_statement().execution_options(yield_per=10000))
+        product_search_index.rebuild(tuple(row) for row in rows)
+    logger.info("Índice de búsqueda de productos reconstruido: %s documentos", product_search_index.stats()["documents"])
@@ -1,75 +1,288 @@
 from sqlalchemy.orm import Session
-from typing import Optional, List
+from pydantic_core import to_jsonable_python
+from collections import defaultdict
+from typing import Dict, Iterator, Mapping, Optional, List, Tuple
+from datetime import datetime
+from decimal import Decimal
+from app.modules.logs.actions import ActionType, EntityType, LogAction, product_action
 from app.modules.products.repository import ProductRepository
-from app.modules.products.schemas import ProductCreate, ProductUpdate, ProductResponse
+from app.modules.products.schemas import (
+    ProductCreate, ProductUpdate, ProductBulkUpdate, ProductResponse, ProductSearchFilters, StockAdjustmentItem
+)
+from app.modules.products.search import product_search_index, query_tokens, ranked_windows, validate_filters
+from app.core.config import settings
+from app.core.http_cache import make_etag, row_version
+from app.core.responses import response_fields, rows_as_dicts, rows_as_json
+from app.core.utils import batch_result, decode_cursor, unique_ids
+from app.modules.products.cache import (
+    decode_version, encode_version, item_counters, item_key, page_counters, page_key, product_cache, search_key
+)
+
+PRODUCT_FIELDS = response_fields(ProductResponse)
+
+def describe_reorder_point(reorder_point: Optional[int]) -> str:
+    return str(reorder_point) if reorder_point is not None else "el de la categoría"
+
+def describe_product_update(product_id: int, name: str, product_update: ProductUpdate) -> str:
+    changes = []
+    if product_update.name:
+        changes.append(f"nombre a '{product_update.name}'")
+    if product_update.category:
+        changes.append(f"categoría a '{product_update.category}'")
+    if product_update.price:
+        changes.append(f"precio a ${product_update.price}")
+    if product_update.stock is not None:
+        changes.append(f"stock a {product_update.stock}")
+    if "reorder_point" in product_update.model_fields_set:
+        changes.append(f"punto de pedido a {describe_reorder_point(product_update.reorder_point)}")
+    return f"Producto actualizado (ID: {product_id}, {name}): cambió " + ", ".join(changes)
+
+def describe_stock_adjustment(row, delta: int) -> str:
+    return f"Stock ajustado (ID: {row.id}, {row.name}): {delta:+d}, stock actual {row.stock}"
+
+def describe_product_creation(product) -> str:
+    return f"Producto creado: {product.name} (Categoría: {product.category}, Stock: {product.stock})"
+
+def product_update_changes(product_update: ProductUpdate) -> dict:
+    return product_update.model_dump(exclude_unset=True, exclude={"id", "version"})
+
+def stock_adjustment_entry(row, delta: int, action_type: ActionType = ActionType.STOCK_ADJUST) -> tuple:
+    return describe_stock_adjustment(row, delta), product_action(action_type, row.id), {"delta": delta, "stock": row.stock}
+
+def reorder_point_entry(category: str, reorder_point: Optional[int], updated: int) -> tuple:
+    return (
+        f"Punto de pedido de la categoría {category} cambiado a {reorder_point}: {updated} productos",
+        LogAction(ActionType.REORDER_POINT.value, EntityType.CATEGORY.value, None),
+        {"category": category, "reorder_point": reorder_point, "productos": updated}
+    )
+
+def merge_stock_adjustments(items: List[StockAdjustmentItem]) -> Dict[int, int]:
+    deltas = defaultdict(int)
+    for item in items:
+        deltas[item.id] += item.delta
+    return dict(deltas)
+
+def build_statistics(rows) -> dict:
+    by_category = [
+        {
+            "category": row.category,
+            "count": row.product_count,
+            "stock_units": row.stock_units,
+            "stock_value": row.stock_value
+        }
+        for row in rows
+    ]
+    return {
+        "total_productos": sum(row["count"] for row in by_category),
+        "total_unidades": sum(row["stock_units"] for row in by_category),
+        "valor_total": sum((row["stock_value"] for row in by_category), Decimal("0")),
+        "productos_por_categoria": by_category
+    }
+
+def list_version(aggregate, category: Optional[str], skip: int, limit: int, cursor: Optional[str]) -> Tuple[str, Optional[datetime]]:
+    count, version, updated = aggregate
+    return make_etag("products", category, skip, limit, cursor, count, version), updated
 
 class ProductService:
     def __init__(self, db: Session):
         self.repository = ProductRepository(db)
+        self.cache = product_cache
         self.db = db
     
-    def _create_log(self, user_id: int, action: str):
+    def _create_log(self, user_id: int, action: str, kind: Optional[LogAction] = None, changes: Optional[dict] = None):
         from app.modules.logs.service import LogService
         log_service = LogService(self.db)
-        log_service.create_log(user_id, action)
+        log_service.create_log(user_id, action, kind, changes)
+    
+    def _create_logs(self, user_id: int, entries: List[tuple]):
+        from app.modules.logs.service import LogService
+        LogService(self.db).create_logs(user_id, entries)
     
     def create_product(self, product: ProductCreate, user_id: int) -> ProductResponse:
         db_product = self.repository.create(product)
-        self._create_log(user_id, f"Producto creado: {product.name} (Categoría: {product.category}, Stock: {product.stock})")
+        self.cache.invalidate(categories=[db_product.category])
+        product_search_index.add(db_product.id, db_product.name, db_product.category)
+        self._create_log(
+            user_id, describe_product_creation(product), product_action(ActionType.CREATE, db_product.id), product.model_dump(exclude_none=True)
+        )
         return ProductResponse.model_validate(db_product)
     
+    def bulk_create_products(self, products: List[ProductCreate], user_id: int) -> int:
+        rows = self.repository.bulk_create([product.model_dump() for product in products])
+        self.cache.invalidate(categories={product.category for product in products})
+        product_search_index.add_many((row.id, row.name, row.category) for row in rows)
+        self._create_logs(user_id, [
+            (
+                f"Producto creado por importación masiva: {row.name} (ID: {row.id}, Categoría: {row.category}, Stock: {row.stock})",
+                product_action(ActionType.BULK_CREATE, row.id),
+                product.model_dump(exclude_none=True)
+            )
+            for row, product in zip(rows, products)
+        ])
+        return len(rows)
+    
+    def bulk_update_products(self, updates: List[ProductBulkUpdate], user_id: int) -> Dict[int, str]:
+        rows = [product_update.model_dump(exclude_unset=True) for product_update in updates]
+        changes = {product_update.id: product_update_changes(product_update) for product_update in updates}
+        states, missing, conflicts = self.repository.bulk_update(rows)
+        updated = {row["id"] for row in rows} - set(missing) - set(conflicts)
+        if updated:
+            self.cache.invalidate(product_ids=updated, all_pages=True)
+            if any("name" in row or "category" in row for row in rows):
+                product_search_index.add_many((state.id, state.name, state.category) for state in states)
+            self._create_logs(user_id, [
+                (
+                    f"Producto actualizado por actualización masiva (ID: {product_id}): cambió {', '.join(sorted(changes[product_id]))}",
+                    product_action(ActionType.BULK_UPDATE, product_id),
+                    changes[product_id]
+                )
+                for product_id in sorted(updated) if changes[product_id]
+            ])
+        errors = {product_id: "Producto no encontrado" for product_id in missing}
+        errors.update({product_id: "El producto fue modificado por otra operación" for product_id in conflicts})
+        return errors
+    
     def get_product_by_id(self, product_id: int) -> Optional[ProductResponse]:
         product = self.repository.get_by_id(product_id)
         if not product:
             return None
         return ProductResponse.model_validate(product)
     
-    def get_all_products(self, skip: int = 0, limit: int = 100) -> List[ProductResponse]:
-        products = self.repository.get_all(skip, limit)
-        return [ProductResponse.model_validate(product) for product in products]
+    def get_product_data(self, product_id: int) -> Optional[dict]:
+        def load():
+            product = self.get_product_by_id(product_id)
+            return product.model_dump(mode="json") if product else None
+        return self.cache.read_through(item_key(product_id, "data"), item_counters(product_id), load)
+    
+    def get_products_batch(self, product_ids: List[int]) -> dict:
+        ids = unique_ids(product_ids, settings.BATCH_GET_MAX_IDS)
+        found = {product["id"]: product for product in rows_as_dicts(self.repository.get_many(ids), PRODUCT_FIELDS)}
+        return batch_result(ids, found, "producto")
+    
+    def get_product_version(self, product_id: int) -> Optional[Tuple[str, Optional[datetime]]]:
+        def load():
+            row = self.repository.get_version(product_id)
+            return encode_version(row_version("product", row)) if row else None
+        return decode_version(self.cache.read_through(item_key(product_id, "version"), item_counters(product_id), load))
+    
+    def get_products_version(self, category: Optional[str], skip: int, limit: int, cursor: Optional[str]) -> Tuple[str, Optional[datetime]]:
+        def load():
+            return encode_version(list_version(self.repository.get_list_version(category), category, skip, limit, cursor))
+        key = page_key("version", category, skip, limit, cursor)
+        return decode_version(self.cache.read_through(key, page_counters(category), load))
+    
+    def get_products_page(self, category: Optional[str], skip: int, limit: int, cursor: Optional[str]) -> List[dict]:
+        def load():
+            if category:
+                products = self.get_products_by_category(category, skip, limit, cursor)
+            else:
+                products = self.get_all_products(skip, limit, cursor)
+            return to_jsonable_python(products)
+        return self.cache.read_through(page_key("data", category, skip, limit, cursor), page_counters(category), load)
     
-    def get_products_by_category(self, category: str, skip: int = 0, limit: int = 100) -> List[ProductResponse]:
-        products = self.repository.get_by_category(category, skip, limit)
-        return [ProductResponse.model_validate(product) for product in products]
+    def get_all_products(self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[dict]:
+        after_id = decode_cursor(cursor, id=int)[0] if cursor else None
+        return rows_as_dicts(self.repository.get_all(skip, limit, after_id), PRODUCT_FIELDS)
+    
+    def get_products_by_category(self, category: str, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[dict]:
+        after_id = decode_cursor(cursor, id=int)[0] if cursor else None
+        return rows_as_dicts(self.repository.get_by_category(category, skip, limit, after_id), PRODUCT_FIELDS)
+    
+    def get_low_stock_products(self, category: Optional[str] = None, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[dict]:
+        after_id = decode_cursor(cursor, id=int)[0] if cursor else None
+        return rows_as_dicts(self.repository.get_low_stock(category, skip, limit, after_id), PRODUCT_FIELDS)
+    
+    def get_category_reorder_points(self) -> List[dict]:
+        return [{"category": row.category, "reorder_point": row.reorder_point} for row in self.repository.get_category_reorder_points()]
+    
+    def set_category_reorder_point(self, category: str, reorder_point: Optional[int], user_id: int) -> dict:
+        rows = self.repository.set_category_reorder_point(category, reorder_point)
+        self.cache.invalidate([row.id for row in rows], [category])
+        self._create_log(user_id, *reorder_point_entry(category, reorder_point, len(rows)))
+        return {"category": category, "reorder_point": reorder_point, "productos_actualizados": len(rows)}
+    
+    def search_products(self, query: str, filters: ProductSearchFilters, skip: int = 0, limit: int = 20) -> List[dict]:
+        tokens = query_tokens(query)
+        validate_filters(filters)
+        
+        def load():
+            if self.repository.supports_full_text():
+                products = self.repository.search(tokens, filters, skip, limit)
+            else:
+                products = self._search_ranked(tokens, filters, skip, limit)
+            return rows_as_json(products, PRODUCT_FIELDS)
+        
+        key = search_key(tokens, filters.model_dump(), skip, limit)
+        return self.cache.read_through(key, page_counters(None), load)
+    
+    def _search_ranked(self, tokens: List[str], filters: ProductSearchFilters, skip: int, limit: int) -> List:
+        product_search_index.ensure(self.repository.iter_search_documents)
+        scores = product_search_index.score(tokens)
+        filtered = bool(filters.model_dump(exclude_none=True))
+        matches = []
+        for product_ids in ranked_windows(scores, skip + limit, filtered):
+            matches.extend(self.repository.filter_ids(product_ids, filters))
+            if len(matches) >= skip + limit:
+                break
+        return self.repository.get_ranked(matches[skip:skip + limit])
+    
+    def export_products(
+        self,
+        category: Optional[str] = None,
+        created_from: Optional[datetime] = None,
+        created_to: Optional[datetime] = None,
+        batch_size: int = 1000
+    ) -> Iterator[Mapping]:
+        return self.repository.iter_export(category, created_from, created_to, batch_size)
     
     def update_product(self, product_id: int, product_update: ProductUpdate, user_id: int) -> Optional[ProductResponse]:
-        product = self.repository.get_by_id(product_id)
+        product = self.repository.get_for_update(product_id)
         if not product:
             return None
+        name, category = product.name, product.category
         
-        updated_product = self.repository.update(product_id, product_update)
-        if not updated_product:
-            return None
-        
-        changes = []
-        if product_update.name:
-            changes.append(f"nombre a '{product_update.name}'")
-        if product_update.category:
-            changes.append(f"categoría a '{product_update.category}'")
-        if product_update.price:
-            changes.append(f"precio a ${product_update.price}")
-        if product_update.stock is not None:
-            changes.append(f"stock a {product_update.stock}")
-        
-        action = f"Producto actualizado (ID: {product_id}, {product.name}): cambió " + ", ".join(changes)
-        self._create_log(user_id, action)
+        updated_product = self.repository.update(product, product_update)
+        self.cache.invalidate([product_id], {category, updated_product.category})
+        product_search_index.add(product_id, updated_product.name, updated_product.category)
+        self._create_log(
+            user_id,
+            describe_product_update(product_id, name, product_update),
+            product_action(ActionType.UPDATE, product_id),
+            product_update_changes(product_update)
+        )
         
         return ProductResponse.model_validate(updated_product)
     
+    def adjust_stock(self, product_id: int, delta: int, user_id: int) -> Optional[ProductResponse]:
+        row = self.repository.adjust_stock(product_id, delta)
+        if row is None:
+            return None
+        self.cache.invalidate([product_id], [row.category])
+        self._create_log(user_id, *stock_adjustment_entry(row, delta))
+        return ProductResponse.model_validate(row)
+    
+    def adjust_stock_batch(self, items: List[StockAdjustmentItem], user_id: int) -> List[ProductResponse]:
+        deltas = merge_stock_adjustments(items)
+        rows = self.repository.adjust_stock_batch(deltas)
+        self.cache.invalidate(deltas, {row.category for row in rows})
+        self._create_logs(user_id, [stock_adjustment_entry(row, deltas[row.id], ActionType.STOCK_ADJUST_BATCH) for row in rows])
+        return [ProductResponse.model_validate(row) for row in rows]
+    
     def delete_product(self, product_id: int, user_id: int) -> bool:
-        product = self.repository.get_by_id(product_id)
+        product = self.repository.get_for_update(product_id)
         if not product:
             return False
+        name, category = product.name, product.category
         
-        deleted = self.repository.delete(product_id)
-        if deleted:
-            self._create_log(user_id, f"Producto eliminado: {product.name} (ID: {product_id})")
-        return deleted
+        self.repository.delete(product)
+        self.cache.invalidate([product_id], [category])
+        product_search_index.remove(product_id)
+        self._create_log(user_id, f"Producto eliminado: {name} (ID: {product_id})", product_action(ActionType.DELETE, product_id))
+        return True
+    
+    def get_product_history(self, product_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[dict]:
+        from app.modules.logs.service import LogService
+        return LogService(self.db).get_entity_history(EntityType.PRODUCT.value, product_id, skip, limit, cursor)
     
     def get_statistics(self) -> dict:
-        total = self.repository.count_total()
-        by_category = self.repository.count_by_category()
-        return {
-            "total_productos": total,
-            "productos_por_categoria": by_category
-        }
+        return build_statistics(self.repository.get_statistics())
@@ -0,0 +1,180 @@
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from pydantic_core import to_jsonable_python
+from typing import Optional, List, Tuple
+from datetime import datetime
+from app.modules.products.repository_async import AsyncProductRepository
+from app.modules.products.schemas import ProductCreate, ProductUpdate, ProductResponse, ProductSearchFilters, StockAdjustmentItem
+from app.modules.products.search import product_search_index, query_tokens, ranked_windows, validate_filters
+from app.modules.logs.actions import ActionType, EntityType, LogAction, product_action
+from app.modules.products.service import (
+    PRODUCT_FIELDS, build_statistics, describe_product_creation, describe_product_update, list_version, merge_stock_adjustments,
+    product_update_changes, reorder_point_entry, stock_adjustment_entry
+)
+from app.core.config import settings
+from app.core.http_cache import row_version
+from app.core.responses import rows_as_dicts, rows_as_json
+from app.core.utils import batch_result, decode_cursor, unique_ids
+from app.modules.products.cache import (
+    decode_version, encode_version, item_counters, item_key, page_counters, page_key, product_cache, search_key
+)
+
+class AsyncProductService:
+    def __init__(self, db: AsyncSession):
+        self.repository = AsyncProductRepository(db)
+        self.cache = product_cache
+        self.db = db
+    
+    async def _create_log(self, user_id: int, action: str, kind: Optional[LogAction] = None, changes: Optional[dict] = None):
+        from app.modules.logs.service_async import AsyncLogService
+        await AsyncLogService(self.db).create_log(user_id, action, kind, changes)
+    
+    async def _create_logs(self, user_id: int, entries: List[tuple]):
+        from app.modules.logs.service_async import AsyncLogService
+        await AsyncLogService(self.db).create_logs(user_id, entries)
+    
+    async def create_product(self, product: ProductCreate, user_id: int) -> ProductResponse:
+        db_product = await self.repository.create(product)
+        await self.cache.invalidate_async(categories=[db_product.category])
+        product_search_index.add(db_product.id, db_product.name, db_product.category)
+        await self._create_log(
+            user_id, describe_product_creation(product), product_action(ActionType.CREATE, db_product.id), product.model_dump(exclude_none=True)
+        )
+        return ProductResponse.model_validate(db_product)
+    
+    async def get_product_by_id(self, product_id: int) -> Optional[ProductResponse]:
+        product = await self.repository.get_by_id(product_id)
+        if not product:
+            return None
+        return ProductResponse.model_validate(product)
+    
+    async def get_product_data(self, product_id: int) -> Optional[dict]:
+        async def load():
+            product = await self.get_product_by_id(product_id)
+            return product.model_dump(mode="json") if product else None
+        return await self.cache.read_through_async(item_key(product_id, "data"), item_counters(product_id), load)
+    
+    async def get_products_batch(self, product_ids: List[int]) -> dict:
+        ids = unique_ids(product_ids, settings.BATCH_GET_MAX_IDS)
+        found = {product["id"]: product for product in rows_as_dicts(await self.repository.get_many(ids), PRODUCT_FIELDS)}
+        return batch_result(ids, found, "producto")
+    
+    async def get_product_version(self, product_id: int) -> Optional[Tuple[str, Optional[datetime]]]:
+        async def load():
+            row = await self.repository.get_version(product_id)
+            return encode_version(row_version("product", row)) if row else None
+        return decode_version(await self.cache.read_through_async(item_key(product_id, "version"), item_counters(product_id), load))
+    
+    async def get_products_version(self, category: Optional[str], skip: int, limit: int, cursor: Optional[str]) -> Tuple[str, Optional[datetime]]:
+        async def load():
+            return encode_version(list_version(await self.repository.get_list_version(category), category, skip, limit, cursor))
+        key = page_key("version", category, skip, limit, cursor)
+        return decode_version(await self.cache.read_through_async(key, page_counters(category), load))
+    
+    async def get_products_page(self, category: Optional[str], skip: int, limit: int, cursor: Optional[str]) -> List[dict]:
+        async def load():
+            if category:
+                products = await self.get_products_by_category(category, skip, limit, cursor)
+            else:
+                products = await self.get_all_products(skip, limit, cursor)
+            return to_jsonable_python(products)
+        return await self.cache.read_through_async(page_key("data", category, skip, limit, cursor), page_counters(category), load)
+    
+    async def get_all_products(self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[dict]:
+        after_id = decode_cursor(cursor, id=int)[0] if cursor else None
+        return rows_as_dicts(await self.repository.get_all(skip, limit, after_id), PRODUCT_FIELDS)
+    
+    async def get_products_by_category(self, category: str, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[dict]:
+        after_id = decode_cursor(cursor, id=int)[0] if cursor else None
+        return rows_as_dicts(await self.repository.get_by_category(category, skip, limit, after_id), PRODUCT_FIELDS)
+    
+    async def get_low_stock_products(self, category: Optional[str] = None, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[dict]:
+        after_id = decode_cursor(cursor, id=int)[0] if cursor else None
+        return rows_as_dicts(await self.repository.get_low_stock(category, skip, limit, after_id), PRODUCT_FIELDS)
+    
+    async def get_category_reorder_points(self) -> List[dict]:
+        return [{"category": row.category, "reorder_point": row.reorder_point} for row in await self.repository.get_category_reorder_points()]
+    
+    async def set_category_reorder_point(self, category: str, reorder_point: Optional[int], user_id: int) -> dict:
+        rows = await self.repository.set_category_reorder_point(category, reorder_point)
+        await self.cache.invalidate_async([row.id for row in rows], [category])
+        await self._create_log(user_id, *reorder_point_entry(category, reorder_point, len(rows)))
+        return {"category": category, "reorder_point": reorder_point, "productos_actualizados": len(rows)}
+    
+    async def search_products(self, query: str, filters: ProductSearchFilters, skip: int = 0, limit: int = 20) -> List[dict]:
+        tokens = query_tokens(query)
+        validate_filters(filters)
+        
+        async def load():
+            if self.repository.supports_full_text():
+                products = await self.repository.search(tokens, filters, skip, limit)
+            else:
+                products = await self._search_ranked(tokens, filters, skip, limit)
+            return rows_as_json(products, PRODUCT_FIELDS)
+        
+        key = search_key(tokens, filters.model_dump(), skip, limit)
+        return await self.cache.read_through_async(key, page_counters(None), load)
+    
+    async def _search_ranked(self, tokens: List[str], filters: ProductSearchFilters, skip: int, limit: int) -> List:
+        if not product_search_index.ready:
+            documents = await self.repository.get_search_documents()
+            await run_in_threadpool(product_search_index.rebuild, documents)
+        scores = await run_in_threadpool(product_search_index.score, tokens)
+        filtered = bool(filters.model_dump(exclude_none=True))
+        matches = []
+        for product_ids in ranked_windows(scores, skip + limit, filtered):
+            matches.extend(await self.repository.filter_ids(product_ids, filters))
+            if len(matches) >= skip + limit:
+                break
+        return await self.repository.get_ranked(matches[skip:skip + limit])
+    
+    async def update_product(self, product_id: int, product_update: ProductUpdate, user_id: int) -> Optional[ProductResponse]:
+        product = await self.repository.get_for_update(product_id)
+        if not product:
+            return None
+        name, category = product.name, product.category
+        
+        updated_product = await self.repository.update(product, product_update)
+        await self.cache.invalidate_async([product_id], {category, updated_product.category})
+        product_search_index.add(product_id, updated_product.name, updated_product.category)
+        await self._create_log(
+            user_id,
+            describe_product_update(product_id, name, product_update),
+            product_action(ActionType.UPDATE, product_id),
+            product_update_changes(product_update)
+        )
+        return ProductResponse.model_validate(updated_product)
+    
+    async def adjust_stock(self, product_id: int, delta: int, user_id: int) -> Optional[ProductResponse]:
+        row = await self.repository.adjust_stock(product_id, delta)
+        if row is None:
+            return None
+        await self.cache.invalidate_async([product_id], [row.category])
+        await self._create_log(user_id, *stock_adjustment_entry(row, delta))
+        return ProductResponse.model_validate(row)
+    
+    async def adjust_stock_batch(self, items: List[StockAdjustmentItem], user_id: int) -> List[ProductResponse]:
+        deltas = merge_stock_adjustments(items)
+        rows = await self.repository.adjust_stock_batch(deltas)
+        await self.cache.invalidate_async(deltas, {row.category for row in rows})
+        await self._create_logs(user_id, [stock_adjustment_entry(row, deltas[row.id], ActionType.STOCK_ADJUST_BATCH) for row in rows])
+        return [ProductResponse.model_validate(row) for row in rows]
+    
+    async def delete_product(self, product_id: int, user_id: int) -> bool:
+        product = await self.repository.get_for_update(product_id)
+        if not product:
+            return False
+        name, category = product.name, product.category
+        
+        await self.repository.delete(product)
+        await self.cache.invalidate_async([product_id], [category])
+        product_search_index.remove(product_id)
+        await self._create_log(user_id, f"Producto eliminado: {name} (ID: {product_id})", product_action(ActionType.DELETE, product_id))
+        return True
+    
+    async def get_product_history(self, product_id: int, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[dict]:
+        from app.modules.logs.service_async import AsyncLogService
+        return await AsyncLogService(self.db).get_entity_history(EntityType.PRODUCT.value, product_id, skip, limit, cursor)
+    
+    async def get_statistics(self) -> dict:
+        return build_statistics(await self.repository.get_statistics())
@@ -0,0 +1,142 @@
+from collections import defaultdict
+from datetime import datetime
+from decimal import Decimal
+from typing import List, Optional, Tuple
+from sqlalchemy import func, or_, select, text, update
+from sqlalchemy.orm import Session
+from app.core.database import SessionLocal, dialect_insert
+from app.modules.products.models import Product, ProductCategoryStats
+
+class StatisticsDelta:
+    def __init__(self):
+        self.categories = defaultdict(lambda: [0, 0, Decimal("0")])
+    
+    def add(self, category: str, price: Decimal, stock: int, sign: int = 1) -> None:
+        entry = self.categories[category]
+        entry[0] += sign
+        entry[1] += sign * stock
+        entry[2] += sign * Decimal(price) * stock
+    
+    def remove(self, category: str, price: Decimal, stock: int) -> None:
+        self.add(category, price, stock, sign=-1)
+    
+    def touch(self, category: str) -> None:
+        self.categories.setdefault(category, [0, 0, Decimal("0")])
+    
+    def adjust_stock(self, category: str, price: Decimal, delta: int) -> None:
+        entry = self.categories[category]
+        entry[1] += delta
+        entry[2] += Decimal(price) * delta
+    
+    def statements(self, db) -> list:
+        table = ProductCategoryStats.__table__
+        statements = []
+        for category in sorted(self.categories):
+            count, units, value = self.categories[category]
+            statement = dialect_insert(db, table).values(
+                category=category,
+                product_count=count,
+                stock_units=units,
+                stock_value=value,
+                version=1
+            )
+            statement = statement.on_conflict_do_update(
+                index_elements=[table.c.category],
+                set_={
+                    "product_count": table.c.product_count + statement.excluded.product_count,
+                    "stock_units": table.c.stock_units + statement.excluded.stock_units,
+                    "stock_value": table.c.stock_value + statement.excluded.stock_value,
+                    "version": table.c.version + 1,
+                    "updated": func.now()
+                }
+            )
+            statements.append(statement)
+        self.categories.clear()
+        return statements
+    
+    def apply(self, db: Session) -> None:
+        for statement in self.statements(db):
+            db.execute(statement)
+    
+    async def apply_async(self, db) -> None:
+        for statement in self.statements(db):
+            await db.execute(statement)
+
+def snapshot_statement():
+    return select(ProductCategoryStats).where(
+        ProductCategoryStats.product_count > 0
+    ).order_by(ProductCategoryStats.category)
+
+def get_snapshot(db: Session) -> List[ProductCategoryStats]:
+    return list(db.scalars(snapshot_statement()))
+
+def is_empty(db: Session) -> bool:
+    return db.query(ProductCategoryStats.category).first() is None
+
+def version_statement(category: Optional[str] = None):
+    statement = select(
+        func.coalesce(func.sum(ProductCategoryStats.product_count), 0),
+        func.coalesce(func.sum(ProductCategoryStats.version), 0),
+        func.max(ProductCategoryStats.updated)
+    )
+    if category is not None:
+        statement = statement.where(ProductCategoryStats.category == category)
+    return statement
+
+def get_aggregate_version(db: Session, category: Optional[str] = None) -> Tuple[int, int, Optional[datetime]]:
+    return tuple(db.execute(version_statement(category)).one())
+
+def reconcile(db: Session) -> None:
+    if db.get_bind().dialect.name == "postgresql":
+        db.execute(text("LOCK TABLE products IN SHARE MODE"))
+    totals = select(
+        Product.category,
+        func.count(Product.id),
+        func.coalesce(func.sum(Product.stock), 0),
+        func.coalesce(func.sum(Product.price * Product.stock), 0)
+    ).group_by(Product.category)
+    table = ProductCategoryStats.__table__
+    categories = []
+    for category, count, units, value in db.execute(totals):
+        categories.append(category)
+        statement = dialect_insert(db, table).values(
+            category=category,
+            product_count=count,
+            stock_units=units,
+            stock_value=value,
+            version=1
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=[table.c.category],
+            set_={
+                "product_count": statement.excluded.product_count,
+                "stock_units": statement.excluded.stock_units,
+                "stock_value": statement.excluded.stock_value,
+                "version": table.c.version + 1,
+                "updated": func.now()
+            },
+            where=or_(
+                table.c.product_count != statement.excluded.product_count,
+                table.c.stock_units != statement.excluded.stock_units,
+                table.c.stock_value != statement.excluded.stock_value
+            )
+        )
+        db.execute(statement)
+    db.execute(
+        update(ProductCategoryStats)
+        .where(ProductCategoryStats.category.notin_(categories), ProductCategoryStats.product_count != 0)
+        .values(product_count=0, stock_units=0, stock_value=0, version=ProductCategoryStats.version + 1, updated=func.now())
+    )
+    db.commit()
+
+def reconcile_statistics(only_if_empty: bool = False) -> None:
+    db = SessionLocal()
+    try:
+        if only_if_empty and not is_empty(db):
+            return
+        reconcile(db)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
@@ -1,21 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from sqlalchemy.orm import Session
-from typing import List
-from app.core.database import get_db
-from app.core.utils import success_response, error_response
+from typing import List, Optional
+from app.core.database import bind_routing_user, get_db
+from app.core.http_cache import not_modified_response, set_validators
+from app.core.responses import fast_success_response
+from app.core.utils import success_response, error_response, build_next_cursor
 from app.core.security import decode_access_token
+from app.modules.users.revocation import token_revocations
 from app.modules.users.service import UserService
-from app.modules.users.schemas import UserCreate, UserUpdate, UserResponse, UserLogin, Token
+from app.modules.users.schemas import Principal, UserBatchGet, UserCreate, UserUpdate, UserLogin, Token
 
 router = APIRouter(prefix="/users", tags=["Usuarios"])
 auth_router = APIRouter(prefix="/auth", tags=["Autenticación"])
 security = HTTPBearer()
 
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security),
-    db: Session = Depends(get_db)
-) -> UserResponse:
+def get_token_payload(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
     token = credentials.credentials
     payload = decode_access_token(token)
     if not payload:
@@ -24,21 +24,21 @@ def get_current_user(
             detail="Credenciales de autenticación inválidas"
         )
     
-    email = payload.get("sub")
-    if not email:
+    if not payload.get("sub") or "uid" not in payload or "jti" not in payload:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Token inválido"
         )
-    
-    service = UserService(db)
-    user = service.get_user_by_email(email)
-    if not user:
+    if token_revocations.is_revoked(payload):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Usuario no encontrado"
+            detail="Token revocado"
         )
-    return user
+    return payload
+
+async def get_current_user(payload: dict = Depends(get_token_payload)) -> Principal:
+    bind_routing_user(payload["uid"])
+    return Principal(id=payload["uid"], email=payload["sub"])
 
 @auth_router.post("/register", response_model=dict, status_code=status.HTTP_201_CREATED)
 def register(user: UserCreate, db: Session = Depends(get_db)):
@@ -52,44 +52,87 @@ def register(user: UserCreate, db: Session = Depends(get_db)):
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error interno del servidor")
 
 @auth_router.post("/login", response_model=dict)
-def login(login_data: UserLogin, db: Session = Depends(get_db)):
+async def login(login_data: UserLogin, db: Session = Depends(get_db)):
     try:
         service = UserService(db)
-        token = service.authenticate_user(login_data)
+        token = await service.authenticate_user(login_data)
         return success_response(token.model_dump(), "Inicio de sesión exitoso")
     except ValueError as e:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error interno del servidor")
 
+@auth_router.post("/logout", response_model=dict)
+def logout(payload: dict = Depends(get_token_payload), db: Session = Depends(get_db)):
+    try:
+        service = UserService(db)
+        service.logout(payload)
+        return success_response(None, "Sesión cerrada exitosamente")
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error interno del servidor")
+
 @router.get("/me", response_model=dict)
-def get_current_user_info(current_user: UserResponse = Depends(get_current_user)):
-    return success_response(current_user.model_dump(), "Usuario obtenido exitosamente")
+def get_current_user_info(db: Session = Depends(get_db), current_user: Principal = Depends(get_current_user)):
+    user = UserService(db).get_user_by_id(current_user.id)
+    if not user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Usuario no encontrado")
+    return success_response(user.model_dump(), "Usuario obtenido exitosamente")
 
 @router.get("/", response_model=dict)
 def get_all_users(
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
     db: Session = Depends(get_db),
-    current_user: UserResponse = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     try:
         service = UserService(db)
-        users = service.get_all_users(skip, limit)
-        return success_response([user.model_dump() for user in users], "Usuarios obtenidos exitosamente")
+        users = service.get_all_users(skip, limit, cursor)
+        return fast_success_response(
+            users,
+            "Usuarios obtenidos exitosamente",
+            build_next_cursor(users, limit, "id")
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error interno del servidor")
+
+@router.post("/batch-get", response_model=dict)
+def batch_get_users(
+    batch: UserBatchGet,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    try:
+        service = UserService(db)
+        result = service.get_users_batch(batch.ids)
+        return fast_success_response(result, "Usuarios obtenidos exitosamente")
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error interno del servidor")
 
 @router.get("/{user_id}", response_model=dict)
 def get_user(
     user_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
-    current_user: UserResponse = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     service = UserService(db)
+    version = service.get_user_version(user_id)
+    if not version:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Usuario no encontrado")
+    not_modified = not_modified_response(request, *version)
+    if not_modified:
+        return not_modified
     user = service.get_user_by_id(user_id)
     if not user:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Usuario no encontrado")
+    set_validators(response, *version)
     return success_response(user.model_dump(), "Usuario obtenido exitosamente")
 
 @router.put("/{user_id}", response_model=dict)
@@ -97,7 +140,7 @@ def update_user(
     user_id: int,
     user_update: UserUpdate,
     db: Session = Depends(get_db),
-    current_user: UserResponse = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     try:
         service = UserService(db)
@@ -114,7 +157,7 @@ def update_user(
 def delete_user(
     user_id: int,
     db: Session = Depends(get_db),
-    current_user: UserResponse = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_user)
 ):
     service = UserService(db)
     deleted = service.delete_user(user_id, current_user.id)
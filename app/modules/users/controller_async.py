@@ -0,0 +1,140 @@
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional
+from app.core.database import get_async_db
+from app.core.http_cache import not_modified_response, set_validators
+from app.core.responses import fast_success_response
+from app.core.utils import success_response, build_next_cursor
+from app.modules.users.controller import get_current_user, get_token_payload
+from app.modules.users.service_async import AsyncUserService
+from app.modules.users.schemas import Principal, UserBatchGet, UserCreate, UserUpdate, UserLogin
+
+router = APIRouter(prefix="/users", tags=["Usuarios"])
+auth_router = APIRouter(prefix="/auth", tags=["Autenticación"])
+
+@auth_router.post("/register", response_model=dict, status_code=status.HTTP_201_CREATED)
+async def register(user: UserCreate, db: AsyncSession = Depends(get_async_db)):
+    try:
+        service = AsyncUserService(db)
+        new_user = await service.register_user(user)
+        return success_response(new_user.model_dump(), "Usuario registrado exitosamente")
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error interno del servidor")
+
+@auth_router.post("/login", response_model=dict)
+async def login(login_data: UserLogin, db: AsyncSession = Depends(get_async_db)):
+    try:
+        service = AsyncUserService(db)
+        token = await service.authenticate_user(login_data)
+        return success_response(token.model_dump(), "Inicio de sesión exitoso")
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error interno del servidor")
+
+@auth_router.post("/logout", response_model=dict)
+async def logout(payload: dict = Depends(get_token_payload), db: AsyncSession = Depends(get_async_db)):
+    try:
+        service = AsyncUserService(db)
+        await service.logout(payload)
+        return success_response(None, "Sesión cerrada exitosamente")
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error interno del servidor")
+
+@router.get("/me", response_model=dict)
+async def get_current_user_info(db: AsyncSession = Depends(get_async_db), current_user: Principal = Depends(get_current_user)):
+    user = await AsyncUserService(db).get_user_by_id(current_user.id)
+    if not user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Usuario no encontrado")
+    return success_response(user.model_dump(), "Usuario obtenido exitosamente")
+
+@router.get("/", response_model=dict)
+async def get_all_users(
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    try:
+        service = AsyncUserService(db)
+        users = await service.get_all_users(skip, limit, cursor)
+        return fast_success_response(
+            users,
+            "Usuarios obtenidos exitosamente",
+            build_next_cursor(users, limit, "id")
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error interno del servidor")
+
+@router.post("/batch-get", response_model=dict)
+async def batch_get_users(
+    batch: UserBatchGet,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    try:
+        service = AsyncUserService(db)
+        result = await service.get_users_batch(batch.ids)
+        return fast_success_response(result, "Usuarios obtenidos exitosamente")
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error interno del servidor")
+
+@router.get("/{user_id}", response_model=dict)
+async def get_user(
+    user_id: int,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    service = AsyncUserService(db)
+    version = await service.get_user_version(user_id)
+    if not version:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Usuario no encontrado")
+    not_modified = not_modified_response(request, *version)
+    if not_modified:
+        return not_modified
+    user = await service.get_user_by_id(user_id)
+    if not user:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Usuario no encontrado")
+    set_validators(response, *version)
+    return success_response(user.model_dump(), "Usuario obtenido exitosamente")
+
+@router.put("/{user_id}", response_model=dict)
+async def update_user(
+    user_id: int,
+    user_update: UserUpdate,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    try:
+        service = AsyncUserService(db)
+        updated_user = await service.update_user(user_id, user_update, current_user.id)
+        if not updated_user:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Usuario no encontrado")
+        return success_response(updated_user.model_dump(), "Usuario actualizado exitosamente")
+    except HTTPException:
+        raise
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    except Exception as e:
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Error interno del servidor")
+
+@router.delete("/{user_id}", response_model=dict)
+async def delete_user(
+    user_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_user)
+):
+    service = AsyncUserService(db)
+    deleted = await service.delete_user(user_id, current_user.id)
+    if not deleted:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Usuario no encontrado")
+    return success_response(None, "Usuario eliminado exitosamente")
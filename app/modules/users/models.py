@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, DateTime, Integer
+from sqlalchemy import Column, String, DateTime, Index, Integer
 from sqlalchemy.sql import func
 from app.core.database import Base
 
@@ -9,5 +9,20 @@ class User(Base):
     name = Column(String, nullable=False)
     email = Column(String, unique=True, index=True, nullable=False)
     password = Column(String, nullable=False)
+    version = Column(Integer, nullable=False, default=1, server_default="1")
     created = Column(DateTime(timezone=True), server_default=func.now())
     updated = Column(DateTime(timezone=True), onupdate=func.now())
+
+class TokenRevocation(Base):
+    __tablename__ = "token_revocations"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    jti = Column(String, unique=True, nullable=True)
+    user_id = Column(Integer, nullable=True)
+    issued_before = Column(DateTime(timezone=True), nullable=True)
+    expires = Column(DateTime(timezone=True), nullable=False)
+    created = Column(DateTime(timezone=True), server_default=func.now())
+    
+    __table_args__ = (
+        Index("ix_token_revocations_expires", expires),
+    )
@@ -1,9 +1,18 @@
+import time
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 from typing import Optional, List
-from app.modules.users.models import User
-from app.modules.users.schemas import UserCreate, UserUpdate
+from app.modules.users.models import TokenRevocation, User
+from app.modules.users.revocation import from_timestamp, token_revocations
+from app.modules.users.schemas import UserCreate, UserResponse, UserUpdate
+from app.core.config import settings
+from app.core.database import dialect_insert, replica_read
+from app.core.responses import response_columns
+from app.core.utils import chunked
 from app.core.security import get_password_hash
 
+USER_COLUMNS = response_columns(User, UserResponse)
+
 class UserRepository:
     def __init__(self, db: Session):
         self.db = db
@@ -23,11 +32,25 @@ class UserRepository:
     def get_by_id(self, user_id: int) -> Optional[User]:
         return self.db.query(User).filter(User.id == user_id).first()
     
+    @replica_read
+    def get_many(self, user_ids: List[int]) -> List:
+        rows = []
+        for chunk in chunked(user_ids, settings.BATCH_GET_CHUNK_SIZE):
+            rows.extend(self.db.query(*USER_COLUMNS).filter(User.id.in_(chunk)).all())
+        return rows
+    
+    def get_version(self, user_id: int):
+        return self.db.query(User.id, User.version, User.created, User.updated).filter(User.id == user_id).first()
+    
     def get_by_email(self, email: str) -> Optional[User]:
         return self.db.query(User).filter(User.email == email).first()
     
-    def get_all(self, skip: int = 0, limit: int = 100) -> List[User]:
-        return self.db.query(User).offset(skip).limit(limit).all()
+    @replica_read
+    def get_all(self, skip: int = 0, limit: int = 100, after_id: Optional[int] = None) -> List:
+        query = self.db.query(*USER_COLUMNS)
+        if after_id is not None:
+            return query.filter(User.id > after_id).order_by(User.id).limit(limit).all()
+        return query.order_by(User.id).offset(skip).limit(limit).all()
     
     def update(self, user_id: int, user_update: UserUpdate) -> Optional[User]:
         db_user = self.get_by_id(user_id)
@@ -40,11 +63,16 @@ class UserRepository:
         
         for field, value in update_data.items():
             setattr(db_user, field, value)
+        db_user.version = User.version + 1
         
         self.db.commit()
         self.db.refresh(db_user)
         return db_user
     
+    def set_password_hash(self, user_id: int, hashed_password: str) -> None:
+        self.db.execute(update(User).where(User.id == user_id).values(password=hashed_password))
+        self.db.commit()
+    
     def delete(self, user_id: int) -> bool:
         db_user = self.get_by_id(user_id)
         if not db_user:
@@ -52,3 +80,18 @@ class UserRepository:
         self.db.delete(db_user)
         self.db.commit()
         return True
+    
+    def revoke_token(self, jti: str, user_id: int, expires: float) -> None:
+        statement = dialect_insert(self.db, TokenRevocation.__table__).values(
+            jti=jti, user_id=user_id, expires=from_timestamp(expires)
+        ).on_conflict_do_nothing(index_elements=["jti"])
+        self.db.execute(statement)
+        self.db.commit()
+        token_revocations.add(jti, None, None, expires)
+    
+    def revoke_user_tokens(self, user_id: int) -> None:
+        now = time.time()
+        expires = now + settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+        self.db.add(TokenRevocation(user_id=user_id, issued_before=from_timestamp(now), expires=from_timestamp(expires)))
+        self.db.commit()
+        token_revocations.add(None, user_id, now, expires)
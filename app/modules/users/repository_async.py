@@ -0,0 +1,100 @@
+import time
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional, List
+from app.core.config import settings
+from app.core.database import dialect_insert, replica_read
+from app.modules.users.models import TokenRevocation, User
+from app.modules.users.repository import USER_COLUMNS
+from app.modules.users.revocation import from_timestamp, token_revocations
+from app.modules.users.schemas import UserCreate, UserUpdate
+from app.core.security import get_password_hash_async
+from app.core.utils import chunked
+
+class AsyncUserRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def create(self, user: UserCreate) -> User:
+        hashed_password = await get_password_hash_async(user.password)
+        db_user = User(
+            name=user.name,
+            email=user.email,
+            password=hashed_password
+        )
+        self.db.add(db_user)
+        await self.db.commit()
+        await self.db.refresh(db_user)
+        return db_user
+    
+    async def get_by_id(self, user_id: int) -> Optional[User]:
+        return await self.db.scalar(select(User).where(User.id == user_id))
+    
+    @replica_read
+    async def get_many(self, user_ids: List[int]) -> List:
+        rows = []
+        for chunk in chunked(user_ids, settings.BATCH_GET_CHUNK_SIZE):
+            result = await self.db.execute(select(*USER_COLUMNS).where(User.id.in_(chunk)))
+            rows.extend(result.all())
+        return rows
+    
+    async def get_version(self, user_id: int):
+        result = await self.db.execute(select(User.id, User.version, User.created, User.updated).where(User.id == user_id))
+        return result.first()
+    
+    async def get_by_email(self, email: str) -> Optional[User]:
+        return await self.db.scalar(select(User).where(User.email == email))
+    
+    @replica_read
+    async def get_all(self, skip: int = 0, limit: int = 100, after_id: Optional[int] = None) -> List:
+        statement = select(*USER_COLUMNS).order_by(User.id).limit(limit)
+        if after_id is not None:
+            statement = statement.where(User.id > after_id)
+        else:
+            statement = statement.offset(skip)
+        result = await self.db.execute(statement)
+        return result.all()
+    
+    async def update(self, user_id: int, user_update: UserUpdate) -> Optional[User]:
+        db_user = await self.get_by_id(user_id)
+        if not db_user:
+            return None
+        
+        update_data = user_update.model_dump(exclude_unset=True)
+        if "password" in update_data:
+            update_data["password"] = await get_password_hash_async(update_data["password"])
+        
+        for field, value in update_data.items():
+            setattr(db_user, field, value)
+        db_user.version = User.version + 1
+        
+        await self.db.commit()
+        await self.db.refresh(db_user)
+        return db_user
+    
+    async def set_password_hash(self, user_id: int, hashed_password: str) -> None:
+        await self.db.execute(update(User).where(User.id == user_id).values(password=hashed_password))
+        await self.db.commit()
+    
+    async def delete(self, user_id: int) -> bool:
+        db_user = await self.get_by_id(user_id)
+        if not db_user:
+            return False
+        await self.db.delete(db_user)
+        await self.db.commit()
+        return True
+    
+    async def revoke_token(self, jti: str, user_id: int, expires: float) -> None:
+        statement = dialect_insert(self.db, TokenRevocation.__table__).values(
+            jti=jti, user_id=user_id, expires=from_timestamp(expires)
+        ).on_conflict_do_nothing(index_elements=["jti"])
+        await self.db.execute(statement)
+        await self.db.commit()
+        token_revocations.add(jti, None, None, expires)
+    
+    async def revoke_user_tokens(self, user_id: int) -> None:
+        now = time.time()
+        expires = now + settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60
+        self.db.add(TokenRevocation(user_id=user_id, issued_before=from_timestamp(now), expires=from_timestamp(expires)))
+        await self.db.commit()
+        token_revocations.add(None, user_id, now, expires)
@@ -0,0 +1,92 @@
+import logging
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Optional, Tuple
+from sqlalchemy import delete, select
+from app.core.database import engine
+from app.modules.users.models import TokenRevocation
+
+logger = logging.getLogger(__name__)
+
+def to_timestamp(value: datetime) -> float:
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
+
+def from_timestamp(value: float) -> datetime:
+    return datetime.fromtimestamp(value, timezone.utc)
+
+class RevocationSet:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tokens: Dict[str, float] = {}
+        self._users: Dict[int, Tuple[float, float]] = {}
+        self.syncs = 0
+        self.last_sync: Optional[float] = None
+    
+    def add(self, jti: Optional[str], user_id: Optional[int], issued_before: Optional[float], expires: float) -> None:
+        with self._lock:
+            if jti is not None:
+                self._tokens[jti] = expires
+            if user_id is not None and issued_before is not None:
+                current = self._users.get(user_id)
+                if current is None or current[0] < issued_before:
+                    self._users[user_id] = (issued_before, max(expires, current[1] if current else expires))
+    
+    def is_revoked(self, payload: dict) -> bool:
+        if payload["jti"] in self._tokens:
+            return True
+        cutoff = self._users.get(payload["uid"])
+        return cutoff is not None and payload.get("iat", 0) <= cutoff[0]
+    
+    def merge(self, rows: Iterable) -> None:
+        for row in rows:
+            self.add(
+                row.jti,
+                row.user_id,
+                to_timestamp(row.issued_before) if row.issued_before is not None else None,
+                to_timestamp(row.expires)
+            )
+        with self._lock:
+            self.syncs += 1
+            self.last_sync = time.time()
+    
+    def prune(self, now: float) -> int:
+        with self._lock:
+            expired_tokens = [jti for jti, expires in self._tokens.items() if expires <= now]
+            expired_users = [user_id for user_id, (_, expires) in self._users.items() if expires <= now]
+            for jti in expired_tokens:
+                del self._tokens[jti]
+            for user_id in expired_users:
+                del self._users[user_id]
+        return len(expired_tokens) + len(expired_users)
+    
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "tokens": len(self._tokens),
+                "users": len(self._users),
+                "syncs": self.syncs,
+                "last_sync_age_seconds": round(time.time() - self.last_sync, 3) if self.last_sync else None
+            }
+
+token_revocations = RevocationSet()
+
+def active_revocations_statement(now: datetime):
+    return select(
+        TokenRevocation.jti,
+        TokenRevocation.user_id,
+        TokenRevocation.issued_before,
+        TokenRevocation.expires
+    ).where(TokenRevocation.expires > now)
+
+def sync_token_revocations() -> None:
+    now = time.time()
+    with engine.connect() as connection:
+        rows = connection.execute(active_revocations_statement(from_timestamp(now))).all()
+    token_revocations.merge(rows)
+    if token_revocations.prune(now):
+        with engine.begin() as connection:
+            connection.execute(delete(TokenRevocation).where(TokenRevocation.expires <= from_timestamp(now)))
+        logger.info("Revocaciones de tokens caducadas eliminadas")
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
 
 class UserBase(BaseModel):
@@ -22,6 +22,9 @@ class UserResponse(UserBase):
     class Config:
         from_attributes = True
 
+class UserBatchGet(BaseModel):
+    ids: List[int] = Field(..., min_length=1)
+
 class UserLogin(BaseModel):
     email: EmailStr
     password: str
@@ -32,3 +35,7 @@ class Token(BaseModel):
 
 class TokenData(BaseModel):
     email: Optional[str] = None
+
+class Principal(BaseModel):
+    id: int
+    email: str
@@ -1,20 +1,37 @@
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from typing import Optional, List
-from datetime import timedelta
+from typing import Optional, List, Tuple
+from datetime import datetime, timedelta
+from app.modules.logs.actions import ActionType, LogAction, user_action
 from app.modules.users.repository import UserRepository
 from app.modules.users.schemas import UserCreate, UserUpdate, UserResponse, UserLogin, Token
-from app.core.security import verify_password, create_access_token
+from app.core.security import verify_and_update_password_async, create_access_token
 from app.core.config import settings
+from app.core.http_cache import row_version
+from app.core.responses import response_fields, rows_as_dicts
+from app.core.utils import batch_result, decode_cursor, unique_ids
+
+USER_FIELDS = response_fields(UserResponse)
+
+def describe_user_update(user_id: int, user_update: UserUpdate) -> str:
+    changes = []
+    if user_update.name:
+        changes.append(f"nombre a '{user_update.name}'")
+    if user_update.email:
+        changes.append(f"email a '{user_update.email}'")
+    if user_update.password:
+        changes.append("contraseña")
+    return f"Usuario actualizado (ID: {user_id}): cambió " + ", ".join(changes)
 
 class UserService:
     def __init__(self, db: Session):
         self.repository = UserRepository(db)
         self.db = db
     
-    def _create_log(self, user_id: int, action: str):
+    def _create_log(self, user_id: int, action: str, kind: Optional[LogAction] = None, changes: Optional[dict] = None):
         from app.modules.logs.service import LogService
         log_service = LogService(self.db)
-        log_service.create_log(user_id, action)
+        log_service.create_log(user_id, action, kind, changes)
     
     def register_user(self, user: UserCreate) -> UserResponse:
         existing_user = self.repository.get_by_email(user.email)
@@ -22,36 +39,55 @@ class UserService:
             raise ValueError("El correo electrónico ya está registrado")
         
         db_user = self.repository.create(user)
-        self._create_log(db_user.id, f"Usuario registrado: {user.email}")
+        self._create_log(
+            db_user.id,
+            f"Usuario registrado: {user.email}",
+            user_action(ActionType.REGISTER, db_user.id),
+            {"name": user.name, "email": user.email}
+        )
         return UserResponse.model_validate(db_user)
     
-    def authenticate_user(self, login_data: UserLogin) -> Token:
-        user = self.repository.get_by_email(login_data.email)
-        if not user or not verify_password(login_data.password, user.password):
+    async def authenticate_user(self, login_data: UserLogin) -> Token:
+        user = await run_in_threadpool(self.repository.get_by_email, login_data.email)
+        if not user:
+            raise ValueError("Correo electrónico o contraseña incorrectos")
+        valid, new_hash = await verify_and_update_password_async(login_data.password, user.password)
+        if not valid:
             raise ValueError("Correo electrónico o contraseña incorrectos")
+        if new_hash:
+            await run_in_threadpool(self.repository.set_password_hash, user.id, new_hash)
         
         access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
         access_token = create_access_token(
-            data={"sub": user.email}, expires_delta=access_token_expires
+            data={"sub": user.email, "uid": user.id}, expires_delta=access_token_expires
         )
-        self._create_log(user.id, f"Inicio de sesión exitoso: {user.email}")
+        await run_in_threadpool(self._create_log, user.id, f"Inicio de sesión exitoso: {user.email}", user_action(ActionType.LOGIN, user.id))
         return Token(access_token=access_token, token_type="bearer")
     
+    def get_user_version(self, user_id: int) -> Optional[Tuple[str, Optional[datetime]]]:
+        row = self.repository.get_version(user_id)
+        return row_version("user", row) if row else None
+    
     def get_user_by_id(self, user_id: int) -> Optional[UserResponse]:
         user = self.repository.get_by_id(user_id)
         if not user:
             return None
         return UserResponse.model_validate(user)
     
+    def get_users_batch(self, user_ids: List[int]) -> dict:
+        ids = unique_ids(user_ids, settings.BATCH_GET_MAX_IDS)
+        found = {user["id"]: user for user in rows_as_dicts(self.repository.get_many(ids), USER_FIELDS)}
+        return batch_result(ids, found, "usuario")
+    
     def get_user_by_email(self, email: str) -> Optional[UserResponse]:
         user = self.repository.get_by_email(email)
         if not user:
             return None
         return UserResponse.model_validate(user)
     
-    def get_all_users(self, skip: int = 0, limit: int = 100) -> List[UserResponse]:
-        users = self.repository.get_all(skip, limit)
-        return [UserResponse.model_validate(user) for user in users]
+    def get_all_users(self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[dict]:
+        after_id = decode_cursor(cursor, id=int)[0] if cursor else None
+        return rows_as_dicts(self.repository.get_all(skip, limit, after_id), USER_FIELDS)
     
     def update_user(self, user_id: int, user_update: UserUpdate, current_user_id: int) -> Optional[UserResponse]:
         if user_update.email:
@@ -63,16 +99,14 @@ class UserService:
         if not updated_user:
             return None
         
-        changes = []
-        if user_update.name:
-            changes.append(f"nombre a '{user_update.name}'")
-        if user_update.email:
-            changes.append(f"email a '{user_update.email}'")
-        if user_update.password:
-            changes.append("contraseña")
-        
-        action = f"Usuario actualizado (ID: {user_id}): cambió " + ", ".join(changes)
-        self._create_log(current_user_id, action)
+        if user_update.email or user_update.password:
+            self.repository.revoke_user_tokens(user_id)
+        self._create_log(
+            current_user_id,
+            describe_user_update(user_id, user_update),
+            user_action(ActionType.UPDATE, user_id),
+            user_update.model_dump(exclude_unset=True)
+        )
         
         return UserResponse.model_validate(updated_user)
     
@@ -83,5 +117,10 @@ class UserService:
         
         deleted = self.repository.delete(user_id)
         if deleted:
-            self._create_log(current_user_id, f"Usuario eliminado: {user.email} (ID: {user_id})")
+            self.repository.revoke_user_tokens(user_id)
+            self._create_log(current_user_id, f"Usuario eliminado: {user.email} (ID: {user_id})", user_action(ActionType.DELETE, user_id))
         return deleted
+    
+    def logout(self, token: dict) -> None:
+        self.repository.revoke_token(token["jti"], token["uid"], token["exp"])
+        self._create_log(token["uid"], f"Cierre de sesión: {token['sub']}", user_action(ActionType.LOGOUT, token["uid"]))
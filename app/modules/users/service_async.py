@@ -0,0 +1,113 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Optional, List, Tuple
+from datetime import datetime, timedelta
+from app.modules.logs.actions import ActionType, LogAction, user_action
+from app.modules.users.repository_async import AsyncUserRepository
+from app.modules.users.schemas import UserCreate, UserUpdate, UserResponse, UserLogin, Token
+from app.modules.users.service import USER_FIELDS, describe_user_update
+from app.core.security import verify_and_update_password_async, create_access_token
+from app.core.config import settings
+from app.core.http_cache import row_version
+from app.core.responses import rows_as_dicts
+from app.core.utils import batch_result, decode_cursor, unique_ids
+
+class AsyncUserService:
+    def __init__(self, db: AsyncSession):
+        self.repository = AsyncUserRepository(db)
+        self.db = db
+    
+    async def _create_log(self, user_id: int, action: str, kind: Optional[LogAction] = None, changes: Optional[dict] = None):
+        from app.modules.logs.service_async import AsyncLogService
+        await AsyncLogService(self.db).create_log(user_id, action, kind, changes)
+    
+    async def register_user(self, user: UserCreate) -> UserResponse:
+        existing_user = await self.repository.get_by_email(user.email)
+        if existing_user:
+            raise ValueError("El correo electrónico ya está registrado")
+        
+        db_user = await self.repository.create(user)
+        await self._create_log(
+            db_user.id,
+            f"Usuario registrado: {user.email}",
+            user_action(ActionType.REGISTER, db_user.id),
+            {"name": user.name, "email": user.email}
+        )
+        return UserResponse.model_validate(db_user)
+    
+    async def authenticate_user(self, login_data: UserLogin) -> Token:
+        user = await self.repository.get_by_email(login_data.email)
+        if not user:
+            raise ValueError("Correo electrónico o contraseña incorrectos")
+        valid, new_hash = await verify_and_update_password_async(login_data.password, user.password)
+        if not valid:
+            raise ValueError("Correo electrónico o contraseña incorrectos")
+        if new_hash:
+            await self.repository.set_password_hash(user.id, new_hash)
+        
+        access_token_expires = timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+        access_token = create_access_token(
+            data={"sub": user.email, "uid": user.id}, expires_delta=access_token_expires
+        )
+        await self._create_log(user.id, f"Inicio de sesión exitoso: {user.email}", user_action(ActionType.LOGIN, user.id))
+        return Token(access_token=access_token, token_type="bearer")
+    
+    async def get_user_version(self, user_id: int) -> Optional[Tuple[str, Optional[datetime]]]:
+        row = await self.repository.get_version(user_id)
+        return row_version("user", row) if row else None
+    
+    async def get_user_by_id(self, user_id: int) -> Optional[UserResponse]:
+        user = await self.repository.get_by_id(user_id)
+        if not user:
+            return None
+        return UserResponse.model_validate(user)
+    
+    async def get_users_batch(self, user_ids: List[int]) -> dict:
+        ids = unique_ids(user_ids, settings.BATCH_GET_MAX_IDS)
+        found = {user["id"]: user for user in rows_as_dicts(await self.repository.get_many(ids), USER_FIELDS)}
+        return batch_result(ids, found, "usuario")
+    
+    async def get_user_by_email(self, email: str) -> Optional[UserResponse]:
+        user = await self.repository.get_by_email(email)
+        if not user:
+            return None
+        return UserResponse.model_validate(user)
+    
+    async def get_all_users(self, skip: int = 0, limit: int = 100, cursor: Optional[str] = None) -> List[dict]:
+        after_id = decode_cursor(cursor, id=int)[0] if cursor else None
+        return rows_as_dicts(await self.repository.get_all(skip, limit, after_id), USER_FIELDS)
+    
+    async def update_user(self, user_id: int, user_update: UserUpdate, current_user_id: int) -> Optional[UserResponse]:
+        if user_update.email:
+            existing_user = await self.repository.get_by_email(user_update.email)
+            if existing_user and existing_user.id != user_id:
+                raise ValueError("El correo electrónico ya está en uso")
+        
+        updated_user = await self.repository.update(user_id, user_update)
+        if not updated_user:
+            return None
+        
+        if user_update.email or user_update.password:
+            await self.repository.revoke_user_tokens(user_id)
+        await self._create_log(
+            current_user_id,
+            describe_user_update(user_id, user_update),
+            user_action(ActionType.UPDATE, user_id),
+            user_update.model_dump(exclude_unset=True)
+        )
+        return UserResponse.model_validate(updated_user)
+    
+    async def delete_user(self, user_id: int, current_user_id: int) -> bool:
+        user = await self.repository.get_by_id(user_id)
+        if not user:
+            return False
+        
+        email = user.email
+        deleted = await self.repository.delete(user_id)
+        if deleted:
+            await self.repository.revoke_user_tokens(user_id)
+            await self._create_log(current_user_id, f"Usuario eliminado: {email} (ID: {user_id})", user_action(ActionType.DELETE, user_id))
+        return deleted
+    
+    async def logout(self, token: dict) -> None:
+        await self.repository.revoke_token(token["jti"], token["uid"], token["exp"])
+        await self._create_log(token["uid"], f"Cierre de sesión: {token['sub']}", user_action(ActionType.LOGOUT, token["uid"]))
@@ -0,0 +1,33 @@
+import argparse
+import asyncio
+import tempfile
+from pathlib import Path
+from benchmarks.common import API_PREFIX, drive, login, print_table, run_server, seed_products, server_env, summarize
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compara el modo síncrono y el asíncrono bajo carga concurrente")
+    parser.add_argument("--database-url", help="Base de datos a usar (por defecto un SQLite temporal)")
+    parser.add_argument("--products", type=int, default=10000)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--page-size", type=int, default=50)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or f"sqlite:///{Path(tmp) / 'bench.db'}"
+        results = []
+        for mode in ("sync", "async"):
+            env = server_env(database_url, ASYNC_DB_ENABLED=str(mode == "async").lower())
+            with run_server(env) as base_url:
+                headers = login(base_url)
+                seed_products(database_url, args.products)
+                requests = [
+                    ("GET", f"{API_PREFIX}/products/?limit={args.page_size}&skip={(i * args.page_size) % args.products}", None)
+                    for i in range(args.requests)
+                ]
+                latencies, errors, elapsed = asyncio.run(drive(base_url, requests, headers, args.concurrency))
+                results.append({"mode": mode, **summarize(latencies, errors, elapsed)})
+        print_table(results)
+
+if __name__ == "__main__":
+    main()
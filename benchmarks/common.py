@@ -0,0 +1,149 @@
+import asyncio
+import contextlib
+import os
+import secrets
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+import httpx
+from sqlalchemy import create_engine, text
+
+ROOT = Path(__file__).resolve().parents[1]
+API_PREFIX = "/api/v1"
+BENCH_EMAIL = "bench@example.com"
+BENCH_PASSWORD = "bench-password"
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def server_env(database_url: str, **overrides: str) -> Dict[str, str]:
+    env = {
+        **os.environ,
+        "DATABASE_URL": database_url,
+        "SECRET_KEY": os.environ.get("SECRET_KEY", secrets.token_urlsafe(32)),
+    }
+    env.update({key: str(value) for key, value in overrides.items()})
+    return env
+
+@contextlib.contextmanager
+def run_server(env: Dict[str, str], workers: int = 1, timeout: float = 60.0) -> Iterator[str]:
+    port = free_port()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--workers", str(workers), "--log-level", "warning"],
+        cwd=ROOT,
+        env=env
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError("El servidor terminó antes de estar disponible")
+            try:
+                if httpx.get(f"{base_url}/health").status_code == 200:
+                    break
+            except httpx.TransportError:
+                pass
+            if time.monotonic() > deadline:
+                raise RuntimeError("El servidor no respondió a tiempo")
+            time.sleep(0.2)
+        yield base_url
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+
+def login(base_url: str, email: str = BENCH_EMAIL, password: str = BENCH_PASSWORD) -> Dict[str, str]:
+    httpx.post(f"{base_url}{API_PREFIX}/auth/register", json={"name": "Benchmark", "email": email, "password": password})
+    response = httpx.post(f"{base_url}{API_PREFIX}/auth/login", json={"email": email, "password": password}, timeout=60)
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['data']['access_token']}"}
+
+def seed_products(database_url: str, count: int, categories: int = 50, chunk_size: int = 10000) -> None:
+    engine = create_engine(database_url)
+    with engine.begin() as connection:
+        existing = connection.execute(text("SELECT COUNT(*) FROM products")).scalar()
+        for start in range(existing, count, chunk_size):
+            rows = [
+                {"name": f"Producto {i}", "category": f"Categoria {i % categories}", "price": (i % 1000) + 0.99, "stock": i % 500}
+                for i in range(start, min(start + chunk_size, count))
+            ]
+            connection.execute(
+                text("INSERT INTO products (name, category, price, stock) VALUES (:name, :category, :price, :stock)"),
+                rows
+            )
+    engine.dispose()
+
+def seed_logs(database_url: str, count: int, chunk_size: int = 10000) -> None:
+    engine = create_engine(database_url)
+    with engine.begin() as connection:
+        user_id = connection.execute(text("SELECT MIN(id) FROM users")).scalar()
+        existing = connection.execute(text("SELECT COUNT(*) FROM logs")).scalar()
+        for start in range(existing, count, chunk_size):
+            rows = [
+                {"user_id": user_id, "action": f"Producto actualizado (ID: {i}, Producto {i}): cambió stock a {i % 500}"}
+                for i in range(start, min(start + chunk_size, count))
+            ]
+            connection.execute(text("INSERT INTO logs (user_id, action) VALUES (:user_id, :action)"), rows)
+    engine.dispose()
+
+async def drive(
+    base_url: str,
+    requests: List[Tuple[str, str, Optional[dict]]],
+    headers: Dict[str, str],
+    concurrency: int,
+    transport: Optional[httpx.AsyncBaseTransport] = None
+) -> Tuple[List[float], int, float]:
+    latencies: List[float] = []
+    errors = 0
+    pending = iter(requests)
+    
+    async def worker(client: httpx.AsyncClient):
+        nonlocal errors
+        for method, path, body in pending:
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body, headers=headers)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+    
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120, transport=transport) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    return latencies, errors, elapsed
+
+def percentile(values: List[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+def summarize(latencies: List[float], errors: int, elapsed: float) -> Dict[str, float]:
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+def print_table(rows: List[Dict[str, object]]) -> None:
+    if not rows:
+        return
+    columns = list(rows[0])
+    widths = {column: max(len(column), *(len(str(row[column])) for row in rows)) for column in columns}
+    print("  ".join(column.ljust(widths[column]) for column in columns))
+    for row in rows:
+        print("  ".join(str(row[column]).ljust(widths[column]) for column in columns))
@@ -0,0 +1,44 @@
+import argparse
+import asyncio
+import tempfile
+from pathlib import Path
+from benchmarks.common import API_PREFIX, drive, login, print_table, run_server, seed_products, server_env, summarize
+
+async def login_storm(base_url: str, headers: dict, logins: int, reads: int, concurrency: int):
+    login_requests = [
+        ("POST", f"{API_PREFIX}/auth/login", {"email": "bench@example.com", "password": "bench-password"})
+        for _ in range(logins)
+    ]
+    read_requests = [("GET", f"{API_PREFIX}/products/?limit=20", None) for _ in range(reads)]
+    return await asyncio.gather(
+        drive(base_url, login_requests, {}, concurrency),
+        drive(base_url, read_requests, headers, max(1, concurrency // 4))
+    )
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Mide el rendimiento del login y su impacto en las lecturas")
+    parser.add_argument("--database-url", help="Base de datos a usar (por defecto un SQLite temporal)")
+    parser.add_argument("--logins", type=int, default=400)
+    parser.add_argument("--reads", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--workers", type=int, default=4, help="Procesos de hashing para el escenario con pool")
+    parser.add_argument("--rounds", type=int, default=12)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or f"sqlite:///{Path(tmp) / 'bench.db'}"
+        results = []
+        for label, workers in (("inline", 0), (f"pool x{args.workers}", args.workers)):
+            env = server_env(database_url, BCRYPT_ROUNDS=args.rounds, PASSWORD_HASH_WORKERS=workers)
+            with run_server(env) as base_url:
+                headers = login(base_url)
+                seed_products(database_url, 1000)
+                (login_lat, login_err, login_time), (read_lat, read_err, read_time) = asyncio.run(
+                    login_storm(base_url, headers, args.logins, args.reads, args.concurrency)
+                )
+                results.append({"hashing": label, "scenario": "login", **summarize(login_lat, login_err, login_time)})
+                results.append({"hashing": label, "scenario": "read", **summarize(read_lat, read_err, read_time)})
+        print_table(results)
+
+if __name__ == "__main__":
+    main()
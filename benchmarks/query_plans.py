@@ -0,0 +1,82 @@
+import argparse
+import os
+import sys
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.orm import Session
+from benchmarks.common import print_table, seed_logs, seed_products
+
+def capture_statement(engine, run):
+    captured = []
+    
+    def listener(conn, cursor, statement, parameters, context, executemany):
+        captured.append((statement, parameters))
+    
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        with Session(engine) as db:
+            run(db)
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+    return captured[-1]
+
+def explain(engine, statement: str, parameters) -> str:
+    prefix = "EXPLAIN QUERY PLAN " if engine.dialect.name == "sqlite" else "EXPLAIN "
+    with engine.connect() as connection:
+        rows = connection.exec_driver_sql(prefix + statement, parameters).all()
+    return " | ".join(str(row[-1]) for row in rows)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Comprueba que las consultas de listados usan los índices esperados")
+    parser.add_argument("--database-url", help="Base de datos a usar (por defecto un SQLite temporal)")
+    parser.add_argument("--products", type=int, default=50000)
+    parser.add_argument("--logs", type=int, default=100000)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or f"sqlite:///{Path(tmp) / 'plans.db'}"
+        os.environ.setdefault("DATABASE_URL", database_url)
+        os.environ.setdefault("SECRET_KEY", "query-plans")
+        from app.migrations import run_migrations
+        from app.modules.logs.repository import LogRepository
+        from app.modules.products.repository import ProductRepository
+        
+        engine = create_engine(database_url)
+        run_migrations(engine)
+        with engine.begin() as connection:
+            if not connection.execute(text("SELECT COUNT(*) FROM users")).scalar():
+                connection.execute(text("INSERT INTO users (name, email, password) VALUES ('Plan', 'plan@example.com', 'x')"))
+        seed_products(database_url, args.products)
+        seed_logs(database_url, args.logs)
+        with engine.begin() as connection:
+            connection.execute(text("ANALYZE"))
+        
+        after = (datetime(2100, 1, 1), 2 ** 31 - 1)
+        checks = [
+            ("products por categoría", "ix_products_category_id",
+             lambda db: ProductRepository(db).get_by_category("Categoria 7", 0, 50)),
+            ("products por categoría (cursor)", "ix_products_category_id",
+             lambda db: ProductRepository(db).get_by_category("Categoria 7", 0, 50, after_id=1000)),
+            ("logs recientes", "ix_logs_created_id",
+             lambda db: LogRepository(db).get_all(0, 50)),
+            ("logs recientes (cursor)", "ix_logs_created_id",
+             lambda db: LogRepository(db).get_all(0, 50, after=after)),
+            ("logs por usuario", "ix_logs_user_id_created_id",
+             lambda db: LogRepository(db).get_by_user_id(1, 0, 50)),
+            ("logs por usuario (cursor)", "ix_logs_user_id_created_id",
+             lambda db: LogRepository(db).get_by_user_id(1, 0, 50, after=after)),
+        ]
+        results = []
+        for name, index, run in checks:
+            plan = explain(engine, *capture_statement(engine, run))
+            results.append({"query": name, "index": index, "used": index in plan, "plan": plan[:120]})
+        engine.dispose()
+    
+    print_table(results)
+    if not all(result["used"] for result in results):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
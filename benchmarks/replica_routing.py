@@ -0,0 +1,91 @@
+import argparse
+import asyncio
+import os
+import secrets
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Tuple
+import httpx
+from sqlalchemy import create_engine, text
+from benchmarks.common import API_PREFIX, print_table, seed_products
+
+IN_PROCESS_URL = "http://replicas"
+REPLICA_MARKER = "Solo en la réplica"
+
+def prepare_databases(primary: Path, replica: Path, products: int) -> None:
+    from app.migrations import run_migrations
+    engine = create_engine(f"sqlite:///{primary}")
+    run_migrations(engine)
+    engine.dispose()
+    seed_products(f"sqlite:///{primary}", products)
+    shutil.copyfile(primary, replica)
+    engine = create_engine(f"sqlite:///{replica}")
+    with engine.begin() as connection:
+        connection.execute(
+            text("INSERT INTO products (name, category, price, stock) VALUES (:name, 'Réplica', 1, 1)"),
+            {"name": REPLICA_MARKER}
+        )
+    engine.dispose()
+
+async def authenticate(client: httpx.AsyncClient, name: str) -> Dict[str, str]:
+    credentials = {"email": f"{name}@example.com", "password": f"{name}-password"}
+    response = await client.post(f"{API_PREFIX}/auth/register", json={"name": name, **credentials})
+    response.raise_for_status()
+    response = await client.post(f"{API_PREFIX}/auth/login", json=credentials)
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['data']['access_token']}"}
+
+async def served_by_replica(client: httpx.AsyncClient, headers: Dict[str, str], products: int) -> bool:
+    response = await client.get(f"{API_PREFIX}/products/?limit={products + 1}", headers=headers)
+    response.raise_for_status()
+    return any(product["name"] == REPLICA_MARKER for product in response.json()["data"])
+
+async def run_checks(args) -> Tuple[List[dict], dict]:
+    from app.main import app
+    await app.router.startup()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url=IN_PROCESS_URL, timeout=60) as client:
+            writer = await authenticate(client, "escritor")
+            reader = await authenticate(client, "lector")
+            checks = [("lectura sin escrituras previas va a la réplica", await served_by_replica(client, writer, args.products))]
+            response = await client.put(f"{API_PREFIX}/products/1", json={"stock": 7}, headers=writer)
+            response.raise_for_status()
+            checks.append(("lectura tras escribir va al primario", not await served_by_replica(client, writer, args.products)))
+            checks.append(("otros usuarios siguen leyendo de la réplica", await served_by_replica(client, reader, args.products)))
+            response = await client.get(f"{API_PREFIX}/products/1", headers=writer)
+            checks.append(("el primario devuelve la escritura", response.json()["data"]["stock"] == 7))
+            await asyncio.sleep(args.window + 0.5)
+            checks.append(("pasada la ventana vuelve a la réplica", await served_by_replica(client, writer, args.products)))
+            stats = (await client.get("/metrics")).json()["database"]
+    finally:
+        await app.router.shutdown()
+    return [{"check": name, "status": "ok" if passed else "fallo"} for name, passed in checks], stats
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Comprueba el enrutado de lecturas a réplicas con dos bases SQLite locales")
+    parser.add_argument("--products", type=int, default=100)
+    parser.add_argument("--window", type=float, default=1.0, help="READ_AFTER_WRITE_SECONDS usado en la comprobación")
+    parser.add_argument("--async-db", action="store_true", help="Ejecuta con ASYNC_DB_ENABLED=true")
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        primary, replica = Path(tmp) / "primary.db", Path(tmp) / "replica.db"
+        os.environ["DATABASE_URL"] = f"sqlite:///{primary}"
+        os.environ["DATABASE_REPLICA_URLS"] = f"sqlite:///{replica}"
+        os.environ["READ_AFTER_WRITE_SECONDS"] = str(args.window)
+        os.environ["PRODUCT_CACHE_ENABLED"] = "false"
+        os.environ["ASYNC_DB_ENABLED"] = str(args.async_db).lower()
+        os.environ.setdefault("SECRET_KEY", secrets.token_urlsafe(32))
+        prepare_databases(primary, replica, args.products)
+        results, stats = asyncio.run(run_checks(args))
+    
+    print_table(results)
+    print(f"Lecturas en réplica: {stats['replica_reads']}; lecturas fijadas al primario: {stats['pinned_reads']}")
+    if any(result["status"] != "ok" for result in results):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
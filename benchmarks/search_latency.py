@@ -0,0 +1,76 @@
+import argparse
+import asyncio
+import random
+import sys
+import tempfile
+from pathlib import Path
+from urllib.parse import urlencode
+import httpx
+from sqlalchemy import create_engine, text
+from benchmarks.common import API_PREFIX, drive, login, print_table, run_server, server_env, summarize
+
+BRANDS = ["Lenovo", "Dell", "Samsung", "Logitech", "Sony", "Philips", "Bosch", "Makita", "Canon", "Epson"]
+ITEMS = ["Laptop", "Monitor", "Teclado", "Ratón", "Auriculares", "Taladro", "Impresora", "Cámara", "Altavoz", "Cargador"]
+TRAITS = ["inalámbrico", "mecánico", "portátil", "profesional", "compacto", "gaming", "ultra", "básico", "premium", "eco"]
+CATEGORIES = ["Electrónica", "Informática", "Herramientas", "Oficina", "Audio", "Fotografía", "Hogar", "Papelería"]
+QUERIES = [
+    {"q": "lap"},
+    {"q": "laptop lenovo"},
+    {"q": "teclado mecanico"},
+    {"q": "impresroa"},
+    {"q": "auricul", "max_price": 100},
+    {"q": "informatica", "min_stock": 10, "max_stock": 50},
+    {"q": "camara canon", "min_price": 200},
+    {"q": "taladro profesional bosch"},
+]
+
+def seed_catalog(database_url: str, count: int, chunk_size: int = 10000) -> None:
+    generator = random.Random(15)
+    engine = create_engine(database_url)
+    with engine.begin() as connection:
+        existing = connection.execute(text("SELECT COUNT(*) FROM products")).scalar()
+        for start in range(existing, count, chunk_size):
+            rows = [
+                {
+                    "name": f"{generator.choice(ITEMS)} {generator.choice(BRANDS)} {generator.choice(TRAITS)} {i}",
+                    "category": generator.choice(CATEGORIES),
+                    "price": round(generator.uniform(1, 2000), 2),
+                    "stock": generator.randint(0, 500)
+                }
+                for i in range(start, min(start + chunk_size, count))
+            ]
+            connection.execute(
+                text("INSERT INTO products (name, category, price, stock) VALUES (:name, :category, :price, :stock)"),
+                rows
+            )
+    engine.dispose()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Mide la latencia de GET /products/search sobre un catálogo grande")
+    parser.add_argument("--database-url", help="Base de datos a usar (por defecto un SQLite temporal)")
+    parser.add_argument("--products", type=int, default=100000)
+    parser.add_argument("--requests", type=int, default=800)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--max-p95-ms", type=float, default=20.0)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or f"sqlite:///{Path(tmp) / 'search.db'}"
+        env = server_env(database_url, PRODUCT_CACHE_ENABLED=False)
+        with run_server(env) as base_url:
+            headers = login(base_url)
+            seed_catalog(database_url, args.products)
+            httpx.get(f"{base_url}{API_PREFIX}/products/search", params={"q": "warmup"}, headers=headers, timeout=600)
+            results = []
+            for query in QUERIES:
+                path = f"{API_PREFIX}/products/search?{urlencode(query)}"
+                requests = [("GET", path, None)] * (args.requests // len(QUERIES))
+                latencies, errors, elapsed = asyncio.run(drive(base_url, requests, headers, args.concurrency))
+                results.append({"query": urlencode(query), **summarize(latencies, errors, elapsed)})
+    
+    print_table(results)
+    if any(result["errors"] or result["p95_ms"] > args.max_p95_ms for result in results):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
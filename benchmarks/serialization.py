@@ -0,0 +1,111 @@
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import timeit
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from sqlalchemy import create_engine, text
+from benchmarks.common import print_table, seed_logs, seed_products
+
+TIMESTAMP = "2000-01-01T00:00:00"
+
+loop = asyncio.new_event_loop()
+
+def aware_log_rows(count: int) -> list:
+    start = datetime(2024, 1, 1, 12, 0, 0, 123456, tzinfo=timezone.utc)
+    offset = timezone(timedelta(hours=2))
+    return [
+        (1, f"Acción {i}", "update", "product", i, {"stock": i}, i, start + timedelta(seconds=i), (start + timedelta(minutes=i)).astimezone(offset))
+        for i in range(count)
+    ]
+
+def legacy_body(serialize_response, field, JSONResponse, envelope) -> bytes:
+    content = loop.run_until_complete(serialize_response(field=field, response_content=envelope))
+    return JSONResponse(content).body
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compara la serialización de listados con modelos frente a la ruta rápida")
+    parser.add_argument("--rows", type=int, default=100)
+    parser.add_argument("--number", type=int, default=200)
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = f"sqlite:///{Path(tmp) / 'serialization.db'}"
+        os.environ.setdefault("DATABASE_URL", database_url)
+        os.environ.setdefault("SECRET_KEY", "serialization")
+        os.environ["PRODUCT_CACHE_ENABLED"] = "false"
+        from fastapi.responses import JSONResponse
+        from fastapi.routing import serialize_response
+        from fastapi.utils import create_response_field
+        from sqlalchemy.orm import Session
+        from app.core.responses import FastJSONResponse, rows_as_dicts
+        from app.core.utils import success_response
+        from app.migrations import run_migrations
+        from app.modules.logs.models import Log
+        from app.modules.logs.schemas import LogResponse
+        from app.modules.logs.service import LOG_FIELDS, LogService
+        from app.modules.products.models import Product
+        from app.modules.products.schemas import ProductResponse
+        from app.modules.products.service import ProductService
+        from app.modules.users.models import User
+        from app.modules.users.schemas import UserResponse
+        from app.modules.users.service import UserService
+        
+        engine = create_engine(database_url)
+        run_migrations(engine)
+        with engine.begin() as connection:
+            connection.execute(
+                text("INSERT INTO users (name, email, password) VALUES (:name, :email, 'x')"),
+                [{"name": f"Usuario {i}", "email": f"usuario{i}@example.com"} for i in range(args.rows)]
+            )
+        seed_products(database_url, args.rows)
+        seed_logs(database_url, args.rows)
+        field = create_response_field("response", dict)
+        
+        endpoints = [
+            ("GET /products/", ProductResponse,
+             lambda db: db.query(Product).order_by(Product.id).limit(args.rows).all(),
+             lambda db: ProductService(db).get_all_products(0, args.rows)),
+            ("GET /users/", UserResponse,
+             lambda db: db.query(User).order_by(User.id).limit(args.rows).all(),
+             lambda db: UserService(db).get_all_users(0, args.rows)),
+            ("GET /logs/", LogResponse,
+             lambda db: db.query(Log).order_by(Log.created.desc(), Log.id.desc()).limit(args.rows).all(),
+             lambda db: LogService(db).get_all_logs(0, args.rows)),
+            ("logs con zona horaria", LogResponse,
+             lambda db: rows_as_dicts(aware_log_rows(args.rows), LOG_FIELDS),
+             lambda db: rows_as_dicts(aware_log_rows(args.rows), LOG_FIELDS)),
+        ]
+        results = []
+        with Session(engine) as db:
+            for name, schema, legacy_page, fast_page in endpoints:
+                def legacy():
+                    envelope = success_response([schema.model_validate(row).model_dump() for row in legacy_page(db)])
+                    envelope["timestamp"] = TIMESTAMP
+                    return legacy_body(serialize_response, field, JSONResponse, envelope)
+                
+                def fast():
+                    envelope = success_response(fast_page(db))
+                    envelope["timestamp"] = TIMESTAMP
+                    return FastJSONResponse(envelope).body
+                
+                legacy_seconds = timeit.timeit(legacy, number=args.number) / args.number
+                fast_seconds = timeit.timeit(fast, number=args.number) / args.number
+                results.append({
+                    "endpoint": name,
+                    "rows": args.rows,
+                    "legacy_us": round(legacy_seconds * 1e6, 1),
+                    "fast_us": round(fast_seconds * 1e6, 1),
+                    "speedup": round(legacy_seconds / fast_seconds, 2),
+                    "identical": legacy() == fast()
+                })
+        engine.dispose()
+    
+    print_table(results)
+    if not all(result["identical"] for result in results):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import argparse
+import asyncio
+import random
+import sys
+import tempfile
+from collections import Counter
+from pathlib import Path
+import httpx
+from sqlalchemy import bindparam, create_engine, text
+from benchmarks.common import API_PREFIX, login, print_table, run_server, server_env
+
+async def hammer(base_url: str, headers: dict, product_ids: list, requests: int, batch_size: int, concurrency: int):
+    statuses = Counter()
+    applied = Counter()
+    pending = iter(range(requests))
+    
+    async def worker(client: httpx.AsyncClient):
+        for index in pending:
+            if index % 2:
+                product_id = random.choice(product_ids)
+                response = await client.post(
+                    f"{API_PREFIX}/products/{product_id}/stock/adjust", json={"delta": -1}, headers=headers
+                )
+                deltas = {product_id: -1}
+            else:
+                chosen = random.sample(product_ids, min(batch_size, len(product_ids)))
+                response = await client.post(
+                    f"{API_PREFIX}/products/stock/adjust",
+                    json={"items": [{"id": product_id, "delta": -1} for product_id in chosen]},
+                    headers=headers
+                )
+                deltas = {product_id: -1 for product_id in chosen}
+            statuses[response.status_code] += 1
+            if response.status_code == 200:
+                applied.update({product_id: -delta for product_id, delta in deltas.items()})
+    
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+    return statuses, applied
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Comprueba que los ajustes de stock concurrentes no pierden actualizaciones")
+    parser.add_argument("--database-url", help="Base de datos a usar (por defecto un SQLite temporal)")
+    parser.add_argument("--products", type=int, default=20)
+    parser.add_argument("--initial-stock", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--async-db", action="store_true", help="Usa la ruta asíncrona de base de datos")
+    args = parser.parse_args()
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or f"sqlite:///{Path(tmp) / 'stress.db'}"
+        env = server_env(database_url, ASYNC_DB_ENABLED=args.async_db, PRODUCT_CACHE_ENABLED=False)
+        with run_server(env, workers=args.workers) as base_url:
+            headers = login(base_url)
+            product_ids = []
+            for index in range(args.products):
+                response = httpx.post(
+                    f"{base_url}{API_PREFIX}/products/",
+                    json={"name": f"Stress {index}", "category": "Stress", "price": 1.5, "stock": args.initial_stock},
+                    headers=headers
+                )
+                response.raise_for_status()
+                product_ids.append(response.json()["data"]["id"])
+            statuses, applied = asyncio.run(
+                hammer(base_url, headers, product_ids, args.requests, args.batch_size, args.concurrency)
+            )
+        
+        engine = create_engine(database_url)
+        with engine.connect() as connection:
+            statement = text("SELECT id, stock, version FROM products WHERE id IN :ids").bindparams(
+                bindparam("ids", expanding=True)
+            )
+            rows = {row.id: row for row in connection.execute(statement, {"ids": product_ids})}
+            stats_units = connection.execute(
+                text("SELECT stock_units FROM product_category_stats WHERE category = 'Stress'")
+            ).scalar()
+        engine.dispose()
+    
+    failures = []
+    for product_id in product_ids:
+        row = rows[product_id]
+        expected = args.initial_stock - applied[product_id]
+        if row.stock != expected or row.stock < 0 or row.version != 1 + applied[product_id]:
+            failures.append(product_id)
+    expected_units = sum(row.stock for row in rows.values())
+    print_table([{"status": status, "responses": count} for status, count in sorted(statuses.items())])
+    print_table([{
+        "products": len(product_ids),
+        "decrements": sum(applied.values()),
+        "lost_updates": len(failures),
+        "stats_units": stats_units,
+        "expected_units": expected_units
+    }])
+    if failures or stats_units != expected_units or set(statuses) - {200, 409}:
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
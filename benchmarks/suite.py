@@ -0,0 +1,203 @@
+import argparse
+import asyncio
+import json
+import os
+import random
+import secrets
+import sys
+import tempfile
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+import httpx
+from sqlalchemy import create_engine
+from benchmarks.common import (
+    API_PREFIX, BENCH_EMAIL, BENCH_PASSWORD, drive, login, print_table, run_server, seed_logs, seed_products,
+    server_env, summarize
+)
+
+IN_PROCESS_URL = "http://benchmark"
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baseline.json"
+COMPARED_CONFIG = ("mode", "workers", "async_db", "dialect", "products", "logs", "concurrency", "page_size", "batch_size")
+
+Request = Tuple[str, str, Optional[dict]]
+
+def login_requests(args, generator: random.Random) -> List[Request]:
+    body = {"email": BENCH_EMAIL, "password": BENCH_PASSWORD}
+    return [("POST", f"{API_PREFIX}/auth/login", body)] * args.login_requests
+
+def current_user_requests(args, generator: random.Random) -> List[Request]:
+    return [("GET", f"{API_PREFIX}/users/me", None)] * args.requests
+
+def product_get_requests(args, generator: random.Random) -> List[Request]:
+    return [("GET", f"{API_PREFIX}/products/{generator.randint(1, args.products)}", None) for _ in range(args.requests)]
+
+def product_batch_get_requests(args, generator: random.Random) -> List[Request]:
+    return [
+        ("POST", f"{API_PREFIX}/products/batch-get", {"ids": [generator.randint(1, args.products) for _ in range(args.batch_size)]})
+        for _ in range(args.requests)
+    ]
+
+def deep_page_requests(args, generator: random.Random) -> List[Request]:
+    deepest = max(args.products - args.page_size, 0)
+    return [
+        ("GET", f"{API_PREFIX}/products/?limit={args.page_size}&skip={generator.randint(deepest // 2, deepest)}", None)
+        for _ in range(args.requests)
+    ]
+
+def statistics_requests(args, generator: random.Random) -> List[Request]:
+    return [("GET", f"{API_PREFIX}/products/statistics", None)] * args.requests
+
+def product_update_requests(args, generator: random.Random) -> List[Request]:
+    return [
+        ("PUT", f"{API_PREFIX}/products/{generator.randint(1, args.products)}", {"stock": generator.randint(0, 500)})
+        for _ in range(args.requests)
+    ]
+
+def log_list_requests(args, generator: random.Random) -> List[Request]:
+    return [("GET", f"{API_PREFIX}/logs/?limit={args.page_size}", None)] * args.requests
+
+SCENARIOS: Dict[str, Callable[[argparse.Namespace, random.Random], List[Request]]] = {
+    "login": login_requests,
+    "users_me": current_user_requests,
+    "product_get": product_get_requests,
+    "product_batch_get": product_batch_get_requests,
+    "products_deep_pages": deep_page_requests,
+    "product_statistics": statistics_requests,
+    "product_update": product_update_requests,
+    "logs_list": log_list_requests,
+}
+
+def prepare_database(database_url: str, args) -> None:
+    from app.migrations import run_migrations
+    engine = create_engine(database_url)
+    run_migrations(engine)
+    engine.dispose()
+    seed_products(database_url, args.products)
+
+async def run_scenarios(
+    base_url: str,
+    headers: Dict[str, str],
+    args,
+    transport: Optional[httpx.AsyncBaseTransport] = None
+) -> List[dict]:
+    generator = random.Random(18)
+    results = []
+    for name in args.scenarios:
+        requests = SCENARIOS[name](args, generator)
+        warmup = requests[:max(len(requests) // 10, 1)]
+        await drive(base_url, warmup, headers, args.concurrency, transport)
+        latencies, errors, elapsed = await drive(base_url, requests, headers, args.concurrency, transport)
+        results.append({"scenario": name, **summarize(latencies, errors, elapsed)})
+    return results
+
+async def run_in_process(database_url: str, args) -> List[dict]:
+    from app.main import app
+    await app.router.startup()
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url=IN_PROCESS_URL, timeout=120) as client:
+            await client.post(f"{API_PREFIX}/auth/register", json={"name": "Benchmark", "email": BENCH_EMAIL, "password": BENCH_PASSWORD})
+            response = await client.post(f"{API_PREFIX}/auth/login", json={"email": BENCH_EMAIL, "password": BENCH_PASSWORD})
+            response.raise_for_status()
+        headers = {"Authorization": f"Bearer {response.json()['data']['access_token']}"}
+        seed_logs(database_url, args.logs)
+        return await run_scenarios(IN_PROCESS_URL, headers, args, transport)
+    finally:
+        await app.router.shutdown()
+
+def run_with_server(database_url: str, args) -> List[dict]:
+    env = server_env(database_url, ASYNC_DB_ENABLED=str(args.async_db).lower())
+    with run_server(env, workers=args.workers) as base_url:
+        headers = login(base_url)
+        seed_logs(database_url, args.logs)
+        return asyncio.run(run_scenarios(base_url, headers, args))
+
+def compare(results: List[dict], baseline: dict, threshold: float) -> List[dict]:
+    stored = baseline["results"]
+    for result in results:
+        reference = stored.get(result["scenario"])
+        if reference is None:
+            result.update(baseline_rps="-", baseline_p95_ms="-", rps_change="-", status="nuevo")
+            continue
+        rps_change = result["rps"] / reference["rps"] - 1 if reference["rps"] else 0.0
+        p95_change = result["p95_ms"] / reference["p95_ms"] - 1 if reference["p95_ms"] else 0.0
+        regressed = result["errors"] > 0 or rps_change < -threshold or p95_change > threshold
+        result.update(
+            baseline_rps=reference["rps"],
+            baseline_p95_ms=reference["p95_ms"],
+            rps_change=f"{rps_change:+.1%}",
+            status="regresión" if regressed else "ok"
+        )
+    return results
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Mide las rutas críticas de la API y las compara con una línea base guardada")
+    parser.add_argument("--database-url", help="Base de datos a usar (por defecto un SQLite temporal); se reutiliza si ya tiene datos")
+    parser.add_argument("--mode", choices=("in-process", "server"), default="in-process")
+    parser.add_argument("--workers", type=int, default=1, help="Workers de uvicorn en modo server")
+    parser.add_argument("--async-db", action="store_true", help="Ejecuta con ASYNC_DB_ENABLED=true")
+    parser.add_argument("--products", type=int, default=10000)
+    parser.add_argument("--logs", type=int, default=10000)
+    parser.add_argument("--requests", type=int, default=1000, help="Peticiones por escenario")
+    parser.add_argument("--login-requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--page-size", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=100, help="Ids por petición en product_batch_get")
+    parser.add_argument("--scenarios", nargs="+", choices=list(SCENARIOS), default=list(SCENARIOS))
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="Guarda los resultados como nueva línea base")
+    parser.add_argument("--max-regression", type=float, default=0.2, help="Caída de rps o subida de p95 tolerada (0.2 = 20%%)")
+    args = parser.parse_args()
+    if args.mode == "in-process" and args.workers != 1:
+        parser.error("--workers solo se admite en modo server")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or f"sqlite:///{Path(tmp) / 'suite.db'}"
+        os.environ["DATABASE_URL"] = database_url
+        os.environ.setdefault("SECRET_KEY", secrets.token_urlsafe(32))
+        os.environ["ASYNC_DB_ENABLED"] = str(args.async_db).lower()
+        prepare_database(database_url, args)
+        if args.mode == "server":
+            results = run_with_server(database_url, args)
+        else:
+            results = asyncio.run(run_in_process(database_url, args))
+    
+    config = {
+        "mode": args.mode,
+        "workers": args.workers,
+        "async_db": args.async_db,
+        "dialect": database_url.split(":", 1)[0].split("+", 1)[0],
+        "products": args.products,
+        "logs": args.logs,
+        "concurrency": args.concurrency,
+        "page_size": args.page_size,
+        "batch_size": args.batch_size,
+    }
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(
+            {"config": config, "results": {result["scenario"]: result for result in results}},
+            indent=2
+        ) + "\n")
+        print_table(results)
+        print(f"Línea base guardada en {args.baseline}")
+        return
+    
+    if not args.baseline.exists():
+        print_table(results)
+        print(f"Sin línea base en {args.baseline}; ejecute con --save-baseline para crearla")
+        sys.exit(1 if any(result["errors"] for result in results) else 0)
+    
+    baseline = json.loads(args.baseline.read_text())
+    mismatched = [key for key in COMPARED_CONFIG if baseline["config"].get(key) != config[key]]
+    if mismatched:
+        print_table(results)
+        print(f"La línea base se generó con otra configuración ({', '.join(mismatched)}); no se compara")
+        sys.exit(2)
+    
+    results = compare(results, baseline, args.max_regression)
+    print_table(results)
+    if any(result["status"] == "regresión" for result in results):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
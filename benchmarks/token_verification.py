@@ -0,0 +1,75 @@
+import argparse
+import os
+import tempfile
+import timeit
+from pathlib import Path
+from benchmarks.common import print_table
+
+def write_keys(directory: Path, algorithm: str) -> Path:
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import ec, rsa
+    if algorithm.startswith("ES"):
+        private_key = ec.generate_private_key(ec.SECP256R1())
+    else:
+        private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    path = directory / f"{algorithm.lower()}.pem"
+    path.write_bytes(private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption()
+    ))
+    return path
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Mide la verificación de tokens JWT con y sin caché de claves y resultados")
+    parser.add_argument("--tokens", type=int, default=100, help="Tokens distintos que se repiten durante la medición")
+    parser.add_argument("--number", type=int, default=20000)
+    parser.add_argument("--algorithms", nargs="+", default=["HS256", "RS256", "ES256"])
+    args = parser.parse_args()
+    
+    os.environ.setdefault("DATABASE_URL", "sqlite://")
+    os.environ.setdefault("SECRET_KEY", "token-verification-benchmark")
+    from jose import jwt
+    from app.core import security
+    from app.core.config import settings
+    
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for algorithm in args.algorithms:
+            private_key_file = None if algorithm.startswith("HS") else str(write_keys(Path(tmp), algorithm))
+            keys = security.TokenKeys(algorithm, settings.SECRET_KEY, private_key_file)
+            settings.ALGORITHM = algorithm
+            security.token_keys = keys
+            security.principal_cache.clear()
+            tokens = [security.create_access_token({"sub": f"user{i}@example.com", "uid": i}) for i in range(args.tokens)]
+            verification_key = keys.verification_key()
+            raw_key = settings.SECRET_KEY if private_key_file is None else verification_key.to_pem().decode()
+            position = iter(range(1 << 62))
+            
+            def uncached():
+                return jwt.decode(tokens[next(position) % len(tokens)], raw_key, algorithms=[algorithm])
+            
+            def cached_key():
+                return jwt.decode(tokens[next(position) % len(tokens)], verification_key, algorithms=[algorithm])
+            
+            def engine():
+                return security.decode_access_token(tokens[next(position) % len(tokens)])
+            
+            timings = {}
+            for name, function in (("uncached", uncached), ("cached_key", cached_key), ("engine", engine)):
+                number = args.number if name == "engine" else max(args.number // 10, 1)
+                timings[name] = timeit.timeit(function, number=number) / number
+            results.append({
+                "algorithm": algorithm,
+                "uncached_us": round(timings["uncached"] * 1e6, 1),
+                "cached_key_us": round(timings["cached_key"] * 1e6, 1),
+                "engine_us": round(timings["engine"] * 1e6, 2),
+                "engine_ops_s": round(1 / timings["engine"]),
+                "speedup": round(timings["uncached"] / timings["engine"], 1),
+                "cache_hit_ratio": security.principal_cache.stats()["hit_ratio"]
+            })
+    
+    print_table(results)
+
+if __name__ == "__main__":
+    main()